@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the line's shape.
+
+    The first and last points are always kept; each bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    next bucket's average.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def min_max(x, y, n_out):
+    """Min/max bucketing: indices of each bucket's lowest and highest point, in order.
+
+    Cheaper than LTTB and never hides a spike or dip, at the cost of a more
+    jagged line. First and last points are always kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, (n_out - 2) // 2 + 1).astype(np.int64)
+    picked = [0]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            segment = y[lo:hi]
+            picked.extend(sorted({lo + int(np.argmin(segment)), lo + int(np.argmax(segment))}))
+    picked.append(n - 1)
+    return np.asarray(picked, dtype=np.int64)
+
+
+METHODS = {"lttb": lttb, "minmax": min_max}
+
+
+def downsample(x, y, max_points, method="lttb"):
+    """Indices of at most `max_points` points of (x, y); all of them when already within budget."""
+    if len(y) <= max_points:
+        return np.arange(len(y))
+    return METHODS[method](x, y, max_points)
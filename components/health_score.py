@@ -1,37 +1,27 @@
 import streamlit as st
 
-def calculate_financial_health_score(snapshot):
+from components.memo import memo
+from tools.asset_index import asset_index
+
+def calculate_financial_health_score(snapshot, index=None):
     income = snapshot.get("income", {})
     liabilities = snapshot.get("liabilities", {})
-    assets = snapshot.get("assets", {})
     contributions = snapshot.get("contributions", {})
     emergency_fund = snapshot.get("emergency_fund", 0)
 
     monthly_salary = income.get("monthly_salary", 0)
     total_debt = sum(liabilities.values())
-    total_assets = 0
-    for key, val in assets.items():
-        if isinstance(val, list):
-            total_assets += sum(item.get("current_value", 0) if isinstance(item, dict) else 0 for item in val)
-        elif isinstance(val, (int, float)):
-            total_assets += val
+    if index is None:
+        index = asset_index(snapshot)
 
     savings_percent = (contributions.get("monthly_savings", 0) / monthly_salary * 100) if monthly_salary > 0 else 0
     debt_to_income = (total_debt / (monthly_salary * 12) * 100) if monthly_salary > 0 else 0
-    liquidity_ratio = (assets.get("bank_balance", 0) + emergency_fund) / total_debt if total_debt > 0 else 1
+    liquidity_ratio = (index.value("bank_balance") + emergency_fund) / total_debt if total_debt > 0 else 1
 
     # Investment diversification: count number of asset categories with >5% allocation
     categories = ["mutual_funds", "stocks", "epf", "fixed_deposits", "real_estate"]
-    diversified_count = 0
-    for cat in categories:
-        val = assets.get(cat, 0)
-        total_val = 0
-        if isinstance(val, list):
-            total_val = sum(item.get("current_value", 0) if isinstance(item, dict) else 0 for item in val)
-        elif isinstance(val, (int, float)):
-            total_val = val
-        if total_assets > 0 and (total_val / total_assets) > 0.05:
-            diversified_count += 1
+    weights = index.category_weights
+    diversified_count = sum(1 for cat in categories if weights.get(cat, 0) > 0.05)
     diversification_score = (diversified_count / len(categories)) * 100
 
     # Calculate weighted score out of 100
@@ -51,8 +41,15 @@ def get_health_score_zone(score):
     else:
         return "red", "Critical"
 
+def _indexed_health_score(snapshot):
+    return calculate_financial_health_score(snapshot, asset_index(snapshot, memo.version(snapshot)))
+
+def health_score(snapshot):
+    """calculate_financial_health_score, computed once per snapshot version."""
+    return memo.get(snapshot, "health_score", _indexed_health_score)
+
 def display_health_score(snapshot):
-    score = calculate_financial_health_score(snapshot)
+    score = health_score(snapshot)
     zone, zone_label = get_health_score_zone(score)
     zone_color = {"green": "#28a745", "yellow": "#ffc107", "red": "#dc3545"}[zone]
     st.markdown(
@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+
+from tools.mcp_loader import snapshot_version
+
+
+class SnapshotMemo:
+    """Dashboard values computed once per snapshot version, shared by every session.
+
+    Streamlit reruns the script on each interaction; values stored here survive
+    reruns and are reused by other sessions viewing the same snapshot. At most
+    `max_versions` snapshot versions are kept (least recently used evicted).
+    Cached values are shared: treat them as read-only.
+    """
+
+    def __init__(self, max_versions=8):
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+        self._values = OrderedDict()     # version -> {key: value}
+        # Snapshot objects are reused across reruns; remembering their version skips re-hashing
+        self._versions = OrderedDict()   # id(snapshot) -> (snapshot, version)
+        self._stats = {}                 # name -> {"hits", "misses"}
+        self.evictions = 0
+
+    def version(self, snapshot):
+        with self._lock:
+            known = self._versions.get(id(snapshot))
+            if known is not None and known[0] is snapshot:
+                self._versions.move_to_end(id(snapshot))
+                return known[1]
+        version = snapshot_version(snapshot)
+        with self._lock:
+            self._versions[id(snapshot)] = (snapshot, version)
+            while len(self._versions) > 2 * self.max_versions:
+                self._versions.popitem(last=False)
+        return version
+
+    def get(self, snapshot, name, compute, *args):
+        """compute(snapshot, *args), memoized under (snapshot version, name, args)."""
+        version = self.version(snapshot)
+        key = (name,) + args
+        with self._lock:
+            values = self._values.get(version)
+            counts = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+            if values is not None and key in values:
+                self._values.move_to_end(version)
+                counts["hits"] += 1
+                return values[key]
+            counts["misses"] += 1
+        # Computed outside the lock; concurrent sessions may both compute once
+        value = compute(snapshot, *args)
+        with self._lock:
+            self._values.setdefault(version, {})[key] = value
+            self._values.move_to_end(version)
+            while len(self._values) > self.max_versions:
+                self._values.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        with self._lock:
+            hits = sum(c["hits"] for c in self._stats.values())
+            misses = sum(c["misses"] for c in self._stats.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "versions": len(self._values),
+                "entries": sum(len(v) for v in self._values.values()),
+                "evictions": self.evictions,
+                "by_name": {name: dict(c) for name, c in sorted(self._stats.items())},
+            }
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self._versions.clear()
+
+
+memo = SnapshotMemo()
@@ -1,14 +1,77 @@
 import streamlit as st
-import pandas as pd
 
-def display_net_worth_trend(snapshot):
-    net_worth_history = snapshot.get("net_worth_history", [])
-    if not net_worth_history:
+from components.memo import memo
+
+# Chart point budget: longer (e.g. daily, multi-year) histories are downsampled to this
+MAX_CHART_POINTS = 500
+
+def net_worth_frame(snapshot, forecast_months=6, start=None, end=None, max_points=MAX_CHART_POINTS):
+    """History in [start, end] (downsampled to max_points) plus the projection band, indexed by month.
+
+    The projection is appended when the window reaches the latest point. None without history.
+    """
+    # Deferred: only the dashboard view needs pandas and the forecasting module
+    import pandas as pd
+    from tools.forecasting import get_trend_model
+    from tools.net_worth_series import series_for_snapshot
+    from components.downsampling import downsample
+
+    # The memo already knows the snapshot's version; passing it skips re-hashing a long history
+    version = memo.version(snapshot)
+    series = series_for_snapshot(snapshot, version=version)
+    if not len(series):
+        return None
+    visible = series.window(start, end) if start is not None or end is not None else series
+    if not len(visible):
+        return None
+
+    # LTTB keeps the first and last point, so the projection still joins the last observation
+    idx = downsample(visible.dates.astype("int64"), visible.values, max_points)
+    df = pd.DataFrame({'value': visible.values[idx]}, index=pd.DatetimeIndex(visible.dates[idx], name='month'))
+    if visible.last[0] != series.last[0]:
+        return df
+
+    # Append the projection with its 95% band after the last observed month
+    model = get_trend_model(snapshot, "net_worth_history", log=True, version=version)
+    if model is not None and model.n >= 3 and forecast_months > 0:
+        observed = len(df)
+        projection = model.forecast(forecast_months)
+        forecast_df = pd.DataFrame(
+            {
+                'forecast': projection['forecast'],
+                'lower': projection['lower'],
+                'upper': projection['upper'],
+            },
+            index=pd.to_datetime(projection['months'].astype(str)),
+        )
+        forecast_df.index.name = 'month'
+        df = pd.concat([df, forecast_df])
+        df.loc[df.index[observed - 1], ['forecast', 'lower', 'upper']] = df['value'].dropna().iloc[-1]
+    return df
+
+def _zoom_window(snapshot):
+    """Date-range slider for histories longer than the point budget; (None, None) shows everything."""
+    from tools.net_worth_series import series_for_snapshot
+
+    series = series_for_snapshot(snapshot, version=memo.version(snapshot))
+    if len(series) <= MAX_CHART_POINTS:
+        return None, None
+    first, last = series.first[0].astype(object), series.last[0].astype(object)
+    start, end = st.slider("Zoom", min_value=first, max_value=last, value=(first, last),
+                           format="MMM YYYY", key="net_worth_zoom")
+    if (start, end) == (first, last):
+        return None, None
+    return start, end
+
+def display_net_worth_trend(snapshot, forecast_months=6):
+    start, end = _zoom_window(snapshot)
+    if start is None and end is None:
+        df = memo.get(snapshot, "net_worth_frame", net_worth_frame, forecast_months)
+    else:
+        # Zoomed windows are cheap to cut from the series store and not worth caching
+        df = net_worth_frame(snapshot, forecast_months, start, end)
+    if df is None:
         st.warning("No net worth history data available.")
         return
 
-    df = pd.DataFrame(net_worth_history)
-    df['month'] = pd.to_datetime(df['month'])
-    df = df.sort_values('month')
-
-    st.line_chart(data=df.set_index('month')['value'], use_container_width=True)
+    st.line_chart(data=df, use_container_width=True)
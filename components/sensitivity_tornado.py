@@ -0,0 +1,38 @@
+import streamlit as st
+
+from components.memo import memo
+
+METRIC_LABELS = {
+    "money_at_40": "Money at 40 (₹)",
+    "retirement_corpus": "Retirement corpus, moderate (₹)",
+    "portfolio_real_return": "Portfolio real return (%)",
+}
+
+def display_sensitivity_tornado(snapshot):
+    # Deferred until the dashboard shows this section (pandas, planner tool modules)
+    import pandas as pd
+    from tools.sensitivity import analyze_sensitivity
+
+    report = memo.get(snapshot, "sensitivity", analyze_sensitivity)
+    metric = st.selectbox(
+        "Outcome", list(METRIC_LABELS), format_func=METRIC_LABELS.get, key="sensitivity_metric"
+    )
+    baseline = report["baseline"][metric]
+    low, high = min(report["steps"]), max(report["steps"])
+
+    # Bars show the change from baseline when each assumption moves low/high
+    rows = report["tornado"][metric]
+    df = pd.DataFrame(
+        {
+            f"{low:+.0%}": [row["low"] - baseline for row in rows],
+            f"{high:+.0%}": [row["high"] - baseline for row in rows],
+        },
+        index=[row["assumption"].replace("_percent", "").replace("_", " ").title() for row in rows],
+    )
+    st.bar_chart(df, horizontal=True, stack=False, use_container_width=True)
+
+    elasticity = report["elasticity"][metric]
+    st.caption(
+        "Elasticity (% change in outcome per % change in assumption): "
+        + ", ".join(f"{name.replace('_percent', '')} {value:+.2f}" for name, value in elasticity.items())
+    )
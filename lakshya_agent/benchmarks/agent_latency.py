@@ -0,0 +1,236 @@
+"""
+Offline latency benchmark for invoke_agent, driven by recorded cassettes.
+
+Record the corpus once against the live model (needs GOOGLE_API_KEY):
+    python lakshya_agent/benchmarks/agent_latency.py --record [--mode parallel]
+
+Replay deterministically and report p50/p95 latency, LLM steps and tool time:
+    python lakshya_agent/benchmarks/agent_latency.py [--rounds 5] [--llm-latency recorded]
+
+Without a recorded cassette (or with --synthesize), one is first generated from a
+scripted fake model that calls a fixed tool plan per question, so the benchmark
+runs offline out of the box.
+
+Run from the repository root (the snapshot path is relative to it).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from langchain_core.runnables import Runnable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# lakshya_agent/ for `tools.*`, the repository root for `components.*` (what-if scoring)
+sys.path[:0] = [os.path.dirname(HERE), os.path.dirname(os.path.dirname(HERE))]
+
+# Fixed corpus: router fast-path questions, multi-tool questions and hypotheticals
+CORPUS = [
+    "What's my net worth?",
+    "How are my SIPs performing?",
+    "Am I eligible for a loan?",
+    "Are there any unusual expenses?",
+    "Give me a summary of my assets",
+    "Will my bank balance stay above my emergency fund this year?",
+    "Forecast my net worth for the next six months",
+    "How would a market crash affect me?",
+    "Should I prepay my home loan or raise my SIP?",
+    "Which assumption matters most for my retirement corpus?",
+    "Compare my SIP returns with my net worth growth and tell me if I should rebalance",
+    "What if I lose my job for six months?",
+]
+
+
+# Tool plan per question for the scripted model: each inner list is one LLM step
+# (run one tool per step in react mode, together in parallel mode)
+SCRIPTS = {
+    "What's my net worth?": [["get_net_worth_trend"]],
+    "How are my SIPs performing?": [["get_sip_performance"]],
+    "Am I eligible for a loan?": [["check_loan_eligibility"]],
+    "Are there any unusual expenses?": [["detect_anomaly"]],
+    "Give me a summary of my assets": [["get_fi_mcp_realtime"]],
+    "Will my bank balance stay above my emergency fund this year?": [["get_cash_flow_forecast"]],
+    "Forecast my net worth for the next six months": [["get_financial_forecast"]],
+    "How would a market crash affect me?": [["get_stress_test"]],
+    "Should I prepay my home loan or raise my SIP?": [["compare_what_if", "get_sip_performance"]],
+    "Which assumption matters most for my retirement corpus?": [["get_assumption_sensitivity"]],
+    "Compare my SIP returns with my net worth growth and tell me if I should rebalance":
+        [["get_sip_performance", "get_net_worth_trend"], ["fetch_financial_data"]],
+    "What if I lose my job for six months?": [["get_stress_test", "get_cash_flow_forecast"]],
+}
+
+
+class ScriptedLLM(Runnable):
+    """Fake model that follows SCRIPTS for the cassette's current query, then answers."""
+
+    def __init__(self, cassette, mode: str):
+        self.cassette = cassette
+        self.mode = mode
+        self._query, self._step = None, 0
+
+    def invoke(self, input, config=None, **kwargs):
+        from tools.replay import _prompt_text
+
+        if self.cassette.current != self._query:
+            self._query, self._step = self.cassette.current, 0
+        if "Tool results:" in _prompt_text(input):
+            return "Here is what your latest snapshot shows."  # routed answer phrasing
+        plan = SCRIPTS.get(self._query, [])
+        steps = plan if self.mode == "parallel" else [[name] for step in plan for name in step]
+        if self._step >= len(steps):
+            return "Thought: I now know the final answer\nFinal Answer: Here is what your latest snapshot shows."
+        actions = "".join(f"Action: {name}\nAction Input: \n" for name in steps[self._step])
+        self._step += 1
+        return "Thought: I should look this up.\n" + actions
+
+
+def synthesize_cassette(path, mode, use_router, agent_tools):
+    """Records the corpus against ScriptedLLM instead of the live model and saves it to `path`."""
+    from tools.replay import Cassette, RecordingLLM, ToolTimer, wrap_tools
+
+    cassette = Cassette(meta={"agent_mode": mode, "use_router": use_router, "llm": "scripted"})
+    timer = ToolTimer()
+    llm = RecordingLLM(ScriptedLLM(cassette, mode), cassette)
+    run_corpus(CORPUS, llm, wrap_tools(agent_tools, cassette, mode="record", timer=timer), cassette,
+               mode, use_router, True, timer)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cassette.save(path)
+    print(f"Generated a scripted cassette at {path}", file=sys.stderr)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def build_runner(llm, agent_tools, mode):
+    from tools.root_agent import build_agent_executor, context_budget
+    from tools.parallel_agent import ParallelToolAgent
+    from tools.financial_digest import financial_digest
+
+    if mode == "parallel":
+        return ParallelToolAgent(llm, agent_tools, budget=context_budget, context_fn=financial_digest)
+    executor = build_agent_executor(llm, agent_tools)
+    executor.verbose = False
+    return executor
+
+
+def run_corpus(corpus, llm, agent_tools, cassette, mode, use_router, record, timer, rounds=1):
+    """Runs every query `rounds` times; returns one row per run."""
+    from tools.root_agent import invoke_agent
+    from tools.response_cache import ResponseCache
+
+    executor = build_runner(llm, agent_tools, mode)
+    registry = {t.name: t for t in agent_tools}
+    rows = []
+    for round_no in range(rounds):
+        for query in corpus:
+            cassette.begin(query, record=record)
+            timer.reset()
+            calls_before = llm.calls
+            started = time.perf_counter()
+            # A fresh response cache per run so every query does real work
+            output = invoke_agent(query, executor=executor, cache=ResponseCache(), llm_client=llm,
+                                  use_router=use_router, registry=registry)
+            rows.append({
+                "round": round_no,
+                "query": query,
+                "latency_s": time.perf_counter() - started,
+                "llm_steps": llm.calls - calls_before,
+                "tool_calls": timer.calls,
+                "tool_s": timer.seconds,
+                "error": output.startswith("An error occurred"),
+                "output": output,
+            })
+    return rows
+
+
+def summarize(rows):
+    latencies = [r["latency_s"] for r in rows]
+    return {
+        "runs": len(rows),
+        "errors": sum(r["error"] for r in rows),
+        "latency_p50_ms": round(_percentile(latencies, 0.5) * 1000, 2),
+        "latency_p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "llm_steps_mean": round(statistics.mean(r["llm_steps"] for r in rows), 2),
+        "tool_calls_mean": round(statistics.mean(r["tool_calls"] for r in rows), 2),
+        "tool_ms_mean": round(statistics.mean(r["tool_s"] for r in rows) * 1000, 2),
+    }
+
+
+def print_report(rows, summary):
+    print(f"{'query':<62} {'p50 ms':>8} {'steps':>6} {'tools':>6} {'tool ms':>8}")
+    for query in dict.fromkeys(r["query"] for r in rows):
+        runs = [r for r in rows if r["query"] == query]
+        flag = " !" if any(r["error"] for r in runs) else ""
+        print(f"{query[:60]:<62} {_percentile([r['latency_s'] for r in runs], 0.5) * 1000:>8.1f} "
+              f"{runs[0]['llm_steps']:>6} {runs[0]['tool_calls']:>6} "
+              f"{statistics.mean(r['tool_s'] for r in runs) * 1000:>8.1f}{flag}")
+    print()
+    for key, value in summary.items():
+        print(f"{key:<18} {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", action="store_true", help="call the live model and write the cassette")
+    parser.add_argument("--cassette", help="cassette path (default: benchmarks/cassettes/agent_corpus_<mode>.json)")
+    parser.add_argument("--mode", choices=["react", "parallel"], default="react")
+    parser.add_argument("--no-router", action="store_true", help="send every query through the agent loop")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--llm-latency", default="none",
+                        help="'none', 'recorded' (replay recorded model latency) or seconds per call")
+    parser.add_argument("--replay-tools", action="store_true", help="return recorded tool outputs instead of running tools")
+    parser.add_argument("--synthesize", action="store_true",
+                        help="regenerate the cassette from the scripted fake model before replaying")
+    parser.add_argument("--json", help="also write rows and summary to this file")
+    args = parser.parse_args(argv)
+
+    cassette_path = args.cassette or os.path.join(HERE, "cassettes", f"agent_corpus_{args.mode}.json")
+    if not args.record:
+        # Replays never reach the model
+        os.environ.setdefault("GOOGLE_API_KEY", "replay")
+    from tools.replay import Cassette, RecordingLLM, ReplayLLM, ToolTimer, wrap_tools
+    from tools.root_agent import get_tools
+
+    tools = get_tools()
+    timer = ToolTimer()
+    if args.record:
+        # Only recording builds the live Gemini client
+        from tools.root_agent import get_llm
+        cassette = Cassette(meta={"agent_mode": args.mode, "use_router": not args.no_router})
+        llm = RecordingLLM(get_llm(), cassette)
+        agent_tools = wrap_tools(tools, cassette, mode="record", timer=timer)
+        rounds = 1
+    else:
+        if args.synthesize or not os.path.exists(cassette_path):
+            synthesize_cassette(cassette_path, args.mode, not args.no_router, tools)
+        cassette = Cassette.load(cassette_path)
+        latency = args.llm_latency if args.llm_latency in ("none", "recorded") else float(args.llm_latency)
+        llm = ReplayLLM(cassette, latency=latency)
+        agent_tools = wrap_tools(tools, cassette, mode="replay" if args.replay_tools else "live", timer=timer)
+        rounds = args.rounds
+        if cassette.meta.get("agent_mode", args.mode) != args.mode:
+            print(f"warning: cassette was recorded in {cassette.meta['agent_mode']} mode", file=sys.stderr)
+
+    use_router = not args.no_router
+    rows = run_corpus(CORPUS, llm, agent_tools, cassette, args.mode, use_router, args.record, timer, rounds)
+    summary = summarize(rows)
+    if not args.record:
+        summary["prompt_mismatches"] = llm.mismatches
+    print_report(rows, summary)
+
+    if args.record:
+        os.makedirs(os.path.dirname(cassette_path), exist_ok=True)
+        cassette.save(cassette_path)
+        print(f"\nRecorded {len(CORPUS)} queries to {cassette_path}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "rows": rows}, f, ensure_ascii=False, indent=1)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
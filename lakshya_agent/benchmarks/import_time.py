@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark: import time of the app's entry modules, each in a fresh interpreter.
+
+    python lakshya_agent/benchmarks/import_time.py [--repeat 5] [--json out.json]
+
+For every module it reports the median wall time of the import and which heavy
+libraries (LangChain, Gemini/ADK, pandas, numpy) the import pulled in. The last
+row times root_agent.warm_up(), i.e. building the tools, LLM client and
+executors on first use (no model call is made).
+
+Run from the repository root (the snapshot path is relative to it).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+AGENT_DIR = os.path.dirname(HERE)
+ROOT = os.path.dirname(AGENT_DIR)
+
+HEAVY = ["langchain", "langchain_core", "langchain_google_genai", "google.adk", "google.genai", "pandas", "numpy"]
+
+# (label, statement timed in a fresh interpreter)
+TARGETS = [
+    ("tools.mcp_loader", "import tools.mcp_loader"),
+    ("tools.price_feed", "import tools.price_feed"),
+    ("tools.financial_digest", "import tools.financial_digest"),
+    ("components.health_score", "import components.health_score"),
+    ("components.net_worth_trend", "import components.net_worth_trend"),
+    ("tools.root_agent", "import tools.root_agent"),
+    ("landing_page", "import landing_page"),
+    ("root_agent.warm_up()", "import tools.root_agent as ra; ra.warm_up()"),
+]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(statement, env):
+    """Runs `statement` in a new interpreter; returns (seconds, heavy modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr.strip()}")
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data["seconds"], data["loaded"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module (median reported)")
+    parser.add_argument("--json", help="also write the rows to this file")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([AGENT_DIR, ROOT, env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    # warm_up builds the Gemini client but never calls it
+    env.setdefault("GOOGLE_API_KEY", "import-benchmark")
+
+    rows = []
+    print(f"{'target':<28} {'median ms':>10} {'min ms':>8}  heavy modules loaded")
+    for label, statement in TARGETS:
+        runs = [time_import(statement, env) for _ in range(args.repeat)]
+        seconds = [s for s, _ in runs]
+        row = {
+            "target": label,
+            "median_ms": round(statistics.median(seconds) * 1000, 1),
+            "min_ms": round(min(seconds) * 1000, 1),
+            "loaded": runs[-1][1],
+        }
+        rows.append(row)
+        print(f"{label:<28} {row['median_ms']:>10.1f} {row['min_ms']:>8.1f}  {', '.join(row['loaded']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+LLM client benchmark: concurrent sessions against a local fake model server.
+
+    python lakshya_agent/benchmarks/llm_client.py [--sessions 16] [--requests 8] [--distinct 6] [--json out.json]
+
+Every scenario sends the same workload (each session asks `requests` prompts drawn
+from `distinct` shared ones) to a FakeModelServer with a fixed per-call latency:
+
+- direct:    the raw client, one HTTP call per prompt
+- coalesce:  CoalescingLLM, identical in-flight prompts share one call
+- batch:     CoalescingLLM with a micro-batch window (one /batch call per window)
+- rate:      CoalescingLLM limited to --rpm requests per minute
+
+It reports wall time, model calls and prompts seen by the server, the server's
+peak concurrency and p50/p95 latency per request. No API key is needed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def build_client(scenario, url, args):
+    from tools.fake_model_server import FakeModelClient
+    from tools.llm_client import CoalescingLLM
+
+    client = FakeModelClient(url)
+    if scenario == "direct":
+        return client
+    if scenario == "coalesce":
+        return CoalescingLLM(client)
+    if scenario == "batch":
+        return CoalescingLLM(client, batch_window=args.batch_ms / 1000)
+    if scenario == "rate":
+        return CoalescingLLM(client, rate=args.rpm / 60, burst=max(1.0, args.rpm / 60))
+    raise ValueError(f"unknown scenario {scenario!r}")
+
+
+def run_scenario(scenario, args):
+    """Runs the workload once against a fresh server; returns one summary row."""
+    from tools.fake_model_server import FakeModelServer
+
+    server = FakeModelServer(latency=args.latency).start()
+    try:
+        client = build_client(scenario, server.url, args)
+        prompts = [f"Question {i}: how is my portfolio doing?" for i in range(args.distinct)]
+
+        def session(session_no):
+            latencies = []
+            for i in range(args.requests):
+                started = time.perf_counter()
+                client.invoke(prompts[(session_no + i) % len(prompts)])
+                latencies.append(time.perf_counter() - started)
+            return latencies
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            latencies = [s for run in pool.map(session, range(args.sessions)) for s in run]
+        wall = time.perf_counter() - started
+    finally:
+        server.stop()
+    return {
+        "scenario": scenario,
+        "requests": len(latencies),
+        "wall_s": round(wall, 3),
+        "model_calls": server.calls,
+        "prompts_sent": server.prompts,
+        "peak_concurrency": server.peak_concurrency,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent sessions")
+    parser.add_argument("--requests", type=int, default=8, help="prompts per session")
+    parser.add_argument("--distinct", type=int, default=6, help="distinct prompts shared by the sessions")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model seconds per call")
+    parser.add_argument("--batch-ms", type=float, default=20, help="micro-batch window for 'batch'")
+    parser.add_argument("--rpm", type=float, default=600, help="requests per minute for 'rate'")
+    parser.add_argument("--scenarios", default="direct,coalesce,batch,rate")
+    parser.add_argument("--json", help="also write the rows to this file")
+    args = parser.parse_args(argv)
+
+    rows = []
+    print(f"{'scenario':<10} {'wall s':>7} {'calls':>6} {'prompts':>8} {'peak':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    for scenario in args.scenarios.split(","):
+        row = run_scenario(scenario.strip(), args)
+        rows.append(row)
+        print(f"{row['scenario']:<10} {row['wall_s']:>7.2f} {row['model_calls']:>6} {row['prompts_sent']:>8} "
+              f"{row['peak_concurrency']:>5} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=1)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
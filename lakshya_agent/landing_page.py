@@ -2,17 +2,23 @@ import streamlit as st
 import sys
 import os
 import json
+import logging
+import threading
 
 # --- Path Setup & Imports ---
 # Add project root to path to allow imports from other directories
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Import agent and component functions
-from tools.root_agent import invoke_agent
-from tools.mcp_loader import load_mcp_snapshot
-from components.health_score import display_health_score, calculate_financial_health_score, get_health_score_zone
+from tools.asset_index import asset_index, build_asset_index
+from tools.mcp_loader import load_mcp_snapshot, snapshot_version
+from tools.price_feed import ensure_price_feed, live_snapshot
+from tools.financial_digest import financial_digest
+from components.health_score import display_health_score, health_score, get_health_score_zone
 from components.net_worth_trend import display_net_worth_trend
 from components.loan_calculator import display_loan_calculator
+from components.sensitivity_tornado import display_sensitivity_tornado
+from components.memo import memo
 
 # --- Page Configuration & Styling ---
 st.set_page_config(
@@ -383,14 +389,6 @@ st.markdown("""
 
 
 
-def get_asset_value(asset):
-    if isinstance(asset, list):
-        return sum(item.get("current_value", 0) if isinstance(item, dict) else 0 for item in asset)
-    elif isinstance(asset, (int, float)):
-        return asset
-    return 0
-
-
 def get_financial_insights(snapshot):
     """
     Computes personalized insights from the mcp_snapshot.json data.
@@ -399,7 +397,7 @@ def get_financial_insights(snapshot):
     insights = {}
 
     # Use the shared health score function
-    score = calculate_financial_health_score(snapshot)
+    score = health_score(snapshot)
     zone, zone_label = get_health_score_zone(score)
     insights['health_score'] = f"{score}/100"
     insights['health_zone'] = zone
@@ -408,24 +406,24 @@ def get_financial_insights(snapshot):
     # Calculate EMI and cash reserve as before
     income = snapshot.get('income', {}).get('monthly_salary', 0) or snapshot.get('monthly_income', 0) or 75000
     expenses = snapshot.get('expenses', {}).get('total_monthly_expenses', 0) or snapshot.get('monthly_expenses', 0) or 45000
-    assets = snapshot.get('assets', {}) or {
-        'cash': 50000,
-        'savings_account': 200000,
-        'stocks': 300000,
-        'mutual_funds': 150000,
-        'real_estate': 2000000
-    }
+    if snapshot.get('assets'):
+        index = asset_index(snapshot, memo.version(snapshot))
+    else:
+        index = build_asset_index({
+            'bank_balance': 250000,
+            'stocks': 300000,
+            'mutual_funds': 150000,
+            'real_estate': 2000000
+        })
     surplus = income - expenses
     max_emi = surplus * 0.40 if surplus > 0 else 0
     insights['max_emi'] = f"₹{max_emi:,.0f}"
 
-    liquid_assets = assets.get('cash', 0) + assets.get('savings_account', 0)
+    liquid_assets = index.value('bank_balance')
     reserve_months = liquid_assets / expenses if expenses > 0 else 0
     insights['cash_reserve'] = f"{reserve_months:.1f} months"
 
-    stocks_val = get_asset_value(assets.get('stocks', 0))
-    mf_val = get_asset_value(assets.get('mutual_funds', 0))
-    investments = stocks_val + mf_val
+    investments = index.value('stocks', 'mutual_funds')
     if investments > 500000:
         insights['retirement_insight'] = "Your investment portfolio shows excellent diversification for long-term wealth building."
     elif investments > 100000:
@@ -436,6 +434,11 @@ def get_financial_insights(snapshot):
 
 # --- UI Rendering Functions ---
 
+# Chat history: messages kept per session, and how many render before "Show earlier messages"
+MAX_CHAT_HISTORY = 200
+CHAT_PAGE_SIZE = 20
+WELCOME_MESSAGE = "Good day! I'm here to provide sophisticated financial guidance tailored to your wealth management needs. How may I assist you?"
+
 def display_landing_page(snapshot):
     """Renders the main landing page with chatbot and insights."""
     st.title("Lakshya")
@@ -444,93 +447,143 @@ def display_landing_page(snapshot):
     # --- Reversed Layout: Insights on Left, Chat on Right ---
     col1, col2 = st.columns([1.3, 2]) # Insights column slightly wider, chat on right
 
+    # Each column is a fragment: a chat message reruns only the chat
     with col1:
-        # --- Personalized Insights Section ---
-        st.header("Wealth Insights")
-        insights = get_financial_insights(snapshot)
-        score = float(insights['health_score'].split('/')[0])
-        zone = insights['health_zone']
-        zone_label = insights['health_zone_label']
-        zone_color = {"green": "#28a745", "yellow": "#ffc107", "red": "#dc3545"}[zone]
-
-        # Unified health score display
-        st.markdown(
-            f"""
-            <div style="display:flex;align-items:center;">
-                <span style="font-size:2.5rem;font-weight:700;color:{zone_color};margin-right:0.5rem;">{score}</span>
-                <span style="font-size:1.2rem;font-weight:600;color:{zone_color};">{zone_label} Zone</span>
-            </div>
-            <div style="color:#aaa;font-size:0.95rem;margin-bottom:1.2rem;">Financial Health Score (out of 100)</div>
-            """,
-            unsafe_allow_html=True
-        )
-
-        st.metric(
-            label="🏆 Maximum Affordable EMI",
-            value=insights['max_emi'],
-            help="40% of your surplus monthly income for optimal financial health"
-        )
-        st.metric(
-            label="🛡️ Emergency Reserve",
-            value=insights['cash_reserve'],
-            help="Liquid assets coverage based on monthly expenses"
-        )
-
-        st.markdown("---")
-        st.subheader("Wealth Advisory")
-        st.info(insights['retirement_insight'])
-
-        st.markdown("---")
-
-        if st.button("View Executive Dashboard", type="primary"):
-            st.session_state.view = 'dashboard'
-            st.rerun()
-
-        st.subheader("How may I assist you today?")
-        st.markdown("""
-        **• Strategic savings optimization**  
-        **• Portfolio rebalancing strategies**  
-        **• Tax efficiency planning**  
-        **• Investment timing optimization**
-        """)
+        display_insights_column(snapshot)
 
     with col2:
-        # --- Agent Chatbot Interface ---
-        st.header("Financial Advisor")
-
-        # Create a styled container for the chat area
-        with st.container():
-            # Initialize chat history
-            if "messages" not in st.session_state:
-                st.session_state.messages = [{"role": "assistant", "content": "Good day! I'm here to provide sophisticated financial guidance tailored to your wealth management needs. How may I assist you?"}]
-
-            # Display chat history in a scrollable container
-            chat_container = st.container()
-            with chat_container:
-                for message in st.session_state.messages:
-                    with st.chat_message(message["role"]):
-                        st.markdown(message["content"])
-
-            # User input at the bottom
-            if prompt := st.chat_input("Ask about investments, wealth planning, portfolio optimization..."):
-                st.session_state.messages.append({"role": "user", "content": prompt})
-                with st.chat_message("user"):
-                    st.markdown(prompt)
-
-                # Generate and display agent response
-                with st.chat_message("assistant"):
-                    with st.spinner("Analyzing your financial query..."):
-                        try:
-                            response = invoke_agent(prompt)
-                            st.markdown(response)
-                            st.session_state.messages.append({"role": "assistant", "content": response})
-                        except Exception as e:
-                            error_message = (
-                                "Sorry, an error occurred while processing your request. "
-                                "Please try again or rephrase your question."
-                            )
-                            st.error(error_message)
-                            st.session_state.messages.append({"role": "assistant", "content": error_message})
+        display_chat()
+
+@st.fragment
+def display_insights_column(snapshot):
+    """Personalized insights, the dashboard button and suggested questions."""
+    st.header("Wealth Insights")
+    insights = memo.get(snapshot, "insights", get_financial_insights)
+    score = float(insights['health_score'].split('/')[0])
+    zone = insights['health_zone']
+    zone_label = insights['health_zone_label']
+    zone_color = {"green": "#28a745", "yellow": "#ffc107", "red": "#dc3545"}[zone]
+
+    # Unified health score display
+    st.markdown(
+        f"""
+        <div style="display:flex;align-items:center;">
+            <span style="font-size:2.5rem;font-weight:700;color:{zone_color};margin-right:0.5rem;">{score}</span>
+            <span style="font-size:1.2rem;font-weight:600;color:{zone_color};">{zone_label} Zone</span>
+        </div>
+        <div style="color:#aaa;font-size:0.95rem;margin-bottom:1.2rem;">Financial Health Score (out of 100)</div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    st.metric(
+        label="🏆 Maximum Affordable EMI",
+        value=insights['max_emi'],
+        help="40% of your surplus monthly income for optimal financial health"
+    )
+    st.metric(
+        label="🛡️ Emergency Reserve",
+        value=insights['cash_reserve'],
+        help="Liquid assets coverage based on monthly expenses"
+    )
+
+    st.markdown("---")
+    st.subheader("Wealth Advisory")
+    st.info(insights['retirement_insight'])
+
+    st.markdown("---")
+
+    if st.button("View Executive Dashboard", type="primary"):
+        st.session_state.view = 'dashboard'
+        st.rerun(scope="app")
+
+    st.subheader("How may I assist you today?")
+    st.markdown("""
+    **• Strategic savings optimization**  
+    **• Portfolio rebalancing strategies**  
+    **• Tax efficiency planning**  
+    **• Investment timing optimization**
+    """)
+
+def _append_message(role, content):
+    """Adds a chat message, keeping at most MAX_CHAT_HISTORY per session."""
+    messages = st.session_state.messages
+    messages.append({"role": role, "content": content})
+    if len(messages) > MAX_CHAT_HISTORY:
+        del messages[:-MAX_CHAT_HISTORY]
+
+def _page_in_messages():
+    st.session_state.chat_window += CHAT_PAGE_SIZE
+
+@st.fragment
+def display_chat():
+    """Agent chatbot: renders the latest CHAT_PAGE_SIZE messages, older ones on request."""
+    st.header("Financial Advisor")
+
+    # Create a styled container for the chat area
+    with st.container():
+        # Initialize chat history
+        if "messages" not in st.session_state:
+            st.session_state.messages = [{"role": "assistant", "content": WELCOME_MESSAGE}]
+        if "chat_window" not in st.session_state:
+            st.session_state.chat_window = CHAT_PAGE_SIZE
+
+        messages = st.session_state.messages
+        hidden = max(0, len(messages) - st.session_state.chat_window)
+        if hidden:
+            st.button(f"Show earlier messages ({hidden})", key="chat_show_earlier", on_click=_page_in_messages)
+
+        # Display the recent window of chat history
+        chat_container = st.container()
+        with chat_container:
+            for message in messages[hidden:]:
+                with st.chat_message(message["role"]):
+                    st.markdown(message["content"])
+
+        # User input at the bottom
+        if prompt := st.chat_input("Ask about investments, wealth planning, portfolio optimization..."):
+            _append_message("user", prompt)
+            with st.chat_message("user"):
+                st.markdown(prompt)
+
+            # Generate and display agent response
+            with st.chat_message("assistant"):
+                status = st.status("Analyzing your financial query...", expanded=False)
+                result = {}
+                try:
+                    st.write_stream(_answer_tokens(prompt, status, result))
+                    response = result.get("output", "")
+                    status.update(label="Analysis complete", state="complete")
+                    _append_message("assistant", response)
+                except Exception as e:
+                    status.update(label="Analysis failed", state="error")
+                    error_message = (
+                        "Sorry, an error occurred while processing your request. "
+                        "Please try again or rephrase your question."
+                    )
+                    st.error(error_message)
+                    _append_message("assistant", error_message)
+
+def _answer_tokens(prompt, status, result):
+    """Yields answer text for st.write_stream, reporting tool progress in the status box."""
+    from tools.root_agent import stream_agent
+
+    for event in stream_agent(prompt):
+        if event["type"] == "tool_start":
+            status.update(label=f"Running {event['tool']}...")
+            status.write(f"🔧 {event['tool']}")
+        elif event["type"] == "tool_end":
+            status.write(f"✅ {event['tool']} finished")
+        elif event["type"] == "token":
+            yield event["text"]
+        elif event["type"] == "final":
+            result["output"] = event["output"]
+
+# Dashboard sections as fragments: a widget change reruns only its own section
+net_worth_section = st.fragment(display_net_worth_trend)
+loan_calculator_section = st.fragment(display_loan_calculator)
+health_score_section = st.fragment(display_health_score)
+sensitivity_section = st.fragment(display_sensitivity_tornado)
 
 def display_full_dashboard(snapshot):
     """Renders the detailed dashboard view."""
@@ -541,14 +594,35 @@ def display_full_dashboard(snapshot):
         st.rerun()
 
     st.header("Net Worth Analysis")
-    display_net_worth_trend(snapshot)
+    net_worth_section(snapshot)
 
     st.header("Loan Optimization Calculator")
-    display_loan_calculator(snapshot)
+    loan_calculator_section(snapshot)
 
     st.header("Comprehensive Financial Health Assessment")
-    display_health_score(snapshot)
+    health_score_section(snapshot)
 
+    st.header("Assumption Sensitivity")
+    sensitivity_section(snapshot)
+
+    with st.expander("Dashboard cache"):
+        st.json(memo.stats())
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _prewarm_agent(version, _snapshot):
+    """Once per snapshot file version (not per price tick): digest the snapshot and load the agent in a background thread."""
+    def run():
+        try:
+            financial_digest(_snapshot)
+            from tools.root_agent import warm_up
+            warm_up()
+        except Exception:
+            logging.getLogger("lakshya.agent").exception("Agent warm-up failed")
+
+    thread = threading.Thread(target=run, name="agent-warm-up", daemon=True)
+    thread.start()
+    return thread
 
 # --- Main Application Logic ---
 def main():
@@ -562,6 +636,13 @@ def main():
         st.error("mcp_snapshot.json not found. Please ensure the file is present in the project root.")
         return
 
+    # Overlay streamed prices (LAKSHYA_PRICE_FEED) without re-reading the snapshot
+    ensure_price_feed(snapshot)
+    file_version = snapshot_version(snapshot)
+    snapshot = live_snapshot(snapshot)
+    # Build the agent's context digest (and load the agent) off the render path
+    _prewarm_agent(file_version, snapshot)
+
     # Render the appropriate view
     if st.session_state.view == 'landing':
         display_landing_page(snapshot)
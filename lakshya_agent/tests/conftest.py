@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Modules import each other as `tools.*`, the way the Streamlit app runs them
+sys.path[:0] = [os.path.join(ROOT, "lakshya_agent"), ROOT]
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+
+@pytest.fixture
+def repo_root():
+    """The checkout root; the snapshot loader reads lakshya_agent/mcp_snapshot.json relative to it."""
+    return ROOT
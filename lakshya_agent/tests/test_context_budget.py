@@ -0,0 +1,38 @@
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.tools import tool
+
+from tools.context_budget import estimate_tokens
+from tools.response_cache import ResponseCache
+from tools.root_agent import build_agent_executor, context_budget, invoke_agent
+
+
+class RecordingLLM(FakeListLLM):
+    seen: list = []
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        self.seen.append(prompt)
+        return super()._call(prompt, stop, run_manager, **kwargs)
+
+
+@tool
+def echo(text: str) -> str:
+    """Returns its input."""
+    return "echo: " + text * 50
+
+
+def test_react_run_records_every_rendered_prompt(monkeypatch, repo_root):
+    monkeypatch.chdir(repo_root)
+    llm = RecordingLLM(responses=["Thought: check\nAction: echo\nAction Input: hello",
+                                  "Thought: I now know the final answer\nFinal Answer: done"], seen=[])
+    executor = build_agent_executor(llm, [echo])
+
+    assert invoke_agent("What is my balance?", executor=executor, cache=ResponseCache(), use_router=False) == "done"
+
+    usage = context_budget.usage
+    assert usage.prompts == len(llm.seen) == 2
+    assert set(usage.sections) == {"template", "tools", "financial_context", "question", "scratchpad"}
+    for recorded, prompt in zip(usage.per_prompt, llm.seen):
+        # Sections are counted separately, so rounding and the template's placeholders differ slightly
+        assert abs(recorded - estimate_tokens(prompt)) <= 40
+    assert usage.per_prompt[1] > usage.per_prompt[0]
+    assert usage.prompt_tokens == sum(usage.per_prompt)
@@ -0,0 +1,27 @@
+import pytest
+
+from tools.intent_router import route
+
+
+@pytest.mark.parametrize("query", [
+    "can I afford a 50 lakh loan",
+    "income 50000, credit score 750, loan eligibility?",
+    "How much EMI do I pay on my car loan?",
+    "Can I afford a loan?",
+    "Am I eligible for a ₹20,00,000 home loan?",
+])
+def test_loan_questions_the_tool_cannot_answer_go_to_the_agent(query):
+    decision = route(query)
+    assert not decision.fast_path, decision.reason
+    assert "check_loan_eligibility" not in decision.tools
+
+
+@pytest.mark.parametrize("query", [
+    "Am I eligible for a loan?",
+    "How much can I borrow?",
+    "check my loan eligibility",
+])
+def test_explicit_eligibility_questions_route_to_the_tool(query):
+    decision = route(query)
+    assert decision.fast_path
+    assert decision.tools == ["check_loan_eligibility"]
@@ -0,0 +1,28 @@
+from tools.memory_writer import WriteBehindMemory
+
+
+class ListBackend:
+    def __init__(self):
+        self.rows = []
+
+    def add_many(self, texts, metadatas):
+        self.rows.extend(zip(texts, metadatas))
+
+
+def test_same_summary_is_kept_per_user_and_snapshot_version():
+    backend = ListBackend()
+    writer = WriteBehindMemory(batch_size=100, flush_interval=60)
+    try:
+        summary = "Loan eligibility: ₹12,00,000"
+        for user in ("alice", "bob"):
+            for version in ("v1", "v2"):
+                meta = {"source_tool": "loan", "user_id": user, "snapshot_version": version}
+                assert writer.enqueue(backend, summary, meta)
+        # Same user, tool and version: still a duplicate, pending or written
+        assert not writer.enqueue(backend, summary, {"source_tool": "loan", "user_id": "alice", "snapshot_version": "v1"})
+        assert writer.flush()
+        assert not writer.enqueue(backend, summary, {"source_tool": "loan", "user_id": "bob", "snapshot_version": "v2"})
+    finally:
+        writer.close()
+    assert sorted((m["user_id"], m["snapshot_version"]) for _, m in backend.rows) == [
+        ("alice", "v1"), ("alice", "v2"), ("bob", "v1"), ("bob", "v2")]
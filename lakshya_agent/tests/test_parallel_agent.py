@@ -0,0 +1,34 @@
+import pytest
+
+from tools.parallel_agent import ParallelToolAgent
+
+
+class NoStopLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return "Final Answer: done"
+
+
+class BrokenLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt, stop=None):
+        self.calls += 1
+        raise TypeError("bad payload")
+
+
+def test_llm_without_stop_is_called_once():
+    llm = NoStopLLM()
+    assert ParallelToolAgent(llm, []).invoke({"input": "hi"})["output"] == "done"
+    assert llm.calls == 1
+
+
+def test_type_error_inside_the_model_call_is_not_retried():
+    llm = BrokenLLM()
+    with pytest.raises(TypeError, match="bad payload"):
+        ParallelToolAgent(llm, []).invoke({"input": "hi"})
+    assert llm.calls == 1
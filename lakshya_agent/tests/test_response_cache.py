@@ -0,0 +1,31 @@
+import zlib
+
+import numpy as np
+
+from tools.response_cache import ResponseCache
+
+
+def _embed(text):
+    vector = np.zeros(64)
+    for word in text.split():
+        vector[zlib.crc32(word.encode()) % 64] += 1
+    return vector
+
+
+def test_late_put_for_an_older_version_keeps_the_current_entries():
+    cache = ResponseCache()
+    cache.get("net worth?", "v1")
+    cache.get("net worth?", "v2")
+    cache.put("net worth?", "v2", "current")
+    cache.put("sip returns?", "v1", "stale")
+    assert cache.get("net worth?", "v2") == "current"
+    assert cache.get("sip returns?", "v2") is None
+
+
+def test_similar_phrasing_hits_within_a_version():
+    cache = ResponseCache(embed_fn=_embed, similarity_threshold=0.8)
+    cache.get("how is my net worth trend", "v1")
+    cache.put("how is my net worth trend", "v1", "up 12%")
+    assert cache.get("how is my net worth trend now", "v1") == "up 12%"
+    assert cache.similar_hits == 1
+    assert cache.get("how is my net worth trend now", "v2") is None
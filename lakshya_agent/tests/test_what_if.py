@@ -0,0 +1,13 @@
+from tools.what_if import SnapshotOverlay
+
+
+def test_set_after_delete_starts_from_an_empty_section():
+    base = {"a": {"x": 1, "y": 2}, "b": 3}
+    overlay = SnapshotOverlay(base).delete("a").set("a.z", 1)
+    assert overlay["a"] == {"z": 1}
+    assert base == {"a": {"x": 1, "y": 2}, "b": 3}
+
+
+def test_set_without_delete_keeps_the_base_keys():
+    overlay = SnapshotOverlay({"a": {"x": 1}}).set("a.z", 1)
+    assert overlay["a"] == {"x": 1, "z": 1}
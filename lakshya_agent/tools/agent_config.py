@@ -0,0 +1,23 @@
+# tools/agent_config.py
+import os
+
+import yaml
+
+AGENT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent.yaml")
+
+_cache = {}
+
+def load_agent_config(path: str = None) -> dict:
+    """Reads agent.yaml, re-parsing only when the file changes on disk."""
+    path = path or os.getenv("LAKSHYA_AGENT_CONFIG", AGENT_CONFIG_PATH)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    _cache[path] = (mtime, config)
+    return config
@@ -0,0 +1,291 @@
+# tools/agent_service.py
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Set
+
+from .tracing import histograms
+
+logger = logging.getLogger("lakshya.service")
+
+
+class ServiceOverloaded(Exception):
+    """Raised when the request queue is full; callers should retry later."""
+
+
+class RequestTimeout(Exception):
+    """Raised when a request waits and runs longer than the service timeout."""
+
+
+@dataclass
+class Session:
+    user_id: str
+    created: float
+    last_active: float
+    history: List[Dict] = field(default_factory=list)
+    tasks: Set[asyncio.Task] = field(default_factory=set)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    requests: int = 0
+
+
+def default_runner(query: str) -> str:
+    # Imported on first use so the service can run against a fake runner without an API key
+    from .root_agent import invoke_agent
+    return invoke_agent(query)
+
+
+def make_runner(executor=None, cache=None, llm_client=None, use_router: bool = True) -> Callable[[str], str]:
+    """Runner around invoke_agent with injectable executor/cache/LLM (e.g. a fake LLM in tests)."""
+    def run(query: str) -> str:
+        from .root_agent import invoke_agent
+        return invoke_agent(query, executor=executor, cache=cache, llm_client=llm_client, use_router=use_router)
+    return run
+
+
+class AgentService:
+    """Runs blocking agent calls for many users without letting them pile up.
+
+    At most `max_workers` requests run at once on a thread pool; up to
+    `max_queue` more wait for a slot and anything beyond that is rejected with
+    ServiceOverloaded. Each user has a session whose requests run one at a time,
+    so a single user cannot occupy every worker. `timeout` covers queueing and
+    running; a timed-out or cancelled call's result is discarded, but the worker
+    thread finishes its current call and keeps its slot, the user's session lock
+    and its place in the in-flight count until then.
+    """
+
+    def __init__(self, runner: Callable[[str], str] = None, max_workers: int = 4, max_queue: int = 32,
+                 timeout: float = 60.0, history_size: int = 20, session_ttl: float = 1800.0):
+        self.runner = runner or default_runner
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.history_size = history_size
+        self.session_ttl = session_ttl
+        self.sessions: Dict[str, Session] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lakshya-agent")
+        self._slots = asyncio.Semaphore(max_workers)
+        self._pending = 0
+        self._abandoned = 0  # runs still on the pool after their caller timed out or cancelled
+        self.stats_counts = {"completed": 0, "rejected": 0, "timed_out": 0, "cancelled": 0, "failed": 0}
+
+    def session(self, user_id: str) -> Session:
+        now = time.monotonic()
+        session = self.sessions.get(user_id)
+        if session is None:
+            session = self.sessions[user_id] = Session(user_id, created=now, last_active=now)
+        session.last_active = now
+        return session
+
+    async def ask(self, user_id: str, query: str) -> Dict:
+        """Answers `query` for `user_id`; raises ServiceOverloaded, RequestTimeout or CancelledError."""
+        if self._pending >= self.max_workers + self.max_queue:
+            self.stats_counts["rejected"] += 1
+            raise ServiceOverloaded(f"{self._pending} requests in flight")
+        session = self.session(user_id)
+        task = asyncio.current_task()
+        session.tasks.add(task)
+        session.requests += 1
+        self._pending += 1
+        queued_at = time.perf_counter()
+        timing = {}
+        try:
+            output = await asyncio.wait_for(self._run(session, query, timing), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats_counts["timed_out"] += 1
+            raise RequestTimeout(f"no answer within {self.timeout}s") from None
+        except asyncio.CancelledError:
+            self.stats_counts["cancelled"] += 1
+            raise
+        except Exception:
+            self.stats_counts["failed"] += 1
+            raise
+        finally:
+            session.tasks.discard(task)
+            run = timing.get("future")
+            if run is None:
+                # Never reached the pool: nothing else will release this request
+                self._pending -= 1
+            elif not run.done():
+                self._abandoned += 1
+                timing["abandoned"] = True
+        self.stats_counts["completed"] += 1
+        session.history.append({"query": query, "output": output})
+        del session.history[:-self.history_size]
+        return {
+            "user_id": user_id,
+            "output": output,
+            "queue_wait_s": round(timing["started"] - queued_at, 4),
+            "run_s": round(time.perf_counter() - timing["started"], 4),
+        }
+
+    async def _run(self, session: Session, query: str, timing: Dict) -> str:
+        await session.lock.acquire()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            session.lock.release()
+            raise
+        timing["started"] = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pool, self.runner, query)
+        timing["future"] = future
+
+        def release(done):
+            # The slot, the session lock and the in-flight count are held until the thread finishes
+            if not done.cancelled():
+                done.exception()  # retrieved here so abandoned failures aren't reported as unhandled
+            self._slots.release()
+            session.lock.release()
+            self._pending -= 1
+            if timing.pop("abandoned", False):
+                self._abandoned -= 1
+
+        future.add_done_callback(release)
+        # A timeout or cancel stops the wait, not the run
+        return await asyncio.shield(future)
+
+    def cancel_session(self, user_id: str) -> int:
+        """Cancels the user's queued and running requests (e.g. when they navigate away)."""
+        session = self.sessions.get(user_id)
+        if session is None:
+            return 0
+        tasks = [t for t in session.tasks if not t.done()]
+        for t in tasks:
+            t.cancel()
+        return len(tasks)
+
+    def close_session(self, user_id: str) -> int:
+        cancelled = self.cancel_session(user_id)
+        self.sessions.pop(user_id, None)
+        return cancelled
+
+    def expire_sessions(self) -> int:
+        """Drops idle sessions with nothing in flight."""
+        cutoff = time.monotonic() - self.session_ttl
+        idle = [uid for uid, s in self.sessions.items() if s.last_active < cutoff and not s.tasks]
+        for uid in idle:
+            del self.sessions[uid]
+        return len(idle)
+
+    def stats(self) -> Dict:
+        return {
+            **self.stats_counts,
+            "in_flight": self._pending,
+            "abandoned_running": self._abandoned,
+            "sessions": len(self.sessions),
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "spans": histograms.summary(),
+        }
+
+    def shutdown(self):
+        for uid in list(self.sessions):
+            self.cancel_session(uid)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Local HTTP server (JSON over HTTP/1.1, one request per connection) ---
+_STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+                499: "Client Closed Request", 500: "Internal Server Error", 504: "Gateway Timeout"}
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+    headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+    length = int(headers.get("content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload: Dict):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+    )
+
+
+async def _ask_until_disconnect(service: AgentService, reader: asyncio.StreamReader, user_id: str, query: str):
+    # A client that hangs up has navigated away: its request is cancelled
+    ask = asyncio.ensure_future(service.ask(user_id, query))
+    hangup = asyncio.ensure_future(reader.read(1))
+    done, _ = await asyncio.wait({ask, hangup}, return_when=asyncio.FIRST_COMPLETED)
+    if ask in done:
+        hangup.cancel()
+        return ask.result()
+    if hangup.result():
+        # Extra bytes from a live client are not a hang-up
+        return await ask
+    ask.cancel()
+    raise asyncio.CancelledError
+
+
+async def handle_http(service: AgentService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Routes: POST /ask {"user_id", "query"}, DELETE /sessions/<user_id>, GET /stats."""
+    status, payload = 500, {"error": "internal error"}
+    try:
+        method, path, body = await _read_request(reader)
+        if method == "POST" and path == "/ask":
+            data = json.loads(body or b"{}")
+            if not data.get("query"):
+                status, payload = 400, {"error": "'query' is required"}
+            else:
+                payload = await _ask_until_disconnect(service, reader, str(data.get("user_id", "anonymous")),
+                                                      data["query"])
+                status = 200
+        elif method == "DELETE" and path.startswith("/sessions/"):
+            status, payload = 200, {"cancelled": service.close_session(path[len("/sessions/"):])}
+        elif method == "GET" and path == "/stats":
+            status, payload = 200, service.stats()
+        else:
+            status, payload = 404, {"error": f"no route for {method} {path}"}
+    except ServiceOverloaded as e:
+        status, payload = 429, {"error": f"service overloaded: {e}"}
+    except RequestTimeout as e:
+        status, payload = 504, {"error": str(e)}
+    except asyncio.CancelledError:
+        status, payload = 499, {"error": "request cancelled"}
+    except (ValueError, asyncio.IncompleteReadError) as e:
+        status, payload = 400, {"error": f"malformed request: {e}"}
+    except Exception as e:
+        logger.exception("Agent request failed")
+        status, payload = 500, {"error": str(e)}
+    try:
+        _write_response(writer, status, payload)
+        await writer.drain()
+        writer.close()
+    except ConnectionError:
+        pass
+
+
+async def serve(service: AgentService, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+    """Starts the HTTP front end; the caller owns the returned server."""
+    return await asyncio.start_server(lambda r, w: handle_http(service, r, w), host, port)
+
+
+async def _main():
+    logging.basicConfig(level=logging.INFO)
+    service = AgentService(
+        max_workers=int(os.getenv("LAKSHYA_SERVICE_WORKERS", 4)),
+        max_queue=int(os.getenv("LAKSHYA_SERVICE_QUEUE", 32)),
+        timeout=float(os.getenv("LAKSHYA_SERVICE_TIMEOUT", 60)),
+    )
+    server = await serve(service, os.getenv("LAKSHYA_SERVICE_HOST", "127.0.0.1"),
+                         int(os.getenv("LAKSHYA_SERVICE_PORT", 8765)))
+    logger.info("Agent service listening on %s", ", ".join(str(s.getsockname()) for s in server.sockets))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -11,6 +11,33 @@ class AnomalyDetectionInput(BaseModel):
 class AnomalyDetectionOutput(BaseModel):
     anomalies: str
 
+def flag_anomalies(data: Dict) -> List[str]:
+    """Rule-based flags: low bank balance, negative fund returns, low credit score, high liabilities."""
+    anomalies = []
+
+    # Check for low bank balance
+    bank_balance = data.get("assets", {}).get("bank_balance", 0)
+    if bank_balance < 10000:
+        anomalies.append(f"⚠️ Bank balance is quite low: ₹{bank_balance:,}")
+
+    # Check for negative returns in mutual funds
+    mutual_funds = data.get("assets", {}).get("mutual_funds", [])
+    for fund in mutual_funds:
+        if fund.get("returns", 0) < 0:
+            anomalies.append(f"🔻 Negative return in SIP: {fund['name']} → {fund['returns']}%")
+
+    # Check for credit score drop
+    credit_score = data.get("credit_score", 0)
+    if credit_score and credit_score < 650:
+        anomalies.append(f"⚠️ Low credit score detected: {credit_score}")
+
+    # Check for high liabilities
+    liabilities = data.get("liabilities", {})
+    total_liabilities = sum(liabilities.values())
+    if total_liabilities > 1000000:
+        anomalies.append(f"💸 High total liabilities: ₹{total_liabilities:,}")
+    return anomalies
+
 class AnomalyDetectionTool(BaseTool):
     def __init__(self):
         super().__init__(
@@ -21,29 +48,7 @@ class AnomalyDetectionTool(BaseTool):
     def __call__(self, input: AnomalyDetectionInput, context: ToolContext) -> AnomalyDetectionOutput:
        try:
         data = input.financial_data
-        anomalies = []
-
-        # Check for low bank balance
-        bank_balance = data.get("assets", {}).get("bank_balance", 0)
-        if bank_balance < 10000:
-            anomalies.append(f"⚠️ Bank balance is quite low: ₹{bank_balance:,}")
-
-        # Check for negative returns in mutual funds
-        mutual_funds = data.get("assets", {}).get("mutual_funds", [])
-        for fund in mutual_funds:
-            if fund.get("returns", 0) < 0:
-                anomalies.append(f"🔻 Negative return in SIP: {fund['name']} → {fund['returns']}%")
-
-        # Check for credit score drop
-        credit_score = data.get("credit_score", 0)
-        if credit_score and credit_score < 650:
-            anomalies.append(f"⚠️ Low credit score detected: {credit_score}")
-
-        # Check for high liabilities
-        liabilities = data.get("liabilities", {})
-        total_liabilities = sum(liabilities.values())
-        if total_liabilities > 1000000:
-            anomalies.append(f"💸 High total liabilities: ₹{total_liabilities:,}")
+        anomalies = flag_anomalies(data)
 
         # Handle the results
         if not anomalies:
@@ -75,6 +80,13 @@ import json
 from .mcp_loader import load_mcp_snapshot
 import numpy as np
 
+def expense_anomalies(expenses: List[float]):
+    """Months whose expenses exceed mean + 2 std; returns (anomalies, mean, threshold)."""
+    mean = np.mean(expenses)
+    std = np.std(expenses)
+    threshold = mean + 2 * std
+    return [e for e in expenses if e > threshold], mean, threshold
+
 @tool
 def detect_anomaly(_: str = "") -> str:
     """
@@ -86,10 +98,7 @@ def detect_anomaly(_: str = "") -> str:
     expenses = [m["expenses"] for m in data.get("expense_history", [])]
     if not expenses:
         return "No expense history found."
-    mean = np.mean(expenses)
-    std = np.std(expenses)
-    threshold = mean + 2 * std
-    anomalies = [e for e in expenses if e > threshold]
+    anomalies, mean, threshold = expense_anomalies(expenses)
     if anomalies:
         return f"Anomalies detected: {anomalies}. Mean: {mean:.2f}, Threshold: {threshold:.2f}"
     else:
@@ -0,0 +1,125 @@
+# tools/asset_index.py
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .mcp_loader import snapshot_version
+
+ASSET_CLASSES = ["equity", "debt", "cash", "real_estate"]
+# Liquid classes the allocation weights compare; real estate is illiquid and reported on its own
+INVESTABLE_CLASSES = ["equity", "debt", "cash"]
+
+# Snapshot asset keys and the class they roll up into
+CATEGORY_CLASSES = {
+    "mutual_funds": "equity",
+    "stocks": "equity",
+    "epf": "debt",
+    "fixed_deposits": "debt",
+    "bank_balance": "cash",
+    "real_estate": "real_estate",
+}
+
+_CACHE_SIZE = 8
+
+_cache: "OrderedDict[str, AssetIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def holding_value(item) -> float:
+    """Value of one holding: `current_value`, else `amount` (fixed deposits); plain numbers as-is."""
+    if isinstance(item, dict):
+        value = item.get("current_value")
+        if value is None:
+            value = item.get("amount")
+        return float(value or 0)
+    if isinstance(item, (int, float)) and not isinstance(item, bool):
+        return float(item)
+    return 0.0
+
+
+def holding_name(item) -> Optional[str]:
+    if isinstance(item, dict):
+        return item.get("name") or item.get("symbol") or item.get("bank")
+    return None
+
+
+@dataclass
+class Holding:
+    category: str
+    index: Optional[int]   # position in the category's list; None for a scalar category
+    name: Optional[str]
+    value: float
+
+
+@dataclass
+class AssetIndex:
+    """Every asset aggregate the app reports, built in one pass over `assets`.
+
+    `total` covers every category and class totals the categories in
+    CATEGORY_CLASSES; `portfolio_total` and `class_weights` cover only the
+    INVESTABLE_CLASSES (the liquid portfolio, without real estate).
+    """
+    holdings: List[Holding] = field(default_factory=list)
+    category_totals: Dict[str, float] = field(default_factory=dict)
+    class_totals: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(ASSET_CLASSES, 0.0))
+    total: float = 0.0
+
+    @property
+    def portfolio_total(self) -> float:
+        return sum(self.class_totals[key] for key in INVESTABLE_CLASSES)
+
+    @property
+    def category_weights(self) -> Dict[str, float]:
+        return {key: value / self.total if self.total > 0 else 0.0 for key, value in self.category_totals.items()}
+
+    @property
+    def class_weights(self) -> Dict[str, float]:
+        total = self.portfolio_total
+        return {key: self.class_totals[key] / total if total > 0 else 0.0 for key in INVESTABLE_CLASSES}
+
+    def weight(self, holding: Holding) -> float:
+        return holding.value / self.total if self.total > 0 else 0.0
+
+    def value(self, *categories: str) -> float:
+        return sum(self.category_totals.get(key, 0.0) for key in categories)
+
+    def in_category(self, category: str) -> List[Holding]:
+        return [h for h in self.holdings if h.category == category]
+
+
+def build_asset_index(assets: Dict) -> AssetIndex:
+    """Aggregates the `assets` block of a snapshot in a single pass."""
+    index = AssetIndex()
+    for key, val in (assets or {}).items():
+        items = list(enumerate(val)) if isinstance(val, list) else [(None, val)]
+        category_total = 0.0
+        for position, item in items:
+            value = holding_value(item)
+            index.holdings.append(Holding(key, position, holding_name(item), value))
+            category_total += value
+        index.category_totals[key] = category_total
+        index.total += category_total
+        asset_class = CATEGORY_CLASSES.get(key)
+        if asset_class is not None:
+            index.class_totals[asset_class] += category_total
+    return index
+
+
+def asset_index(snapshot: Dict, version: Optional[str] = None) -> AssetIndex:
+    """Index for `snapshot`, built once per snapshot version. Treat it as read-only.
+
+    Pass `version` when the caller already has it, to skip re-hashing the snapshot.
+    """
+    version = version or snapshot_version(snapshot)
+    with _lock:
+        index = _cache.get(version)
+        if index is not None:
+            _cache.move_to_end(version)
+            return index
+    index = build_asset_index(snapshot.get("assets", {}))
+    with _lock:
+        _cache[version] = index
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
@@ -0,0 +1,239 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .loan_eligibility import calculate_emi
+from .mcp_loader import load_mcp_snapshot
+
+# Day of month on which each recurring flow hits the bank account
+DEFAULT_EVENT_DAYS = {
+    "monthly_salary": 1,
+    "rental_income": 5,
+    "other_income": 10,
+    "emi": 5,
+    "sip": 7,
+    "credit_card_dues": 15,
+}
+
+# Liabilities settled in full on the next statement instead of through an EMI
+REVOLVING_LIABILITIES = {"credit_card_dues"}
+
+DEFAULT_LOAN_RATE = 8.0
+DEFAULT_LOAN_TENURE_YEARS = 20
+
+# Typical rate (% a year) and remaining tenure (years) per loan type, for loans without loan_details
+LOAN_DEFAULTS = {
+    "home_loan": (8.5, 20),
+    "car_loan": (9.5, 5),
+    "personal_loan": (12.0, 3),
+    "education_loan": (10.0, 7),
+    "gold_loan": (9.0, 1),
+}
+
+
+def loan_terms(snapshot: Dict, loan: str) -> Tuple[float, float]:
+    """(annual rate %, remaining tenure in years) of a liability.
+
+    Read from the snapshot's `loan_details.<loan>` (`interest_rate` and
+    `remaining_tenure_months` or `tenure_years`) when present, else LOAN_DEFAULTS
+    for the loan type, else DEFAULT_LOAN_RATE over DEFAULT_LOAN_TENURE_YEARS.
+    """
+    rate, years = LOAN_DEFAULTS.get(loan, (DEFAULT_LOAN_RATE, DEFAULT_LOAN_TENURE_YEARS))
+    details = (snapshot.get("loan_details") or {}).get(loan) or {}
+    if details.get("interest_rate") is not None:
+        rate = details["interest_rate"]
+    if details.get("remaining_tenure_months"):
+        years = details["remaining_tenure_months"] / 12
+    elif details.get("tenure_years"):
+        years = details["tenure_years"]
+    return float(rate), float(years)
+
+
+def _to_day(value) -> np.datetime64:
+    return np.datetime64(value, "D")
+
+
+def _monthly_dates(start: np.datetime64, end: np.datetime64, day: int) -> np.ndarray:
+    """All dates on `day` of each month in [start, end), clipped to the month end."""
+    months = np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1)
+    month_starts = months.astype("datetime64[D]")
+    month_ends = (months + 1).astype("datetime64[D]") - 1
+    dates = np.minimum(month_starts + (day - 1), month_ends)
+    return dates[(dates >= start) & (dates < end)]
+
+
+class CashFlowCalendar:
+    """Dated cash-flow events over a fixed horizon with precomputed daily balances.
+
+    Events are kept sorted by day offset so range lookups are binary searches,
+    and balance queries read from the cumulative arrays instead of re-simulating.
+    """
+
+    def __init__(self, start, days: int, opening_balance: float,
+                 event_days: np.ndarray, amounts: np.ndarray, labels: List[str]):
+        order = np.argsort(event_days, kind="stable")
+        self.start = _to_day(start)
+        self.days = days
+        self.opening_balance = float(opening_balance)
+        self.event_days = np.asarray(event_days, dtype=np.int64)[order]
+        self.amounts = np.asarray(amounts, dtype=float)[order]
+        self.labels = [labels[i] for i in order]
+
+        daily_net = np.bincount(self.event_days, weights=self.amounts, minlength=days)
+        self.balances = self.opening_balance + np.cumsum(daily_net)
+        # Non-increasing, so threshold queries can binary search it
+        self._running_min = np.minimum.accumulate(self.balances)
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.start + np.arange(self.days)
+
+    def _offset(self, when) -> int:
+        return int((_to_day(when) - self.start).astype(int))
+
+    def events_between(self, start, end) -> List[Dict]:
+        """Events dated in [start, end)."""
+        lo = np.searchsorted(self.event_days, self._offset(start), side="left")
+        hi = np.searchsorted(self.event_days, self._offset(end), side="left")
+        return [
+            {
+                "date": str(self.start + self.event_days[i]),
+                "label": self.labels[i],
+                "amount": float(self.amounts[i]),
+            }
+            for i in range(lo, hi)
+        ]
+
+    def balance_on(self, when) -> Optional[float]:
+        offset = self._offset(when)
+        if offset < 0:
+            return self.opening_balance
+        if offset >= self.days:
+            return None
+        return float(self.balances[offset])
+
+    def first_date_below(self, threshold: float) -> Optional[str]:
+        """First date the projected balance drops below `threshold`, or None."""
+        idx = np.searchsorted(-self._running_min, -threshold, side="right")
+        if idx >= self.days:
+            return None
+        return str(self.start + idx)
+
+    def lowest_balance(self):
+        idx = int(np.argmin(self.balances))
+        return str(self.start + idx), float(self.balances[idx])
+
+
+def build_cash_flow_calendar(snapshot: Dict, months: int = 12, start=None,
+                             event_days: Optional[Dict[str, int]] = None,
+                             interest_rate: Optional[float] = None,
+                             tenure_years: Optional[float] = None) -> CashFlowCalendar:
+    """Expands salary, rent, EMIs, SIPs, expenses and FD maturities into a calendar.
+
+    Each loan's EMI uses its own terms (see `loan_terms`); `interest_rate` and
+    `tenure_years`, when given, override them for every loan.
+    """
+    event_days = {**DEFAULT_EVENT_DAYS, **(event_days or {})}
+    start_day = _to_day(start or date.today())
+    start_month = start_day.astype("datetime64[M]")
+    end_day = (start_month + months).astype("datetime64[D]") + (start_day - start_month.astype("datetime64[D]"))
+    horizon = int((end_day - start_day).astype(int))
+
+    assets = snapshot.get("assets", {})
+    income = snapshot.get("income", {})
+    liabilities = snapshot.get("liabilities", {})
+    sips = snapshot.get("contributions", {}).get("monthly_sip", {})
+
+    offsets, amounts, labels = [], [], []
+
+    def add_monthly(label, amount, day):
+        if not amount:
+            return
+        dates = _monthly_dates(start_day, end_day, day)
+        offsets.append((dates - start_day).astype(np.int64))
+        amounts.append(np.full(len(dates), float(amount)))
+        labels.extend([label] * len(dates))
+
+    def add_once(label, amount, when):
+        if not amount or when < start_day or when >= end_day:
+            return
+        offsets.append(np.array([(when - start_day).astype(np.int64)]))
+        amounts.append(np.array([float(amount)]))
+        labels.append(label)
+
+    for key in ("monthly_salary", "rental_income", "other_income"):
+        add_monthly(key, income.get(key, 0), event_days.get(key, 1))
+
+    for loan, outstanding in liabilities.items():
+        if loan in REVOLVING_LIABILITIES:
+            first_statement = _monthly_dates(start_day, end_day, event_days.get(loan, 15))
+            if len(first_statement):
+                add_once(loan, -outstanding, first_statement[0])
+        elif outstanding:
+            rate, years = loan_terms(snapshot, loan)
+            emi = calculate_emi(outstanding, interest_rate if interest_rate is not None else rate,
+                                tenure_years if tenure_years is not None else years)
+            add_monthly(f"emi:{loan}", -emi, event_days["emi"])
+
+    for fund, amount in sips.items():
+        add_monthly(f"sip:{fund}", -amount, event_days["sip"])
+
+    for fd in assets.get("fixed_deposits", []):
+        maturity = fd.get("maturity_date")
+        if maturity:
+            value = fd.get("maturity_value") or fd.get("current_value") or fd.get("amount", 0)
+            add_once(f"fd_maturity:{fd.get('bank', 'FD')}", value, _to_day(maturity))
+
+    # Living expenses are drawn down daily at the historical monthly average
+    expense_history = snapshot.get("expense_history", [])
+    if expense_history:
+        avg_monthly = sum(item.get("expenses", 0) for item in expense_history) / len(expense_history)
+        offsets.append(np.arange(horizon, dtype=np.int64))
+        amounts.append(np.full(horizon, -avg_monthly * 12 / 365))
+        labels.extend(["expenses"] * horizon)
+
+    if offsets:
+        all_offsets = np.concatenate(offsets)
+        all_amounts = np.concatenate(amounts)
+    else:
+        all_offsets = np.empty(0, dtype=np.int64)
+        all_amounts = np.empty(0)
+
+    return CashFlowCalendar(
+        start_day, horizon, assets.get("bank_balance", 0),
+        all_offsets, all_amounts, labels
+    )
+
+
+from langchain_core.tools import tool
+
+@tool
+def get_cash_flow_forecast(_: str = "") -> str:
+    """
+    Projects the bank balance over the next 12 months from income, EMIs, SIPs,
+    expenses and FD maturities in mcp_snapshot.json.
+    """
+    data = load_mcp_snapshot()
+    if data is None:
+        return "❌ The 'mcp_snapshot.json' file is missing."
+    calendar = build_cash_flow_calendar(data, months=12)
+    if calendar.days == 0:
+        return "No cash-flow data found in your financial snapshot."
+
+    low_date, low_value = calendar.lowest_balance()
+    end_value = float(calendar.balances[-1])
+    lines = [
+        f"📅 Cash-flow forecast ({calendar.dates[0]} → {calendar.dates[-1]}):",
+        f"- Opening balance: ₹{calendar.opening_balance:,.0f}",
+        f"- Closing balance: ₹{end_value:,.0f}",
+        f"- Lowest balance: ₹{low_value:,.0f} on {low_date}",
+    ]
+    emergency_fund = data.get("emergency_fund", 0)
+    if emergency_fund:
+        breach = calendar.first_date_below(emergency_fund)
+        if breach:
+            lines.append(f"⚠️ Balance falls below your emergency fund (₹{emergency_fund:,}) on {breach}.")
+        else:
+            lines.append(f"✅ Balance stays above your emergency fund (₹{emergency_fund:,}).")
+    return "\n".join(lines)
@@ -0,0 +1,145 @@
+# tools/context_budget.py
+import logging
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger("lakshya.budget")
+
+CHARS_PER_TOKEN = 4  # rough average for English text with numbers
+_BULLET_RE = re.compile(r"^[\s\-*•]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer round trip)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def digest_observation(text: str, max_tokens: int) -> str:
+    """Keeps a tool output's header and as many lines as fit, noting how many were cut."""
+    text = str(text)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = [" ".join(l.split()) for l in text.splitlines() if l.strip()]
+    kept, used = [], 0
+    for i, line in enumerate(lines):
+        line = line if i == 0 else "- " + _BULLET_RE.sub("", line)
+        cost = estimate_tokens(line) + 1
+        if kept and used + cost > max_tokens:
+            kept.append(f"- (+{len(lines) - i} more lines omitted)")
+            break
+        kept.append(line[: max_tokens * CHARS_PER_TOKEN])
+        used += cost
+    return "\n".join(kept)
+
+
+def summary_line(tool: str, text: str, max_chars: int = 120) -> str:
+    """One-line stand-in for an old observation."""
+    first = next((" ".join(l.split()) for l in str(text).splitlines() if l.strip()), "")
+    if len(first) > max_chars:
+        first = first[: max_chars - 1] + "…"
+    return f"(earlier {tool} result, summarized) {first}"
+
+
+@dataclass
+class TokenUsage:
+    """Per-request token accounting, updated on every prompt built for the request."""
+    sections: Dict[str, int] = field(default_factory=dict)
+    prompts: int = 0
+    prompt_tokens: int = 0
+    per_prompt: List[int] = field(default_factory=list)
+    peak_prompt_tokens: int = 0
+    digested: int = 0
+    summarized: int = 0
+    dropped: int = 0
+    tokens_saved: int = 0
+
+    def record_prompt(self, sections: Dict[str, str]):
+        counts = {name: estimate_tokens(text) for name, text in sections.items()}
+        total = sum(counts.values())
+        self.sections = counts
+        self.prompts += 1
+        self.prompt_tokens += total
+        self.per_prompt.append(total)
+        self.peak_prompt_tokens = max(self.peak_prompt_tokens, total)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class ContextBudget:
+    """Keeps the agent scratchpad within `max_tokens`.
+
+    The latest `keep_recent` observations stay verbatim unless one alone exceeds
+    `observation_tokens`; older ones are reduced to digests. If the scratchpad is
+    still over budget, the oldest digests become one-line summaries and, as a
+    last resort, are dropped. Accounting for the current request lives in
+    `usage` (per thread).
+    """
+
+    def __init__(self, max_tokens: int = 3000, keep_recent: int = 2, observation_tokens: int = 400,
+                 digest_tokens: int = 120):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.observation_tokens = observation_tokens
+        self.digest_tokens = digest_tokens
+        self._local = threading.local()
+
+    def begin(self) -> TokenUsage:
+        """Starts accounting for a new request on this thread."""
+        self._local.usage = TokenUsage()
+        return self._local.usage
+
+    @property
+    def usage(self) -> TokenUsage:
+        usage = getattr(self._local, "usage", None)
+        return usage if usage is not None else self.begin()
+
+    def compact(self, entries: Sequence[Tuple[str, str]], overhead_tokens: int = 0) -> List[str]:
+        """Compacts (tool, observation) pairs, oldest first; returns the observations to show."""
+        usage = self.usage
+        n = len(entries)
+        compacted = []
+        for i, (tool, obs) in enumerate(entries):
+            obs = str(obs)
+            limit = self.observation_tokens if i >= n - self.keep_recent else self.digest_tokens
+            short = digest_observation(obs, limit)
+            compacted.append(short)
+        total = overhead_tokens + sum(estimate_tokens(o) for o in compacted)
+        for i in range(max(0, n - self.keep_recent)):
+            if total <= self.max_tokens:
+                break
+            line = summary_line(entries[i][0], compacted[i])
+            total += estimate_tokens(line) - estimate_tokens(compacted[i])
+            compacted[i] = line
+        for i in range(max(0, n - self.keep_recent)):
+            if total <= self.max_tokens:
+                break
+            total -= estimate_tokens(compacted[i]) - estimate_tokens("(omitted)")
+            compacted[i] = "(omitted)"
+
+        # Accounting reflects the latest compaction of this request's steps
+        usage.digested = usage.summarized = usage.dropped = usage.tokens_saved = 0
+        for (tool, obs), short in zip(entries, compacted):
+            if short == str(obs):
+                continue
+            if short == "(omitted)":
+                usage.dropped += 1
+            elif short.startswith("(earlier "):
+                usage.summarized += 1
+            else:
+                usage.digested += 1
+            usage.tokens_saved += estimate_tokens(str(obs)) - estimate_tokens(short)
+        return compacted
+
+    def trim_intermediate_steps(self, steps: List[Tuple]) -> List[Tuple]:
+        """AgentExecutor hook: same (action, observation) steps with compacted observations.
+
+        Prompts are recorded as the LLM receives them, by PromptUsageHandler.
+        """
+        if not steps:
+            return steps
+        overhead = sum(estimate_tokens(getattr(action, "log", "")) for action, _ in steps)
+        observations = self.compact([(action.tool, obs) for action, obs in steps], overhead)
+        return [(action, obs) for (action, _), obs in zip(steps, observations)]
@@ -0,0 +1,117 @@
+# tools/fake_model_server.py
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+
+class FakeModelServer:
+    """Local HTTP stand-in for a model backend, for exercising LLM clients offline.
+
+    POST /generate {"prompt"} -> {"text"}; POST /batch {"prompts"} -> {"texts"}.
+    Every call sleeps `latency` seconds; counters record calls, prompts and peak concurrency.
+    """
+
+    def __init__(self, latency: float = 0.05, reply_fn: Callable[[str], str] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.reply_fn = reply_fn or (lambda prompt: f"Final Answer: echo {prompt[-40:]}")
+        self.calls = 0
+        self.prompts = 0
+        self.active = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _generate(self, prompts: List[str]) -> List[str]:
+        with self._lock:
+            self.calls += 1
+            self.prompts += len(prompts)
+            self.active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self.active)
+        try:
+            time.sleep(self.latency)
+            return [self.reply_fn(p) for p in prompts]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path == "/generate":
+                    payload = {"text": server._generate([data["prompt"]])[0]}
+                elif self.path == "/batch":
+                    payload = {"texts": server._generate(data["prompts"])}
+                else:
+                    self.send_error(404)
+                    return
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeModelServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _prompt_text(value) -> str:
+    return value.to_string() if hasattr(value, "to_string") else str(value)
+
+
+def _truncate(text: str, stop: Optional[List[str]]) -> str:
+    for s in stop or []:
+        idx = text.find(s)
+        if idx >= 0:
+            text = text[:idx]
+    return text
+
+
+class FakeModelClient:
+    """Minimal LLM-like client (invoke/batch/stream) talking to a FakeModelServer."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, path: str, payload: dict) -> dict:
+        request = urllib.request.Request(self.url + path, data=json.dumps(payload).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def invoke(self, input, config=None, stop: Optional[List[str]] = None, **kwargs) -> str:
+        text = self._post("/generate", {"prompt": _prompt_text(input)})["text"]
+        return _truncate(text, stop)
+
+    def batch(self, inputs, config=None, return_exceptions: bool = False,
+              stop: Optional[List[str]] = None, **kwargs) -> List[str]:
+        texts = self._post("/batch", {"prompts": [_prompt_text(i) for i in inputs]})["texts"]
+        return [_truncate(t, stop) for t in texts]
+
+    def stream(self, input, config=None, stop: Optional[List[str]] = None, **kwargs):
+        yield self.invoke(input, stop=stop)
@@ -45,6 +45,7 @@ import random
 
 import json
 
+from .asset_index import asset_index
 from .mcp_loader import load_mcp_snapshot
 
 @tool
@@ -55,15 +56,10 @@ def get_fi_mcp_realtime(_: str = "") -> str:
     data = load_mcp_snapshot()
     if data is None:
         return "❌ The 'mcp_snapshot.json' file is missing."
-    assets = data.get("assets", {})
     summary = []
-    for k, v in assets.items():
-        if isinstance(v, (int, float)):
-            summary.append(f"{k.replace('_', ' ').title()}: ₹{v:,}")
-        elif isinstance(v, list):
-            for item in v:
-                if isinstance(item, dict):
-                    name = item.get("name") or item.get("symbol") or item.get("bank") or "Unknown"
-                    val = item.get("current_value") or item.get("amount") or 0
-                    summary.append(f"{name}: ₹{val:,}")
+    for holding in asset_index(data).holdings:
+        if holding.index is None:
+            summary.append(f"{holding.category.replace('_', ' ').title()}: ₹{holding.value:,.0f}")
+        else:
+            summary.append(f"{holding.name or 'Unknown'}: ₹{holding.value:,.0f}")
     return "Your asset summary:\n" + "\n".join(summary)
\ No newline at end of file
@@ -0,0 +1,128 @@
+# tools/financial_digest.py
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .asset_index import AssetIndex, asset_index
+from .mcp_loader import load_mcp_snapshot, snapshot_version
+
+MAX_HOLDINGS = 4   # holdings listed per asset category
+_CACHE_SIZE = 8
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _month(day) -> str:
+    return day.astype(object).strftime("%Y-%m")
+
+
+def _label(key: str) -> str:
+    return key.replace("_", " ")
+
+
+def _holdings_line(key, items, index: AssetIndex) -> str:
+    holdings = index.in_category(key)
+    named = []
+    for holding in holdings[:MAX_HOLDINGS]:
+        if holding.name:
+            item = items[holding.index]
+            ret = f" @{item['returns']}%" if "returns" in item else ""
+            named.append(f"{holding.name} ₹{holding.value:,.0f}{ret}")
+    more = f", +{len(holdings) - MAX_HOLDINGS} more" if len(holdings) > MAX_HOLDINGS else ""
+    detail = f" ({', '.join(named)}{more})" if named else ""
+    return f"{_label(key)} ₹{index.category_totals[key]:,.0f}{detail}"
+
+
+def build_financial_digest(snapshot: Dict, version: Optional[str] = None) -> str:
+    """Compact plain-text summary of the snapshot for the agent prompt."""
+    # Imported here: the anomaly tool module pulls in the ADK and LangChain tool machinery
+    from .anomaly_detection import expense_anomalies, flag_anomalies
+    from .net_worth_series import series_for_snapshot
+
+    assets = snapshot.get("assets", {})
+    liabilities = snapshot.get("liabilities", {})
+    income = snapshot.get("income", {})
+    profile = snapshot.get("user_profile", {})
+    version = version or snapshot_version(snapshot)
+    index = asset_index(snapshot, version)
+    total_assets = index.total
+    total_liabilities = float(sum(liabilities.values()))
+
+    lines: List[str] = []
+    if profile:
+        lines.append(
+            f"Profile: age {profile.get('age', '?')}, {profile.get('risk_profile', 'unknown')} risk, "
+            f"retirement at {profile.get('retirement_age', '?')}"
+        )
+
+    nw_line = f"Net worth ₹{total_assets - total_liabilities:,.0f} (assets ₹{total_assets:,.0f}, liabilities ₹{total_liabilities:,.0f})"
+    series = series_for_snapshot(snapshot, version=version)
+    if len(series) >= 2 and series.first[1]:
+        (first_month, first), (last_month, last) = series.first, series.last
+        _, change = series.change()
+        nw_line += (f"; recorded trend ₹{first:,.0f} ({_month(first_month)}) → ₹{last:,.0f} ({_month(last_month)}), "
+                    f"{change:+.1f}%")
+    lines.append(nw_line)
+
+    if assets:
+        lines.append("Assets: " + "; ".join(_holdings_line(k, v, index) for k, v in assets.items()))
+    if liabilities:
+        lines.append("Liabilities: " + "; ".join(f"{_label(k)} ₹{v:,.0f}" for k, v in liabilities.items()))
+    if income:
+        parts = ", ".join(f"{_label(k)} ₹{v:,.0f}" for k, v in income.items())
+        lines.append(f"Monthly income ₹{sum(income.values()):,.0f} ({parts})")
+
+    expenses = snapshot.get("expense_history", [])
+    if expenses:
+        values = [m["expenses"] for m in expenses]
+        recent = values[-6:]
+        lines.append(
+            f"Expenses: ₹{values[-1]:,.0f} in {expenses[-1]['month']}, "
+            f"{len(recent)}-month average ₹{sum(recent) / len(recent):,.0f}"
+        )
+
+    contributions = snapshot.get("contributions", {})
+    sips = contributions.get("monthly_sip", {})
+    if sips or contributions.get("monthly_savings"):
+        lines.append(
+            f"Monthly SIPs ₹{sum(sips.values()):,.0f}, savings ₹{contributions.get('monthly_savings', 0):,.0f}"
+        )
+    extras = []
+    if "emergency_fund" in snapshot:
+        extras.append(f"emergency fund ₹{snapshot['emergency_fund']:,.0f}")
+    for key, value in snapshot.get("insurance", {}).items():
+        extras.append(f"{_label(key)} cover ₹{value:,.0f}")
+    if snapshot.get("tax_info", {}).get("tax_slab_percent") is not None:
+        extras.append(f"tax slab {snapshot['tax_info']['tax_slab_percent']}%")
+    if extras:
+        lines.append("Other: " + ", ".join(extras))
+
+    flags = flag_anomalies(snapshot)
+    if expenses:
+        spikes, _, threshold = expense_anomalies([m["expenses"] for m in expenses])
+        if spikes:
+            flags.append(f"Expense spikes above ₹{threshold:,.0f}: {', '.join(f'₹{s:,.0f}' for s in spikes)}")
+    lines.append("Flags: " + ("; ".join(flags) if flags else "none"))
+    return "\n".join(f"- {line}" for line in lines)
+
+
+def financial_digest(snapshot: Optional[Dict] = None) -> str:
+    """Digest for `snapshot` (default: the current one, with live prices), built once per version."""
+    if snapshot is None:
+        from .price_feed import live_snapshot
+        snapshot = live_snapshot(load_mcp_snapshot())
+    if snapshot is None:
+        return "- No financial snapshot is available; use the tools."
+    version = snapshot_version(snapshot)
+    with _lock:
+        digest = _cache.get(version)
+        if digest is not None:
+            _cache.move_to_end(version)
+            return digest
+    digest = f"(snapshot {version})\n" + build_financial_digest(snapshot, version)
+    with _lock:
+        _cache[version] = digest
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return digest
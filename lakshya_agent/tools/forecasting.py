@@ -0,0 +1,251 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .mcp_loader import load_mcp_snapshot, snapshot_version
+
+# Month-of-year effects are only estimated once two full cycles are observed
+MIN_POINTS_FOR_SEASONALITY = 24
+N_FEATURES = 13  # intercept, trend, 11 month-of-year dummies
+Z_95 = 1.96
+
+
+def _month_index(value) -> int:
+    return int(np.datetime64(value, "M").astype(np.int64))
+
+
+def _design(t: np.ndarray, origin: int) -> np.ndarray:
+    """Rows of [1, months since origin, month-of-year dummies (January is the baseline)]."""
+    t = np.asarray(t, dtype=np.int64)
+    x = np.zeros((len(t), N_FEATURES))
+    x[:, 0] = 1.0
+    x[:, 1] = t - origin
+    month_of_year = t % 12
+    rows = np.flatnonzero(month_of_year > 0)
+    x[rows, 1 + month_of_year[rows]] = 1.0
+    return x
+
+
+class TrendModel:
+    """Linear or log-linear monthly trend with optional seasonality.
+
+    Keeps the normal-equation sums (X'X, X'y, y'y) so a new month is folded in
+    with a rank-one update instead of refitting the whole history.
+    """
+
+    def __init__(self, log: bool = False, origin: Optional[int] = None):
+        self.log = log
+        self.origin = origin
+        self.n = 0
+        self.last_t: Optional[int] = None
+        self._xtx = np.zeros((N_FEATURES, N_FEATURES))
+        self._xty = np.zeros(N_FEATURES)
+        self._yty = 0.0
+        self._solution = None
+
+    @classmethod
+    def fit(cls, months: List[str], values: List[float], log: bool = False) -> "TrendModel":
+        t = np.array([_month_index(m) for m in months])
+        y = np.asarray(values, dtype=float)
+        # Log-linear only fits positive series; anything else is fitted linearly
+        model = cls(log=log and bool((y > 0).all()), origin=int(t.min()) if len(t) else None)
+        model.update(t, y)
+        return model
+
+    def copy(self) -> "TrendModel":
+        model = TrendModel(log=self.log, origin=self.origin)
+        model.n, model.last_t = self.n, self.last_t
+        model._xtx, model._xty, model._yty = self._xtx.copy(), self._xty.copy(), self._yty
+        return model
+
+    def update(self, t, values):
+        """Folds new observations (month indices and values) into the sums."""
+        t = np.atleast_1d(np.asarray(t, dtype=np.int64))
+        y = np.atleast_1d(np.asarray(values, dtype=float))
+        if not len(t):
+            return self
+        if self.log:
+            if (y <= 0).any():
+                raise ValueError("A log-linear trend needs positive values; fit a linear model instead")
+            y = np.log(y)
+        if self.origin is None:
+            self.origin = int(t.min())
+        x = _design(t, self.origin)
+        self._xtx += x.T @ x
+        self._xty += x.T @ y
+        self._yty += float(y @ y)
+        self.n += len(t)
+        self.last_t = int(t.max()) if self.last_t is None else max(self.last_t, int(t.max()))
+        self._solution = None
+        return self
+
+    @property
+    def seasonal(self) -> bool:
+        return self.n >= MIN_POINTS_FOR_SEASONALITY
+
+    def _solve(self):
+        if self._solution is None:
+            cols = np.arange(N_FEATURES if self.seasonal else 2)
+            if self.n < 2:
+                cols = cols[:1]
+            xtx = self._xtx[np.ix_(cols, cols)]
+            xty = self._xty[cols]
+            xtx_inv = np.linalg.pinv(xtx)
+            coef = xtx_inv @ xty
+            dof = max(self.n - len(cols), 1)
+            sse = max(self._yty - float(coef @ xty), 0.0)
+            self._solution = (cols, coef, xtx_inv, np.sqrt(sse / dof))
+        return self._solution
+
+    @property
+    def coefficients(self) -> np.ndarray:
+        return self._solve()[1]
+
+    def forecast(self, horizon: int, z: float = Z_95) -> Dict[str, np.ndarray]:
+        """Point forecast and prediction band for the next `horizon` months."""
+        cols, coef, xtx_inv, sigma = self._solve()
+        t = self.last_t + np.arange(1, horizon + 1)
+        x = _design(t, self.origin)[:, cols]
+        mean = x @ coef
+        se = sigma * np.sqrt(1 + np.einsum("ij,jk,ik->i", x, xtx_inv, x))
+        lower, upper = mean - z * se, mean + z * se
+        if self.log:
+            mean, lower, upper = np.exp(mean), np.exp(lower), np.exp(upper)
+        return {
+            "months": t.astype("datetime64[M]"),
+            "forecast": mean,
+            "lower": lower,
+            "upper": upper,
+        }
+
+
+_MODEL_CACHE: "OrderedDict[tuple, TrendModel]" = OrderedDict()
+_LATEST_MODEL: "OrderedDict[tuple, tuple]" = OrderedDict()
+_MODEL_CACHE_SIZE = 64
+_MODEL_LOCK = threading.Lock()  # guards both caches; models are fitted outside it
+
+HISTORY_FIELDS = {"net_worth_history": "value", "expense_history": "expenses"}
+
+
+def get_trend_model(snapshot: Dict, history_key: str = "net_worth_history",
+                    log: bool = False, user_id: str = "default", *, version: str) -> Optional[TrendModel]:
+    """Returns the fitted model for a snapshot history, cached per snapshot version.
+
+    `version` is the caller's snapshot_version, so lookups never re-hash the snapshot.
+
+    When a newer snapshot only adds months after the last fitted one, the
+    previous model is copied and updated incrementally instead of refitted.
+    A log trend falls back to linear (model.log is False) when any value is zero or negative.
+    """
+    cache_key = (version, history_key, log, user_id)
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(cache_key)
+        if model is not None:
+            _MODEL_CACHE.move_to_end(cache_key)
+            return model
+
+    rows = snapshot.get(history_key, [])
+    if not rows:
+        return None
+    value_field = HISTORY_FIELDS.get(history_key, "value")
+    t = np.array([_month_index(row["month"]) for row in rows])
+    y = np.array([float(row[value_field]) for row in rows])
+    fit_log = log and bool((y > 0).all())
+
+    owner = (history_key, fit_log, user_id)
+    with _MODEL_LOCK:
+        previous = _LATEST_MODEL.get(owner)
+    new_points = None
+    if previous is not None:
+        prev_model, prev_t, prev_y = previous
+        seen = t <= prev_model.last_t
+        old_t, old_y = t[seen], y[seen]
+        order = np.argsort(old_t)
+        if np.array_equal(old_t[order], prev_t) and np.array_equal(old_y[order], prev_y):
+            new_points = ~seen
+
+    if new_points is not None:
+        model = prev_model.copy().update(t[new_points], y[new_points])
+    else:
+        model = TrendModel(log=fit_log, origin=int(t.min())).update(t, y)
+
+    order = np.argsort(t)
+    with _MODEL_LOCK:
+        _LATEST_MODEL[owner] = (model, t[order], y[order])
+        _LATEST_MODEL.move_to_end(owner)
+        while len(_LATEST_MODEL) > _MODEL_CACHE_SIZE:
+            _LATEST_MODEL.popitem(last=False)
+        _MODEL_CACHE[cache_key] = model
+        while len(_MODEL_CACHE) > _MODEL_CACHE_SIZE:
+            _MODEL_CACHE.popitem(last=False)
+    return model
+
+
+def forecast_batch(months: List[str], values: np.ndarray, horizon: int,
+                   log: bool = False, z: float = Z_95) -> Dict[str, np.ndarray]:
+    """Fits and forecasts many users at once.
+
+    `values` is (users x months) on a shared month grid, so every user shares one
+    design matrix and the fit is a single least-squares solve with many targets.
+    With `log`, users whose history has a zero or negative value get a linear fit.
+    """
+    y = np.array(values, dtype=float)
+    if y.ndim == 1:
+        y = y[None, :]
+    log_rows = (y > 0).all(axis=1) if log else np.zeros(len(y), dtype=bool)
+    y[log_rows] = np.log(y[log_rows])
+    t = np.array([_month_index(m) for m in months])
+    origin = int(t.min())
+    n = len(t)
+    cols = np.arange(N_FEATURES if n >= MIN_POINTS_FOR_SEASONALITY else 2)
+    x = _design(t, origin)[:, cols]
+
+    coef, _, _, _ = np.linalg.lstsq(x, y.T, rcond=None)
+    residuals = y.T - x @ coef
+    sigma = np.sqrt((residuals ** 2).sum(axis=0) / max(n - len(cols), 1))
+
+    future_t = t.max() + np.arange(1, horizon + 1)
+    x_future = _design(future_t, origin)[:, cols]
+    xtx_inv = np.linalg.pinv(x.T @ x)
+    leverage = np.sqrt(1 + np.einsum("ij,jk,ik->i", x_future, xtx_inv, x_future))
+
+    mean = (x_future @ coef).T
+    spread = z * sigma[:, None] * leverage[None, :]
+    lower, upper = mean - spread, mean + spread
+    for band in (mean, lower, upper):
+        band[log_rows] = np.exp(band[log_rows])
+    return {
+        "months": future_t.astype("datetime64[M]"),
+        "forecast": mean,
+        "lower": lower,
+        "upper": upper,
+    }
+
+
+from langchain_core.tools import tool
+
+@tool
+def get_financial_forecast(_: str = "") -> str:
+    """
+    Forecasts net worth and monthly expenses for the next 6 months with 95% ranges
+    using net_worth_history and expense_history from mcp_snapshot.json.
+    """
+    data = load_mcp_snapshot()
+    if data is None:
+        return "❌ The 'mcp_snapshot.json' file is missing."
+
+    version = snapshot_version(data)
+    lines = []
+    for key, label in [("net_worth_history", "Net worth"), ("expense_history", "Monthly expenses")]:
+        model = get_trend_model(data, key, log=(key == "net_worth_history"), version=version)
+        if model is None:
+            continue
+        result = model.forecast(6)
+        lines.append(f"📈 {label} forecast:")
+        for month, value, low, high in zip(result["months"], result["forecast"], result["lower"], result["upper"]):
+            lines.append(f"- {month}: ₹{value:,.0f} (range ₹{low:,.0f} – ₹{high:,.0f})")
+    if not lines:
+        return "No net worth or expense history found for forecasting."
+    return "\n".join(lines)
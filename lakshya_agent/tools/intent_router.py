@@ -0,0 +1,173 @@
+# tools/intent_router.py
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List
+
+from .tracing import span
+
+logger = logging.getLogger("lakshya.router")
+
+# intent -> (tool names, [(pattern, weight)]). Matching weights are summed.
+INTENTS = {
+    "loan_eligibility": (
+        ["check_loan_eligibility"],
+        # The tool takes no input, so only an explicit eligibility question routes;
+        # loan words alone (EMI on an existing loan, affordability) count once
+        [(r"\beligib", 2), (r"\bhow much (can|could) i borrow\b", 2), (r"\bqualify for (a )?loan", 2),
+         (r"\b(loans?|borrow|emis?|afford)", 1)],
+    ),
+    "sip_performance": (
+        ["get_sip_performance"],
+        [(r"\bsips?\b", 2), (r"\bmutual funds?\b", 2), (r"\bperform", 1), (r"\breturns?\b", 1)],
+    ),
+    "net_worth": (
+        ["get_net_worth_trend"],
+        [(r"\bnet ?worth\b", 2), (r"\bwealth\b", 1), (r"\b(trend|growth|grown|grow)\b", 1)],
+    ),
+    "anomalies": (
+        ["detect_anomaly"],
+        [(r"\banomal", 2), (r"\bunusual\b", 2), (r"\bsuspicious\b", 2), (r"\bspik", 1),
+         (r"\boverspend", 1), (r"\bexpenses?\b", 1)],
+    ),
+    "asset_summary": (
+        ["get_fi_mcp_realtime"],
+        [(r"\bassets?\b", 2), (r"\bholdings?\b", 2), (r"\bwhat do i own\b", 2), (r"\bsummary\b", 1)],
+    ),
+}
+
+# Questions that need reasoning across tools or hypotheticals go to the full agent
+COMPLEX_CUES = [r"\bwhat if\b", r"\bshould i\b", r"\bcompare\b", r"\bif i\b", r"\bwhy\b",
+                r"\bplan\b", r"\bstrateg", r"\boptimi[sz]", r"\brecommend", r"\bforecast", r"\bproject"]
+
+# Routed tools ignore the question text, so figures the user gives need the agent
+AMOUNT_CUE = r"\d|₹|\b(rs|inr|lakhs?|lacs?|crores?|thousand|million)\b"
+
+MIN_SCORE = 2          # weight needed for an intent to count as confident
+MAX_FAST_INTENTS = 2   # more distinct intents than this is left to the agent
+
+
+@dataclass
+class RouteDecision:
+    query: str
+    intents: List[str] = field(default_factory=list)
+    tools: List[str] = field(default_factory=list)
+    scores: Dict[str, int] = field(default_factory=dict)
+    confidence: float = 0.0
+    fast_path: bool = False
+    reason: str = ""
+
+
+def route(query: str) -> RouteDecision:
+    """Maps a question to tool(s) when the intent is clear, else marks it for the agent."""
+    text = query.lower()
+    scores = {
+        intent: sum(weight for pattern, weight in patterns if re.search(pattern, text))
+        for intent, (_, patterns) in INTENTS.items()
+    }
+    scores = {k: v for k, v in scores.items() if v}
+    decision = RouteDecision(query=query, scores=scores)
+
+    if any(re.search(cue, text) for cue in COMPLEX_CUES):
+        decision.reason = "complex question"
+        return decision
+    if re.search(AMOUNT_CUE, text):
+        decision.reason = "question has figures"
+        return decision
+    confident = sorted((k for k, v in scores.items() if v >= MIN_SCORE), key=lambda k: -scores[k])
+    if not confident:
+        decision.reason = "no confident intent" if scores else "no intent matched"
+        return decision
+    if len(confident) > MAX_FAST_INTENTS:
+        decision.reason = "too many intents"
+        return decision
+
+    decision.intents = confident
+    decision.tools = [t for intent in confident for t in INTENTS[intent][0]]
+    decision.confidence = min(1.0, min(scores[k] for k in confident) / (MIN_SCORE + 1))
+    decision.fast_path = True
+    decision.reason = "matched"
+    return decision
+
+
+def log_decision(decision: RouteDecision, latency_s: float = None):
+    """Logs the routing decision, and appends it to LAKSHYA_ROUTER_LOG (JSONL) when set."""
+    record = asdict(decision)
+    record["ts"] = time.time()
+    if latency_s is not None:
+        record["latency_s"] = round(latency_s, 4)
+    logger.info("route fast_path=%s intents=%s reason=%s", decision.fast_path, decision.intents, decision.reason)
+    log_path = os.getenv("LAKSHYA_ROUTER_LOG")
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+PHRASING_PROMPT = """You are Lakshya, a personal finance assistant.
+Answer the user's question clearly and concisely using only the tool results below.
+
+Question: {question}
+
+Tool results:
+{observations}
+
+Answer:"""
+
+
+def _text(result) -> str:
+    return getattr(result, "content", result) if not isinstance(result, str) else result
+
+
+def _run_tool(tool_registry: Dict, name: str) -> str:
+    with span(f"tool:{name}", routed=True):
+        return str(tool_registry[name].invoke(""))
+
+
+def answer_with_tools(decision: RouteDecision, tool_registry: Dict, llm=None) -> Dict:
+    """Runs the routed tools and phrases their output with at most one LLM call.
+
+    Returns {"output", "fallback"}; `fallback` is True when the raw tool output is
+    returned because the phrasing call failed.
+    """
+    observations = [f"[{name}]\n{_run_tool(tool_registry, name)}" for name in decision.tools]
+    joined = "\n\n".join(observations)
+    if llm is None:
+        return {"output": joined, "fallback": False}
+    try:
+        with span("llm", purpose="phrasing"):
+            answer = _text(llm.invoke(PHRASING_PROMPT.format(question=decision.query, observations=joined))).strip()
+        return {"output": answer, "fallback": False}
+    except Exception:
+        logger.exception("Phrasing call failed; returning raw tool output")
+        return {"output": joined, "fallback": True}
+
+
+def stream_with_tools(decision: RouteDecision, tool_registry: Dict, llm=None) -> Iterator[Dict]:
+    """Streaming variant of `answer_with_tools`, yielding the same events as ParallelToolAgent.stream."""
+    observations = []
+    for name in decision.tools:
+        yield {"type": "tool_start", "tool": name, "input": ""}
+        output = _run_tool(tool_registry, name)
+        yield {"type": "tool_end", "tool": name, "output": output}
+        observations.append(f"[{name}]\n{output}")
+    joined = "\n\n".join(observations)
+    answer = ""
+    if llm is not None:
+        try:
+            for chunk in llm.stream(PHRASING_PROMPT.format(question=decision.query, observations=joined)):
+                text = _text(chunk)
+                if not answer:
+                    text = text.lstrip()
+                if text:
+                    answer += text
+                    yield {"type": "token", "text": text}
+        except Exception:
+            logger.exception("Phrasing call failed; returning raw tool output")
+    fallback = llm is not None and not answer.strip()
+    if not answer.strip():
+        answer = joined
+        yield {"type": "token", "text": joined}
+    yield {"type": "final", "output": answer.strip(), "intermediate_steps": [], "fallback": fallback}
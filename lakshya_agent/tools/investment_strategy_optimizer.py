@@ -2,7 +2,9 @@ from pydantic import BaseModel
 from typing import Dict, List, Optional
 from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
+from .asset_index import asset_index, build_asset_index
 from .mcp_loader import load_mcp_snapshot
+from .price_feed import live_snapshot
 
 class PortfolioRebalanceAction(BaseModel):
     asset: str
@@ -27,6 +29,18 @@ class InvestmentStrategyOutput(BaseModel):
     allocation_analysis: AssetAllocationAnalysis
     sip_adjustment: SIPAdjustmentSuggestion
 
+# Simple heuristic for recommended allocation by risk profile
+RECOMMENDED_ALLOCATIONS = {
+    "conservative": {"equity": 0.3, "debt": 0.5, "cash": 0.2},
+    "moderate": {"equity": 0.5, "debt": 0.3, "cash": 0.2},
+    "aggressive": {"equity": 0.7, "debt": 0.2, "cash": 0.1},
+}
+
+def current_allocation(assets: Dict):
+    """Current equity/debt/cash weights of the holdings and their total value."""
+    index = build_asset_index(assets)
+    return index.class_weights, index.portfolio_total
+
 class InvestmentStrategyOptimizerTool(BaseTool):
     def __init__(self):
         super().__init__(
@@ -40,33 +54,11 @@ class InvestmentStrategyOptimizerTool(BaseTool):
         age = user_profile.get("age", 21)
         risk_profile = user_profile.get("risk_profile", "moderate")
 
-        assets = data.get("assets", {})
         asset_allocation = data.get("asset_allocation", {})
 
         # Calculate current weights from holdings
-        total_value = 0.0
-        current_weights = {}
-
-        # Sum all asset values
-        for key in ["bank_balance", "mutual_funds", "stocks", "epf", "fixed_deposits", "real_estate"]:
-            val = assets.get(key, 0)
-            if isinstance(val, list):
-                total_value += sum(item.get("current_value", 0) if isinstance(item, dict) else 0 for item in val)
-            elif isinstance(val, (int, float)):
-                total_value += val
-
-        # Calculate weights for each category
-        def get_asset_value(key):
-            val = assets.get(key, 0)
-            if isinstance(val, list):
-                return sum(item.get("current_value", 0) if isinstance(item, dict) else 0 for item in val)
-            elif isinstance(val, (int, float)):
-                return val
-            return 0
-
-        categories = ["bank_balance", "mutual_funds", "stocks", "epf", "fixed_deposits", "real_estate"]
-        for cat in categories:
-            current_weights[cat] = get_asset_value(cat) / total_value if total_value > 0 else 0
+        index = asset_index(data)
+        aggregated_weights, total_value = index.class_weights, index.portfolio_total
 
         # Target allocation from snapshot (equity, debt, cash)
         target_allocation = {
@@ -75,21 +67,6 @@ class InvestmentStrategyOptimizerTool(BaseTool):
             "cash": asset_allocation.get("cash", 0) / 100,
         }
 
-        # Map categories to equity, debt, cash for comparison
-        category_map = {
-            "mutual_funds": "equity",
-            "stocks": "equity",
-            "epf": "debt",
-            "fixed_deposits": "debt",
-            "bank_balance": "cash",
-            "real_estate": "cash"
-        }
-
-        # Aggregate current weights by category type
-        aggregated_weights = {"equity": 0, "debt": 0, "cash": 0}
-        for cat, cat_type in category_map.items():
-            aggregated_weights[cat_type] += current_weights.get(cat, 0)
-
         # Determine rebalance actions per category
         rebalance_actions = []
         for cat_type in ["equity", "debt", "cash"]:
@@ -112,14 +89,7 @@ class InvestmentStrategyOptimizerTool(BaseTool):
             )
 
         # Asset allocation analysis based on age and risk profile
-        # Simple heuristic for recommended allocation
-        recommended_allocation = {}
-        if risk_profile == "conservative":
-            recommended_allocation = {"equity": 0.3, "debt": 0.5, "cash": 0.2}
-        elif risk_profile == "aggressive":
-            recommended_allocation = {"equity": 0.7, "debt": 0.2, "cash": 0.1}
-        else:  # moderate
-            recommended_allocation = {"equity": 0.5, "debt": 0.3, "cash": 0.2}
+        recommended_allocation = RECOMMENDED_ALLOCATIONS.get(risk_profile, RECOMMENDED_ALLOCATIONS["moderate"])
 
         allocation_analysis = AssetAllocationAnalysis(
             age=age,
@@ -142,4 +112,5 @@ class InvestmentStrategyOptimizerTool(BaseTool):
         data = load_mcp_snapshot()
         if data is None:
             raise FileNotFoundError("mcp_snapshot.json not found.")
-        return InvestmentStrategyInput(financial_data=data)
+        # Reflect streamed prices when a price feed is running
+        return InvestmentStrategyInput(financial_data=live_snapshot(data))
@@ -0,0 +1,277 @@
+# tools/llm_client.py
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.runnables import Runnable
+
+
+class QuotaExceeded(Exception):
+    """Raised when the client-side request quota for the current period is used up."""
+
+
+class RateLimited(Exception):
+    """Raised when a request would wait longer than `max_wait` for a rate-limit token."""
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1, max_wait: float = None) -> float:
+        """Takes `tokens`, sleeping until they are available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            if max_wait is not None and waited + delay > max_wait:
+                raise RateLimited(f"rate limit wait {waited + delay:.2f}s exceeds {max_wait}s")
+            self._sleep(delay)
+            waited += delay
+
+
+def _prompt_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    if hasattr(value, "to_string"):
+        return value.to_string()
+    return repr(value)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class _Request:
+    __slots__ = ("input", "config", "kwargs", "future", "enqueued")
+
+    def __init__(self, input, config, kwargs):
+        self.input = input
+        self.config = config
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class CoalescingLLM(Runnable):
+    """Wraps an LLM so concurrent sessions share calls and respect client-side limits.
+
+    - Identical prompts (same text, stop sequences and options) already in flight
+      are coalesced: later callers wait for the first call's result (single-flight).
+    - With `batch_window` > 0, requests arriving within the window with the same
+      options go to the model together through `llm.batch`.
+    - A token bucket limits prompts per second and `quota` caps prompts per
+      `quota_period`; each prompt sent to the model costs one token.
+
+    `stats()` reports queue wait (batch window + rate limiting) separately from
+    model latency. Being a Runnable, it drops into create_react_agent and the
+    parallel agent in place of the raw model.
+    """
+
+    def __init__(self, llm, rate: float = None, burst: float = None, quota: int = None,
+                 quota_period: float = 86400.0, batch_window: float = 0.0, max_batch: int = 8,
+                 max_wait: float = None, max_workers: int = 8, history: int = 1000):
+        self.llm = llm
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.quota = quota
+        self.quota_period = quota_period
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._quota_used = 0
+        self._quota_reset = time.monotonic() + quota_period
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._dispatcher = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lakshya-llm")
+        self._queue_waits = deque(maxlen=history)
+        self._latencies = deque(maxlen=history)
+        self.counts = {"requests": 0, "coalesced": 0, "model_calls": 0, "batches": 0,
+                       "batched_prompts": 0, "errors": 0}
+
+    # --- limits ---
+    def _take_quota(self, prompts: int):
+        if self.quota is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._quota_reset:
+                self._quota_used, self._quota_reset = 0, now + self.quota_period
+            if self._quota_used + prompts > self.quota:
+                raise QuotaExceeded(f"{self._quota_used}/{self.quota} prompts used this period")
+            self._quota_used += prompts
+
+    def _admit(self, prompts: int):
+        self._take_quota(prompts)
+        if self.bucket is not None:
+            self.bucket.acquire(prompts, self.max_wait)
+
+    # --- model calls ---
+    def _key(self, input, kwargs) -> str:
+        return json.dumps([_prompt_text(input), kwargs], sort_keys=True, default=str)
+
+    def _record(self, waits: List[float], latency: float, prompts: int):
+        with self._lock:
+            self._queue_waits.extend(waits)
+            self._latencies.append(latency)
+            self.counts["model_calls"] += 1
+            if prompts > 1:
+                self.counts["batches"] += 1
+                self.counts["batched_prompts"] += prompts
+
+    def _call_direct(self, input, config, kwargs):
+        enqueued = time.perf_counter()
+        self._admit(1)
+        started = time.perf_counter()
+        try:
+            return self.llm.invoke(input, config=config, **kwargs)
+        finally:
+            self._record([started - enqueued], time.perf_counter() - started, 1)
+
+    def _run_group(self, group: List[_Request]):
+        try:
+            self._admit(len(group))
+        except Exception as e:
+            for request in group:
+                request.future.set_exception(e)
+            return
+        started = time.perf_counter()
+        waits = [started - r.enqueued for r in group]
+        try:
+            if len(group) == 1:
+                results = [self.llm.invoke(group[0].input, config=group[0].config, **group[0].kwargs)]
+            else:
+                results = self.llm.batch([r.input for r in group], config=[r.config or {} for r in group],
+                                         return_exceptions=True, **group[0].kwargs)
+        except Exception as e:
+            results = [e] * len(group)
+        self._record(waits, time.perf_counter() - started, len(group))
+        for request, result in zip(group, results):
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Only requests with identical options can share one batch call
+            groups: Dict[str, List[_Request]] = {}
+            for request in batch:
+                groups.setdefault(json.dumps(request.kwargs, sort_keys=True, default=str), []).append(request)
+            for group in groups.values():
+                self._pool.submit(self._run_group, group)
+
+    def _call_batched(self, input, config, kwargs):
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True,
+                                                    name="lakshya-llm-batcher")
+                self._dispatcher.start()
+        request = _Request(input, config, kwargs)
+        self._queue.put(request)
+        return request.future.result()
+
+    def invoke(self, input, config: Optional[Dict] = None, **kwargs: Any):
+        key = self._key(input, kwargs)
+        with self._lock:
+            self.counts["requests"] += 1
+            shared = self._inflight.get(key)
+            if shared is None:
+                future = self._inflight[key] = Future()
+            else:
+                self.counts["coalesced"] += 1
+        if shared is not None:
+            return shared.result()
+        try:
+            call = self._call_batched if self.batch_window > 0 else self._call_direct
+            result = call(input, config, kwargs)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            with self._lock:
+                self.counts["errors"] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stream(self, input, config: Optional[Dict] = None, **kwargs: Any) -> Iterator:
+        """Streams straight from the model (no coalescing), subject to the same limits."""
+        if not hasattr(self.llm, "stream"):
+            yield self.invoke(input, config, **kwargs)
+            return
+        enqueued = time.perf_counter()
+        self._admit(1)
+        started = time.perf_counter()
+        try:
+            yield from self.llm.stream(input, config=config, **kwargs)
+        finally:
+            self._record([started - enqueued], time.perf_counter() - started, 1)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            waits, latencies = list(self._queue_waits), list(self._latencies)
+            stats = dict(self.counts)
+            stats["quota_used"] = self._quota_used if self.quota is not None else None
+        stats.update({
+            "queue_wait_p50_s": round(_percentile(waits, 0.5), 4),
+            "queue_wait_p95_s": round(_percentile(waits, 0.95), 4),
+            "model_latency_p50_s": round(_percentile(latencies, 0.5), 4),
+            "model_latency_p95_s": round(_percentile(latencies, 0.95), 4),
+        })
+        return stats
+
+
+def wrap_llm_from_env(llm):
+    """Applies LAKSHYA_LLM_RPM, LAKSHYA_LLM_DAILY_QUOTA and LAKSHYA_LLM_BATCH_MS to `llm`.
+
+    Returns `llm` itself when none of them is set.
+    """
+    rpm = float(os.getenv("LAKSHYA_LLM_RPM", 0))
+    quota = int(os.getenv("LAKSHYA_LLM_DAILY_QUOTA", 0))
+    batch_window = float(os.getenv("LAKSHYA_LLM_BATCH_MS", 0)) / 1000
+    if not (rpm or quota or batch_window):
+        return llm
+    return CoalescingLLM(
+        llm,
+        rate=rpm / 60 if rpm else None,
+        burst=max(1.0, rpm / 60) if rpm else None,
+        quota=quota or None,
+        batch_window=batch_window,
+    )
@@ -20,6 +20,32 @@ def calculate_emi(principal, rate, years):
     emi = (principal * monthly_rate * (1 + monthly_rate) ** months) / (((1 + monthly_rate) ** months) - 1)
     return emi
 
+def assess_loan_eligibility(data: Dict, loan_amount: float = 5000000,
+                            interest_rate: float = 8.0, tenure_years: int = 20) -> Dict:
+    """EMI affordability numbers behind the loan eligibility verdict."""
+    income = data.get("income", {})
+    liabilities = data.get("liabilities", {})
+    monthly_salary = income.get("monthly_salary", 0)
+
+    # Calculate EMIs
+    max_affordable_emi = monthly_salary * 0.35
+    emi = calculate_emi(loan_amount, interest_rate, tenure_years)
+
+    # Sum existing EMIs from liabilities
+    existing_emi = 0
+    for amount in liabilities.values():
+        existing_emi += calculate_emi(amount, interest_rate, tenure_years)
+
+    total_emi = existing_emi + emi
+    return {
+        "monthly_salary": monthly_salary,
+        "requested_emi": emi,
+        "existing_emi": existing_emi,
+        "max_affordable_emi": max_affordable_emi,
+        "eligible": monthly_salary > 0 and total_emi <= max_affordable_emi,
+        "headroom": max_affordable_emi - total_emi,
+    }
+
 class LoanEligibilityTool(BaseTool):
     def __init__(self):
         super().__init__(
@@ -36,28 +62,20 @@ class LoanEligibilityTool(BaseTool):
                 msg = "❌ Financial data snapshot not found. Please fetch your data via Fi MCP first."
                 return LoanEligibilityOutput(result=msg)
 
-            # Extract financial fields
-            income = data.get("income", {})
-            liabilities = data.get("liabilities", {})
-            monthly_salary = income.get("monthly_salary", 0)
+            assessment = assess_loan_eligibility(
+                data, input.loan_amount, input.interest_rate, input.tenure_years
+            )
 
-            if monthly_salary == 0:
+            if assessment["monthly_salary"] == 0:
                 result = "❌ Monthly salary not found in financial data."
                 return LoanEligibilityOutput(result=result)
 
-            # Calculate EMIs
-            max_affordable_emi = monthly_salary * 0.35
-            emi = calculate_emi(input.loan_amount, input.interest_rate, input.tenure_years)
-
-            # Sum existing EMIs from liabilities
-            existing_emi = 0
-            for amount in liabilities.values():
-                existing_emi += calculate_emi(amount, input.interest_rate, input.tenure_years)
-
-            total_emi = existing_emi + emi
+            emi = assessment["requested_emi"]
+            existing_emi = assessment["existing_emi"]
+            max_affordable_emi = assessment["max_affordable_emi"]
 
             # Determine eligibility
-            if total_emi > max_affordable_emi:
+            if not assessment["eligible"]:
                 result = (
                     f"⚠️ You may not be eligible for a ₹{input.loan_amount:,.0f} loan.\n"
                     f"- Requested EMI: ₹{emi:,.0f}\n"
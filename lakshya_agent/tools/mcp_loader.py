@@ -1,10 +1,63 @@
+import hashlib
 import json
 import os
+import threading
+from collections.abc import Mapping
+
+from .tracing import span
+
+_cache = {}
+_lock = threading.Lock()
+# id(snapshot) -> (snapshot, version) for snapshots returned by the loader
+_versions = {}
 
 def load_mcp_snapshot():
-    file_path = os.path.join("lakshya_agent", "mcp_snapshot.json")
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return None
\ No newline at end of file
+    """Parsed snapshot, shared between callers until the file changes on disk (treat as read-only)."""
+    with span("snapshot.load") as current:
+        file_path = os.path.join("lakshya_agent", "mcp_snapshot.json")
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            current.set(found=False)
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        with _lock:
+            cached = _cache.get(file_path)
+            if cached and cached[0] == key:
+                current.set(cache="hit")
+                return cached[1]
+            current.set(cache="miss", bytes=stat.st_size)
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                return None
+            _cache[file_path] = (key, data)
+            _versions.clear()
+            return data
+
+def _jsonable(value):
+    # Snapshot overlays are Mappings rather than dicts
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+def snapshot_version(snapshot) -> str:
+    """Short content hash identifying a snapshot, used as a cache key.
+
+    Hashed once per loaded snapshot: the loader's shared (read-only) object keeps its version.
+    """
+    known = _versions.get(id(snapshot))
+    if known is not None and known[0] is snapshot:
+        return known[1]
+    payload = json.dumps(snapshot, sort_keys=True, default=_jsonable)
+    version = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+    with _lock:
+        if any(data is snapshot for _, data in _cache.values()):
+            _versions[id(snapshot)] = (snapshot, version)
+    return version
+
+def current_snapshot_version():
+    """Version of the snapshot on disk, hashed once per file change; None when there is no snapshot."""
+    snapshot = load_mcp_snapshot()
+    return None if snapshot is None else snapshot_version(snapshot)
@@ -0,0 +1,163 @@
+# tools/memory_compaction.py
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from tools.context_budget import digest_observation
+
+logger = logging.getLogger("lakshya.memory")
+
+DAY_S = 86400
+
+
+def _period(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y-%m")
+
+
+def _summary_text(tool: str, period: str, count: int, texts: List[str], max_tokens: int) -> str:
+    lines = list(dict.fromkeys(line.strip() for text in texts for line in text.splitlines() if line.strip()))
+    header = f"Summary of {count} earlier {tool} results ({period}):"
+    return digest_observation("\n".join([header] + lines), max_tokens)
+
+
+def compact_memory(store, now: Optional[float] = None, ttl_days: float = 90, summary_ttl_days: float = 365,
+                   max_entries_per_user: int = 500, summary_tokens: int = 120) -> Dict:
+    """One compaction pass over a LocalVectorMemory.
+
+    - keeps the latest entry per (user, tool, snapshot version);
+    - folds superseded and expired (older than `ttl_days`) entries into one
+      summary entry per (user, tool, month), merging with an existing summary;
+    - drops summaries older than `summary_ttl_days`;
+    - caps each user at `max_entries_per_user`, oldest first.
+    Deleted slots go on the store's free list, so nothing is rebuilt.
+    """
+    now = now or time.time()
+    entries = list(store.live_entries())
+    stats = {"scanned": len(entries), "superseded": 0, "expired": 0, "summaries_dropped": 0,
+             "capped": 0, "summaries_written": 0}
+
+    latest: Dict[tuple, Dict] = {}
+    for entry in sorted((e for e in entries if not e["metadata"].get("summary")), key=lambda e: e["ts"]):
+        meta = entry["metadata"]
+        latest[(meta.get("user_id", "default"), meta.get("source_tool"), meta.get("snapshot_version"))] = entry
+    keep_ids = {e["id"] for e in latest.values()}
+
+    delete, fold = set(), {}
+    for entry in entries:
+        meta = entry["metadata"]
+        user, tool = meta.get("user_id", "default"), meta.get("source_tool")
+        if meta.get("summary"):
+            if now - meta.get("last_ts", entry["ts"]) > summary_ttl_days * DAY_S:
+                delete.add(entry["id"])
+                stats["summaries_dropped"] += 1
+            continue
+        expired = now - entry["ts"] > ttl_days * DAY_S
+        if entry["id"] in keep_ids and not expired:
+            continue
+        stats["expired" if expired else "superseded"] += 1
+        delete.add(entry["id"])
+        fold.setdefault((user, tool, _period(entry["ts"])), []).append(entry)
+
+    # Merge folded entries into the existing summary for their period, if any
+    summaries = {}
+    for entry in entries:
+        meta = entry["metadata"]
+        if meta.get("summary") and entry["id"] not in delete:
+            summaries[(meta.get("user_id", "default"), meta.get("source_tool"), meta.get("period"))] = entry
+    new_summaries = []
+    for (user, tool, period), folded in fold.items():
+        folded.sort(key=lambda e: e["ts"], reverse=True)
+        previous = summaries.get((user, tool, period))
+        texts = [e["text"] for e in folded]
+        count, first_ts, last_ts = len(folded), folded[-1]["ts"], folded[0]["ts"]
+        if previous is not None:
+            delete.add(previous["id"])
+            texts.append(previous["text"].split("\n", 1)[1] if "\n" in previous["text"] else "")
+            count += previous["metadata"].get("merged", 0)
+            first_ts = min(first_ts, previous["metadata"].get("first_ts", first_ts))
+            last_ts = max(last_ts, previous["metadata"].get("last_ts", last_ts))
+        new_summaries.append((
+            _summary_text(tool, period, count, texts, summary_tokens),
+            {"source_tool": tool, "user_id": user, "summary": True, "period": period, "merged": count,
+             "first_ts": first_ts, "last_ts": last_ts},
+        ))
+
+    # Per-user cap over what survives (new summaries ranked by their newest merged entry)
+    by_user: Dict[str, List[tuple]] = {}
+    for entry in entries:
+        if entry["id"] not in delete:
+            meta = entry["metadata"]
+            by_user.setdefault(meta.get("user_id", "default"), []).append((meta.get("last_ts", entry["ts"]), entry["id"], None))
+    for i, (_, meta) in enumerate(new_summaries):
+        by_user.setdefault(meta["user_id"], []).append((meta["last_ts"], None, i))
+    dropped = set()
+    for items in by_user.values():
+        items.sort(key=lambda item: item[0], reverse=True)
+        for _, entry_id, summary_no in items[max_entries_per_user:]:
+            stats["capped"] += 1
+            if entry_id is not None:
+                delete.add(entry_id)
+            else:
+                dropped.add(summary_no)
+    new_summaries = [s for i, s in enumerate(new_summaries) if i not in dropped]
+
+    store.delete(delete)
+    for text, meta in new_summaries:
+        store.add_memory_entry(text, meta)
+    stats["summaries_written"] = len(new_summaries)
+    stats["live_after"] = len(store)
+    store.flush()
+    return stats
+
+
+class MemoryCompactor:
+    """Runs compact_memory on a store every `interval` seconds in a daemon thread."""
+
+    def __init__(self, store, interval: float = 3600, **options):
+        self.store = store
+        self.interval = interval
+        self.options = options
+        self.last_stats: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-compactor", daemon=True)
+
+    def start(self) -> "MemoryCompactor":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_stats = compact_memory(self.store, **self.options)
+                logger.info("memory compaction %s", self.last_stats)
+            except Exception:
+                logger.exception("Memory compaction failed")
+
+
+def compaction_options(config: Dict) -> Dict:
+    """compact_memory keyword arguments from the `runner.memory` block of agent.yaml."""
+    options = {}
+    for key, cast in (("ttl_days", float), ("summary_ttl_days", float), ("max_entries_per_user", int)):
+        if key in config:
+            options[key] = cast(config[key])
+    return options
+
+
+def _main():
+    from tools.agent_config import load_agent_config
+    from tools.memory_utils import get_memory
+
+    logging.basicConfig(level=logging.INFO)
+    config = load_agent_config().get("runner", {}).get("memory", {})
+    if config.get("type") != "local_ann":
+        raise SystemExit("Compaction applies to the local_ann memory backend (runner.memory.type in agent.yaml)")
+    print(compact_memory(get_memory(None), **compaction_options(config)))
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,7 +1,33 @@
 # tools/memory_utils.py
+import os
+
+from tools.agent_config import load_agent_config
+
+
+def get_memory(context=None):
+    """Memory backend: the local ANN store when agent.yaml selects `local_ann`, else the context's memory."""
+    config = load_agent_config().get("runner", {}).get("memory", {})
+    if config.get("type") == "local_ann":
+        from tools.vector_memory import local_memory
+        return local_memory(config)
+    return context.memory
+
+
+def _user_id(context) -> str:
+    invocation = getattr(context, "_invocation_context", None)
+    return getattr(invocation, "user_id", None) or os.getenv("LAKSHYA_USER_ID", "default")
+
 
 def store_tool_output(context, tool_name: str, summary: str, metadata: dict = None):
-    """Writes a tool's summary into memory with optional metadata."""
+    """Queues a tool's summary for memory with optional metadata (written behind, deduplicated)."""
+    from tools.memory_writer import memory_writer
+    from tools.mcp_loader import current_snapshot_version
     metadata = metadata or {}
     metadata.update({"source_tool": tool_name})
-    context.memory.add_memory_entry(text=summary, metadata=metadata)
+    # Compaction keeps the latest entry per (user, tool, snapshot version)
+    metadata.setdefault("user_id", _user_id(context))
+    if "snapshot_version" not in metadata:
+        version = current_snapshot_version()
+        if version is not None:
+            metadata["snapshot_version"] = version
+    memory_writer().enqueue(get_memory(context), summary, metadata)
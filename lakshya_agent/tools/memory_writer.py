@@ -0,0 +1,250 @@
+# tools/memory_writer.py
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("lakshya.memory")
+
+
+def entry_key(text: str, metadata: Dict) -> str:
+    """Dedup key: content hash plus the user, tool and snapshot version it belongs to."""
+    parts = (metadata.get("user_id", "default"), metadata.get("source_tool", ""),
+             metadata.get("snapshot_version") or "", text)
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class WriteBehindMemory:
+    """Queues memory writes off the tool's critical path and flushes them in batches.
+
+    `enqueue` returns immediately after appending the entry to a local journal.
+    A background thread writes pending entries when `batch_size` accumulate or
+    `flush_interval` seconds pass, grouped per backend (`add_many` when the
+    backend has it). Entries whose (content, user, tool, snapshot version) was
+    already queued or recently written are dropped. After a crash, journaled
+    entries that never reached a backend are replayed into `resolve_backend()`.
+    """
+
+    def __init__(self, journal_path: Optional[str] = None, resolve_backend: Callable = None,
+                 batch_size: int = 32, flush_interval: float = 2.0, dedup_size: int = 4096,
+                 max_pending: int = 10000):
+        self.journal_path = journal_path
+        self.resolve_backend = resolve_backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_size = dedup_size
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # one batch in flight, whether from the thread or flush()
+        self._pending: "OrderedDict[str, Dict]" = OrderedDict()
+        self._written: "OrderedDict[str, None]" = OrderedDict()
+        self._journal = None
+        self._closed = False
+        self._stats = {"enqueued": 0, "deduplicated": 0, "written": 0, "batches": 0, "failed_batches": 0,
+                       "recovered": 0, "dropped": 0}
+        if journal_path:
+            os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+            self._recover()
+            self._journal = open(journal_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+
+    # --- journal ---
+    def _recover(self):
+        if not os.path.exists(self.journal_path):
+            return
+        items = []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    break  # torn final line from a crash
+        if items:
+            for item in items:
+                item["backend"] = None
+                self._pending[item["key"]] = item
+            self._stats["recovered"] = len(items)
+            logger.info("Recovered %d unflushed memory entries from %s", len(items), self.journal_path)
+
+    def _rewrite_journal(self):
+        """Shrinks the journal to the still-pending entries (called with the lock held)."""
+        if self._journal is None:
+            return
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for item in self._pending.values():
+                f.write(json.dumps(self._journal_record(item), ensure_ascii=False) + "\n")
+        self._journal.close()
+        os.replace(tmp, self.journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _journal_record(item: Dict) -> Dict:
+        return {"key": item["key"], "text": item["text"], "metadata": item["metadata"], "ts": item["ts"]}
+
+    # --- public interface ---
+    def seed(self, keys):
+        """Marks keys as already written (e.g. from entries the backend holds on disk)."""
+        with self._cond:
+            for key in keys:
+                self._remember(key)
+
+    def _remember(self, key: str):
+        self._written[key] = None
+        self._written.move_to_end(key)
+        while len(self._written) > self.dedup_size:
+            self._written.popitem(last=False)
+
+    def enqueue(self, backend, text: str, metadata: Dict = None) -> bool:
+        """Queues an entry for `backend`; False when it duplicates a queued or recent write."""
+        metadata = dict(metadata or {})
+        key = entry_key(text, metadata)
+        item = {"key": key, "text": text, "metadata": metadata, "ts": time.time(), "backend": backend}
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("memory writer is closed")
+            if key in self._pending or key in self._written:
+                self._stats["deduplicated"] += 1
+                return False
+            if len(self._pending) >= self.max_pending:
+                # Backend is down for long: keep memory bounded by dropping the oldest entry
+                self._pending.popitem(last=False)
+                self._stats["dropped"] += 1
+            self._pending[key] = item
+            self._stats["enqueued"] += 1
+            if self._journal is not None:
+                self._journal.write(json.dumps(self._journal_record(item), ensure_ascii=False) + "\n")
+                self._journal.flush()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Writes everything pending now; True when the queue drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if not self._pending:
+                    return True
+                batch = list(self._pending.values())[: self.batch_size]
+            if not self._write(batch):
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                with self._cond:
+                    return not self._pending
+
+    def close(self, timeout: float = 10.0):
+        """Drains the queue and stops the background thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self.flush(timeout)
+        with self._cond:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {**self._stats, "pending": len(self._pending)}
+
+    # --- flushing ---
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+                batch = list(self._pending.values())[: self.batch_size]
+            if batch and not self._write(batch):
+                # Backend failing: back off one interval before retrying
+                with self._cond:
+                    self._cond.wait(self.flush_interval)
+
+    def _write(self, batch: List[Dict]) -> bool:
+        with self._write_lock:
+            with self._cond:
+                # Recovered entries that reached the backend before the crash are not written twice
+                for item in batch:
+                    if item["key"] in self._written and self._pending.pop(item["key"], None) is not None:
+                        self._stats["deduplicated"] += 1
+                batch = [item for item in batch if item["key"] in self._pending]
+            return self._write_batch(batch) if batch else True
+
+    def _write_batch(self, batch: List[Dict]) -> bool:
+        groups: Dict[int, List[Dict]] = {}
+        for item in batch:
+            if item["backend"] is None and self.resolve_backend is not None:
+                item["backend"] = self.resolve_backend()
+            groups.setdefault(id(item["backend"]), []).append(item)
+        done, ok = [], True
+        for items in groups.values():
+            backend = items[0]["backend"]
+            if backend is None:
+                logger.warning("No memory backend for %d recovered entries; dropping them", len(items))
+                done.extend(items)
+                continue
+            try:
+                if hasattr(backend, "add_many"):
+                    backend.add_many([i["text"] for i in items], [i["metadata"] for i in items])
+                    if hasattr(backend, "flush"):
+                        backend.flush()
+                else:
+                    for i in items:
+                        backend.add_memory_entry(text=i["text"], metadata=i["metadata"])
+                done.extend(items)
+            except Exception:
+                logger.exception("Memory write of %d entries failed; will retry", len(items))
+                ok = False
+        with self._cond:
+            for item in done:
+                if self._pending.pop(item["key"], None) is not None:
+                    self._remember(item["key"])
+            self._stats["written"] += len(done)
+            self._stats["batches"] += 1
+            self._stats["failed_batches"] += 0 if ok else 1
+            if done:
+                self._rewrite_journal()
+        return ok
+
+
+_writer: Optional[WriteBehindMemory] = None
+_writer_lock = threading.Lock()
+
+
+def memory_writer() -> WriteBehindMemory:
+    """Process-wide write-behind queue; its journal sits next to the local memory store."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            from tools.agent_config import load_agent_config
+            from tools.memory_utils import get_memory
+            config = load_agent_config().get("runner", {}).get("memory", {})
+            base = config.get("path", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                   ".lakshya_memory"))
+            local = config.get("type") == "local_ann"
+            _writer = WriteBehindMemory(
+                journal_path=os.getenv("LAKSHYA_MEMORY_JOURNAL", os.path.join(base, "write_journal.jsonl")),
+                resolve_backend=(lambda: get_memory(None)) if local else None,
+                batch_size=int(os.getenv("LAKSHYA_MEMORY_BATCH", 32)),
+                flush_interval=float(os.getenv("LAKSHYA_MEMORY_FLUSH_S", 2.0)),
+            )
+            if local:
+                store = get_memory(None)
+                _writer.seed(entry_key(e["text"], e["metadata"])
+                             for e in store.entries[-_writer.dedup_size:] if e is not None)
+                if config.get("compact_every_s"):
+                    from tools.memory_compaction import MemoryCompactor, compaction_options
+                    MemoryCompactor(store, float(config["compact_every_s"]), **compaction_options(config)).start()
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,231 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+
+def _to_day(value) -> np.datetime64:
+    """Parses 'YYYY-MM' or 'YYYY-MM-DD' (or a date) into a day; months map to their 1st."""
+    return np.datetime64(np.datetime64(value), "D")
+
+
+def _read_only(view: np.ndarray) -> np.ndarray:
+    view.flags.writeable = False
+    return view
+
+
+class NetWorthSeries:
+    """Sorted, array-backed net worth series with running aggregates.
+
+    Appending a point at or after the latest date is O(1) amortized and keeps
+    the peak and max drawdown current, so trend queries never rescan or resort.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._days = np.empty(max(capacity, 1), dtype="datetime64[D]")
+        self._values = np.empty(max(capacity, 1), dtype=float)
+        self._size = 0
+        self._peak = -np.inf
+        self._max_drawdown = 0.0
+        self._frozen = False
+
+    @classmethod
+    def from_history(cls, history: List[Dict], date_key: str = "month", value_key: str = "value"):
+        """Builds a series from snapshot rows, sorting them once."""
+        series = cls(capacity=len(history) * 2)
+        if not history:
+            return series
+        days = np.array([_to_day(row[date_key]) for row in history], dtype="datetime64[D]")
+        values = np.array([float(row[value_key]) for row in history])
+        series._load(days, values)
+        return series
+
+    def _load(self, days: np.ndarray, values: np.ndarray):
+        order = np.argsort(days, kind="stable")
+        n = len(days)
+        if n > len(self._values):
+            self._days = np.empty(n * 2, dtype="datetime64[D]")
+            self._values = np.empty(n * 2, dtype=float)
+        self._days[:n] = days[order]
+        self._values[:n] = values[order]
+        self._size = n
+        self._recompute_aggregates()
+
+    def _recompute_aggregates(self):
+        values = self.values
+        if not len(values):
+            self._peak, self._max_drawdown = -np.inf, 0.0
+            return
+        peaks = np.maximum.accumulate(values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = np.where(peaks > 0, (peaks - values) / peaks, 0.0)
+        self._peak = float(peaks[-1])
+        self._max_drawdown = float(drawdowns.max())
+
+    def _grow(self):
+        capacity = len(self._values) * 2
+        days = np.empty(capacity, dtype="datetime64[D]")
+        values = np.empty(capacity, dtype=float)
+        days[:self._size] = self._days[:self._size]
+        values[:self._size] = self._values[:self._size]
+        self._days, self._values = days, values
+
+    def freeze(self) -> "NetWorthSeries":
+        """Makes the series read-only (shared cached series are frozen)."""
+        self._frozen = True
+        return self
+
+    def copy(self) -> "NetWorthSeries":
+        """Writable copy of the series."""
+        return self.window()
+
+    def append(self, when, value: float):
+        """Adds a point. In-order appends are O(1); late points fall back to an insert."""
+        if self._frozen:
+            raise ValueError("This series is shared and read-only; append to a copy() instead")
+        day = _to_day(when)
+        value = float(value)
+        if self._size and day < self._days[self._size - 1]:
+            idx = int(np.searchsorted(self.dates, day, side="right"))
+            self._load(np.insert(self.dates, idx, day), np.insert(self.values, idx, value))
+            return
+        if self._size and day == self._days[self._size - 1]:
+            # Restated figure for the latest period replaces the old one
+            self._values[self._size - 1] = value
+            self._recompute_aggregates()
+            return
+        if self._size == len(self._values):
+            self._grow()
+        self._days[self._size] = day
+        self._values[self._size] = value
+        self._size += 1
+        self._peak = max(self._peak, value)
+        if self._peak > 0:
+            self._max_drawdown = max(self._max_drawdown, (self._peak - value) / self._peak)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dates(self) -> np.ndarray:
+        return _read_only(self._days[:self._size])
+
+    @property
+    def values(self) -> np.ndarray:
+        return _read_only(self._values[:self._size])
+
+    @property
+    def first(self):
+        return self._days[0], float(self._values[0])
+
+    @property
+    def last(self):
+        return self._days[self._size - 1], float(self._values[self._size - 1])
+
+    @property
+    def peak(self) -> float:
+        return self._peak
+
+    @property
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough fall as a fraction of the peak."""
+        return self._max_drawdown
+
+    def change(self):
+        """Absolute and percentage change from the first to the latest point."""
+        start, end = self.first[1], self.last[1]
+        change = end - start
+        return change, (change / start) * 100 if start != 0 else 0
+
+    def cagr(self) -> Optional[float]:
+        """Compound annual growth rate between the first and latest point."""
+        if self._size < 2:
+            return None
+        (start_day, start), (end_day, end) = self.first, self.last
+        years = (end_day - start_day).astype(int) / 365.25
+        if start <= 0 or end <= 0 or years <= 0:
+            return None
+        return (end / start) ** (1 / years) - 1
+
+    def growth(self, periods: int = 1) -> Optional[float]:
+        """Percentage growth over the last `periods` points."""
+        if periods <= 0 or self._size <= periods:
+            return None
+        base = self._values[self._size - 1 - periods]
+        if base == 0:
+            return None
+        return (self._values[self._size - 1] / base - 1) * 100
+
+    def rolling_growth(self, window: int) -> np.ndarray:
+        """Percentage growth over each trailing `window` points (NaN where undefined)."""
+        values = self.values
+        out = np.full(len(values), np.nan)
+        if 0 < window < len(values):
+            base = values[:-window]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[window:] = np.where(base != 0, (values[window:] / base - 1) * 100, np.nan)
+        return out
+
+    def value_at(self, when) -> Optional[float]:
+        """Latest value on or before `when`."""
+        idx = int(np.searchsorted(self.dates, _to_day(when), side="right")) - 1
+        return float(self._values[idx]) if idx >= 0 else None
+
+    def window(self, start=None, end=None) -> "NetWorthSeries":
+        """Sub-series with dates in [start, end]."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, _to_day(start), side="left"))
+        hi = self._size if end is None else int(np.searchsorted(self.dates, _to_day(end), side="right"))
+        series = NetWorthSeries(capacity=max(hi - lo, 1))
+        if hi > lo:
+            series._load(self.dates[lo:hi].copy(), self.values[lo:hi].copy())
+        return series
+
+    def resample(self, freq: str) -> "NetWorthSeries":
+        """Returns a monthly ('M', last value per month) or daily ('D', interpolated) series."""
+        if not self._size:
+            return NetWorthSeries()
+        if freq == "M":
+            months = self.dates.astype("datetime64[M]")
+            last_idx = np.flatnonzero(np.append(months[1:] != months[:-1], True))
+            series = NetWorthSeries(capacity=len(last_idx))
+            series._load(months[last_idx].astype("datetime64[D]"), self.values[last_idx].copy())
+            return series
+        if freq == "D":
+            days = np.arange(self.dates[0], self.dates[-1] + 1)
+            values = np.interp(days.astype(np.int64), self.dates.astype(np.int64), self.values)
+            series = NetWorthSeries(capacity=len(days))
+            series._load(days, values)
+            return series
+        raise ValueError(f"Unsupported frequency: {freq!r} (use 'M' or 'D')")
+
+    def to_history(self, date_format: str = "%Y-%m") -> List[Dict]:
+        return [
+            {"month": day.astype(object).strftime(date_format), "value": float(value)}
+            for day, value in zip(self.dates, self.values)
+        ]
+
+
+_SERIES_CACHE: "OrderedDict[tuple, NetWorthSeries]" = OrderedDict()
+_SERIES_CACHE_SIZE = 32
+_SERIES_LOCK = threading.Lock()
+
+
+def series_for_snapshot(snapshot: Dict, key: str = "net_worth_history", *, version: str) -> NetWorthSeries:
+    """Returns the cached, read-only series for a snapshot history, built once per snapshot version.
+
+    `version` is the caller's snapshot_version; lookups never re-hash the snapshot.
+    """
+    cache_key = (version, key)
+    with _SERIES_LOCK:
+        series = _SERIES_CACHE.get(cache_key)
+        if series is not None:
+            _SERIES_CACHE.move_to_end(cache_key)
+            return series
+    series = NetWorthSeries.from_history(snapshot.get(key, [])).freeze()
+    with _SERIES_LOCK:
+        _SERIES_CACHE[cache_key] = series
+        while len(_SERIES_CACHE) > _SERIES_CACHE_SIZE:
+            _SERIES_CACHE.popitem(last=False)
+    return series
@@ -2,7 +2,9 @@ from google.adk.tools.base_tool import BaseTool
 from google.adk.tools.tool_context import ToolContext
 from pydantic import BaseModel
 from typing import Dict, List
-import pandas as pd
+from .mcp_loader import snapshot_version
+from .net_worth_series import series_for_snapshot
+from .forecasting import get_trend_model
 #from tools.memory_utils import store_tool_output
 
 
@@ -21,26 +23,32 @@ class NetWorthTrendTool(BaseTool):
 
     def __call__(self, input: NetWorthTrendInput, context: ToolContext) -> NetWorthTrendOutput:
         try:
-            history = input.financial_data.get("net_worth_history", [])
-            if not history:
+            # Hashed once per call and shared by the series and model lookups
+            version = snapshot_version(input.financial_data)
+            series = series_for_snapshot(input.financial_data, version=version)
+            if not len(series):
                 return NetWorthTrendOutput(trend_summary="📉 No net worth history data found.")
 
-            df = pd.DataFrame(history)
-            df['month'] = pd.to_datetime(df['month'], format="%Y-%m")
-            df = df.sort_values(by='month')
-            df['value'] = df['value'].astype(float)
-
-            start_value = df.iloc[0]['value']
-            end_value = df.iloc[-1]['value']
-            change = end_value - start_value
-            pct_change = (change / start_value) * 100 if start_value != 0 else 0
+            (start_month, start_value), (end_month, end_value) = series.first, series.last
+            change, pct_change = series.change()
+            cagr = series.cagr()
 
             summary = (
-                f"📊 Net Worth Trend ({df.iloc[0]['month'].strftime('%b %Y')} → {df.iloc[-1]['month'].strftime('%b %Y')}):\n"
+                f"📊 Net Worth Trend ({start_month.astype(object).strftime('%b %Y')} → {end_month.astype(object).strftime('%b %Y')}):\n"
                 f"- Start: ₹{start_value:,.0f}\n"
                 f"- End: ₹{end_value:,.0f}\n"
                 f"- Change: ₹{change:,.0f} ({pct_change:.2f}%)\n"
             )
+            if cagr is not None:
+                summary += f"- CAGR: {cagr * 100:.2f}% | Max drawdown: {series.max_drawdown * 100:.2f}%\n"
+
+            model = get_trend_model(input.financial_data, "net_worth_history", log=True, version=version)
+            if model is not None and model.n >= 3:
+                projection = model.forecast(6)
+                summary += (
+                    f"- Projected ({projection['months'][-1]}): ₹{projection['forecast'][-1]:,.0f} "
+                    f"(range ₹{projection['lower'][-1]:,.0f} – ₹{projection['upper'][-1]:,.0f})\n"
+                )
 
             if pct_change >= 20:
                 summary += "✅ Strong upward trend in your net worth. Keep it up!"
@@ -66,12 +74,11 @@ def get_net_worth_trend(_: str = "") -> str:
     data = load_mcp_snapshot()
     if data is None:
         return "❌ The 'mcp_snapshot.json' file is missing."
-    history = data.get("net_worth_history", [])
-    if not history:
+    series = series_for_snapshot(data, version=snapshot_version(data))
+    if not len(series):
         return "No net worth history found."
-    start = history[0]
-    end = history[-1]
-    change = end["value"] - start["value"]
-    pct = (change / start["value"]) * 100 if start["value"] else 0
-    return (f"Net worth grew from ₹{start['value']:,} to ₹{end['value']:,} "
-            f"({pct:.2f}% change) between {start['month']} and {end['month']}.")
\ No newline at end of file
+    (start_month, start_value), (end_month, end_value) = series.first, series.last
+    change, pct = series.change()
+    return (f"Net worth grew from ₹{start_value:,.0f} to ₹{end_value:,.0f} "
+            f"({pct:.2f}% change) between {start_month.astype(object).strftime('%Y-%m')} "
+            f"and {end_month.astype(object).strftime('%Y-%m')}.")
\ No newline at end of file
@@ -0,0 +1,244 @@
+# tools/parallel_agent.py
+import contextvars
+import inspect
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .context_budget import ContextBudget, estimate_tokens
+from .tracing import end_span, span, start_span
+
+PARALLEL_TEMPLATE = """
+Answer the following questions as best you can. You have access to the following tools:
+
+{tools}
+
+Known facts about the user from the current snapshot. Use them directly and call a tool
+only for details or calculations not covered here:
+{financial_context}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Action: another independent action to run at the same time (optional)
+Action Input: the input to that action
+Observation [action]: the result of each action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question, written clearly for the user.
+
+When several lookups do not depend on each other, request them all in the same step;
+they run in parallel and all observations come back together.
+
+**Always finish with 'Final Answer:' and a clear, concise summary for the user.**
+
+Begin!
+
+Question: {input}
+Thought:{agent_scratchpad}"""
+
+_ACTION_RE = re.compile(
+    r"Action[ \t]*\d*[ \t]*:[ \t]*([^\n]*?)[ \t]*\n[ \t]*Action[ \t]*\d*[ \t]*Input[ \t]*\d*[ \t]*:[ \t]*(.*?)[ \t]*"
+    r"(?=\n[ \t]*(?:Action[ \t]*\d*[ \t]*:|Observation|Thought)|\Z)",
+    re.DOTALL,
+)
+STOP = ["\nObservation"]  # the model must not write the observations itself
+_FINAL_RE = re.compile(r"Final Answer\s*:\s*(.*)", re.DOTALL)
+
+FORMAT_ERROR = (
+    "Invalid Format: reply with 'Action:'/'Action Input:' lines (one pair per tool) "
+    "or with 'Final Answer:'."
+)
+
+
+def _text(result) -> str:
+    return result if isinstance(result, str) else getattr(result, "content", str(result))
+
+
+def _accepts_stop(method) -> bool:
+    """Whether an LLM's invoke/stream takes a `stop` argument (named or through **kwargs)."""
+    try:
+        params = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(p.name == "stop" or p.kind is p.VAR_KEYWORD for p in params)
+
+
+def parse_step(text: str) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+    """Returns (final answer, []) or (None, [(tool, tool input), ...]) for one LLM reply."""
+    # Anything the model writes after its own actions is a hallucinated observation
+    text = re.split(r"\n\s*Observation", text, maxsplit=1)[0]
+    actions = [(name.strip().strip("`"), arg.strip().strip('"')) for name, arg in _ACTION_RE.findall(text)]
+    if actions:
+        return None, actions
+    final = _FINAL_RE.search(text)
+    if final:
+        return final.group(1).strip(), []
+    return None, []
+
+
+class ParallelToolAgent:
+    """ReAct-style loop whose steps may request several tool calls at once.
+
+    All actions from one LLM reply run concurrently on a thread pool and their
+    observations are appended to the scratchpad together, so independent
+    lookups cost one LLM round trip instead of one each. `invoke` mirrors
+    AgentExecutor's input/output dicts.
+    """
+
+    def __init__(self, llm, tools, max_iterations: int = 8, max_workers: int = 8,
+                 template: str = PARALLEL_TEMPLATE, budget: Optional[ContextBudget] = None,
+                 context_fn: Optional[Callable[[], str]] = None):
+        self.llm = llm
+        self.budget = budget or ContextBudget()
+        self.context_fn = context_fn or (lambda: "- (not provided)")
+        self.tools = {t.name: t for t in tools}
+        self.max_iterations = max_iterations
+        self.template = template
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lakshya-tool")
+        self._tool_descriptions = "\n".join(f"{t.name}: {t.description.strip()}" for t in tools)
+        # Decided once, so a TypeError raised inside the model call is never mistaken for this
+        self._invoke_kwargs = {"stop": STOP} if _accepts_stop(llm.invoke) else {}
+        self._stream_kwargs = {"stop": STOP} if _accepts_stop(getattr(llm, "stream", None)) else {}
+
+    def _prompt(self, query: str, scratchpad: str) -> str:
+        context = self.context_fn()
+        self.budget.usage.record_prompt({
+            "template": self.template,
+            "tools": self._tool_descriptions,
+            "financial_context": context,
+            "question": query,
+            "scratchpad": scratchpad,
+        })
+        return self.template.format(
+            tools=self._tool_descriptions,
+            tool_names=", ".join(self.tools),
+            financial_context=context,
+            input=query,
+            agent_scratchpad=scratchpad,
+        )
+
+    def _scratchpad(self, rounds: List[Tuple[str, List[Tuple[str, str]]]]) -> str:
+        # Observations are compacted by the budget; the model's own text is kept as written
+        entries = [entry for _, observed in rounds for entry in observed]
+        overhead = sum(estimate_tokens(text) for text, _ in rounds)
+        compacted = iter(self.budget.compact(entries, overhead))
+        parts = []
+        for reply_text, observed in rounds:
+            lines = [f"Observation [{name}]: {next(compacted)}" if name else f"Observation: {next(compacted)}"
+                     for name, _ in observed]
+            parts.append(reply_text + "\n" + "\n".join(lines) + "\nThought:")
+        return "".join(parts)
+
+    def _call_llm(self, prompt: str) -> str:
+        return _text(self.llm.invoke(prompt, **self._invoke_kwargs))
+
+    def _stream_llm(self, prompt: str) -> Iterator[str]:
+        if not hasattr(self.llm, "stream"):
+            yield self._call_llm(prompt)
+            return
+        for chunk in self.llm.stream(prompt, **self._stream_kwargs):
+            yield _text(chunk)
+
+    def _run_tool(self, name: str, tool_input: str) -> str:
+        tool = self.tools.get(name)
+        if tool is None:
+            return f"{name} is not a valid tool, try one of [{', '.join(self.tools)}]."
+        with span(f"tool:{name}", input=tool_input[:200]) as current:
+            try:
+                output = str(tool.invoke(tool_input))
+            except Exception as e:
+                current.set(error=str(e))
+                return f"Error running {name}: {e}"
+            current.set(output_tokens_est=estimate_tokens(output))
+            return output
+
+    def _submit(self, name: str, tool_input: str):
+        # Tool spans nest under the caller's span on the pool thread
+        return self._pool.submit(contextvars.copy_context().run, self._run_tool, name, tool_input)
+
+    def run_actions(self, actions: List[Tuple[str, str]]) -> List[str]:
+        """Runs the requested tool calls concurrently, preserving request order."""
+        futures = [self._submit(name, arg) for name, arg in actions]
+        return [f.result() for f in futures]
+
+    def stream(self, inputs: Dict) -> Iterator[Dict]:
+        """Runs the loop, yielding events as they happen.
+
+        Events: {"type": "tool_start", "tool", "input"}, {"type": "tool_end", "tool", "output"},
+        {"type": "token", "text"} for the final answer as it is generated, and finally
+        {"type": "final", "output", "intermediate_steps", "token_usage", "stopped"}, where
+        `stopped` is True when the iteration limit ended the loop without an answer.
+        """
+        query = inputs["input"]
+        usage = self.budget.begin()
+        rounds = []
+        steps = []
+        for _ in range(self.max_iterations):
+            reply, emitted = "", 0
+            prompt = self._prompt(query, self._scratchpad(rounds))
+            llm_span = start_span("llm", prompt_tokens_est=estimate_tokens(prompt))
+            try:
+                for chunk in self._stream_llm(prompt):
+                    reply += chunk
+                    # Tokens after "Final Answer:" go out immediately unless the step requested tools
+                    marker = reply.find("Final Answer:")
+                    if marker >= 0 and not _ACTION_RE.search(reply[:marker]):
+                        if not emitted:
+                            body = reply[marker + len("Final Answer:"):].lstrip()
+                            if not body:
+                                continue
+                            emitted = len(reply) - len(body)
+                        if len(reply) > emitted:
+                            yield {"type": "token", "text": reply[emitted:]}
+                            emitted = len(reply)
+            except BaseException as e:
+                end_span(llm_span, e)
+                raise
+
+            llm_span.set(completion_tokens_est=estimate_tokens(reply))
+            end_span(llm_span)
+            with span("parse") as parse_span:
+                final, actions = parse_step(reply)
+                parse_span.set(actions=len(actions), final=final is not None,
+                               format_error=final is None and not actions)
+            if final is not None:
+                yield {"type": "final", "output": final, "intermediate_steps": steps,
+                       "token_usage": usage.to_dict(), "stopped": False}
+                return
+
+            reply_text = re.split(r"\n\s*Observation", reply, maxsplit=1)[0].rstrip()
+            if not actions:
+                rounds.append((reply_text, [("", FORMAT_ERROR)]))
+                continue
+
+            futures = {}
+            for name, arg in actions:
+                yield {"type": "tool_start", "tool": name, "input": arg}
+                futures[self._submit(name, arg)] = name
+            for future in as_completed(futures):
+                yield {"type": "tool_end", "tool": futures[future], "output": future.result()}
+            observations = [f.result() for f in futures]
+            steps.extend(zip(actions, observations))
+            rounds.append((reply_text, [(name, obs) for (name, _), obs in zip(actions, observations)]))
+        yield {
+            "type": "final",
+            "output": "Agent stopped due to iteration limit.",
+            "intermediate_steps": steps,
+            "token_usage": usage.to_dict(),
+            "stopped": True,
+        }
+
+    def invoke(self, inputs: Dict, config: Optional[Dict] = None) -> Dict:
+        for event in self.stream(inputs):
+            if event["type"] == "final":
+                return {
+                    "input": inputs["input"],
+                    "output": event["output"],
+                    "intermediate_steps": event["intermediate_steps"],
+                    "token_usage": event["token_usage"],
+                    "stopped": event["stopped"],
+                }
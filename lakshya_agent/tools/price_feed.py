@@ -0,0 +1,214 @@
+import json
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional
+
+from .asset_index import asset_index
+from .mcp_loader import snapshot_version
+
+if TYPE_CHECKING:
+    from .what_if import SnapshotOverlay
+
+PriceTick = namedtuple("PriceTick", ["symbol", "price", "ts"])
+
+# Holding lists that can be repriced and the field identifying each holding
+PRICED_ASSETS = {"stocks": "symbol", "mutual_funds": "name"}
+
+
+def parse_tick(line: str) -> Optional[PriceTick]:
+    """Parses a JSON ('{"symbol": "TCS", "price": 3890.5}') or CSV ('TCS,3890.5[,ts]') tick."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    try:
+        if line.startswith("{"):
+            data = json.loads(line)
+            return PriceTick(data["symbol"], float(data["price"]), data.get("ts"))
+        parts = [p.strip() for p in line.split(",")]
+        return PriceTick(parts[0], float(parts[1]), parts[2] if len(parts) > 2 else None)
+    except (ValueError, KeyError, IndexError):
+        return None
+
+
+def read_ticks(path: str, follow: bool = False, poll_interval: float = 0.5,
+               stop: Optional[threading.Event] = None) -> Iterator[PriceTick]:
+    """Yields ticks from a local file; with `follow`, keeps tailing it for new lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        while stop is None or not stop.is_set():
+            line = f.readline()
+            if not line:
+                if not follow:
+                    return
+                time.sleep(poll_interval)
+                continue
+            tick = parse_tick(line)
+            if tick:
+                yield tick
+
+
+def read_ticks_from_socket(host: str, port: int,
+                           stop: Optional[threading.Event] = None) -> Iterator[PriceTick]:
+    """Yields newline-delimited ticks from a TCP socket (a stand-in for a market feed)."""
+    with socket.create_connection((host, port)) as conn:
+        conn.settimeout(1.0)
+        buffer = b""
+        while stop is None or not stop.is_set():
+            try:
+                chunk = conn.recv(4096)
+            except socket.timeout:
+                continue
+            if not chunk:
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                tick = parse_tick(line.decode("utf-8", errors="ignore"))
+                if tick:
+                    yield tick
+
+
+class PortfolioRevaluer:
+    """Keeps holding values, category totals and net worth current as prices tick.
+
+    Each tick touches only its own holding: the value delta is applied to the
+    category and portfolio totals, and the holding's field is written into a
+    copy-on-write overlay of the base snapshot.
+    """
+
+    def __init__(self, snapshot: Dict):
+        self.base = snapshot
+        self.base_version = snapshot_version(snapshot)
+        self.prices: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # what_if also defines a LangChain tool; import it only once a feed runs
+        from .what_if import SnapshotOverlay
+        self._overlay = SnapshotOverlay(snapshot, name="live")
+        self._view = None
+        self.ticks_applied = 0
+
+        assets = snapshot.get("assets", {})
+        index = asset_index(snapshot, self.base_version)
+        # Seeded from the shared index, then moved by ticks (the index itself stays read-only)
+        self.category_totals = dict(index.category_totals)
+        self.total_assets = index.total
+        self.total_liabilities = float(sum(snapshot.get("liabilities", {}).values()))
+
+        # symbol -> [category, index, units, value]
+        self._positions = {}
+        for holding in index.holdings:
+            id_field = PRICED_ASSETS.get(holding.category)
+            if id_field is None or holding.index is None:
+                continue
+            item = assets[holding.category][holding.index]
+            if isinstance(item, dict) and item.get(id_field):
+                units = item.get("units")
+                if units is None and item.get("price"):
+                    units = holding.value / float(item["price"])
+                self._positions[item[id_field]] = [holding.category, holding.index, units, holding.value]
+
+    @property
+    def net_worth(self) -> float:
+        return self.total_assets - self.total_liabilities
+
+    def apply(self, tick: PriceTick) -> bool:
+        """Revalues one holding. Returns False for symbols not held."""
+        with self._lock:
+            return self._apply(tick)
+
+    def apply_many(self, ticks: Iterable[PriceTick]) -> int:
+        """Applies a batch, keeping only the last tick per symbol."""
+        latest = {}
+        for tick in ticks:
+            latest[tick.symbol] = tick
+        with self._lock:
+            return sum(self._apply(tick) for tick in latest.values())
+
+    def _apply(self, tick: PriceTick) -> bool:
+        self.prices[tick.symbol] = tick.price
+        position = self._positions.get(tick.symbol)
+        if position is None or tick.price <= 0:
+            return False
+        category, idx, units, old_value = position
+        if units is None:
+            # First price seen for a holding without units: it anchors the current value
+            position[2] = old_value / tick.price
+            return True
+        new_value = units * tick.price
+        delta = new_value - old_value
+        position[3] = new_value
+        self.category_totals[category] += delta
+        self.total_assets += delta
+        self._overlay.set(("assets", category, idx, "current_value"), round(new_value, 2))
+        self._view = None
+        self.ticks_applied += 1
+        return True
+
+    def weights(self) -> Dict[str, float]:
+        """Current share of total assets per asset category."""
+        with self._lock:
+            total = self.total_assets
+            return {k: (v / total if total else 0.0) for k, v in self.category_totals.items()}
+
+    def view(self) -> "SnapshotOverlay":
+        """Revalued snapshot; untouched sections are shared with the base snapshot."""
+        with self._lock:
+            if self._view is None:
+                self._view = self._overlay.freeze()
+            return self._view
+
+    def consume(self, ticks: Iterable[PriceTick], stop: Optional[threading.Event] = None):
+        for tick in ticks:
+            if stop is not None and stop.is_set():
+                break
+            self.apply(tick)
+
+
+_revaluer: Optional[PortfolioRevaluer] = None
+_feed_thread: Optional[threading.Thread] = None
+_feed_stop = threading.Event()
+
+
+def start_price_feed(snapshot: Dict, source: str) -> PortfolioRevaluer:
+    """Starts consuming ticks from `source` ('tcp://host:port' or a file path) in the background."""
+    global _revaluer, _feed_thread
+    stop_price_feed()
+    _feed_stop.clear()
+    revaluer = PortfolioRevaluer(snapshot)
+    if source.startswith("tcp://"):
+        host, port = source[len("tcp://"):].rsplit(":", 1)
+        ticks = read_ticks_from_socket(host, int(port), stop=_feed_stop)
+    else:
+        ticks = read_ticks(source, follow=True, stop=_feed_stop)
+    _feed_thread = threading.Thread(target=revaluer.consume, args=(ticks, _feed_stop), daemon=True)
+    _feed_thread.start()
+    _revaluer = revaluer
+    return revaluer
+
+
+def stop_price_feed():
+    global _revaluer, _feed_thread
+    _feed_stop.set()
+    if _feed_thread is not None:
+        _feed_thread.join(timeout=2)
+    _revaluer, _feed_thread = None, None
+
+
+def ensure_price_feed(snapshot: Dict) -> Optional[PortfolioRevaluer]:
+    """Starts the feed named by LAKSHYA_PRICE_FEED once per snapshot version."""
+    source = os.getenv("LAKSHYA_PRICE_FEED")
+    if not source or snapshot is None:
+        return None
+    if _revaluer is not None and _revaluer.base_version == snapshot_version(snapshot):
+        return _revaluer
+    return start_price_feed(snapshot, source)
+
+
+def live_snapshot(snapshot: Dict):
+    """The snapshot with live prices applied, when a feed is running for it."""
+    revaluer = _revaluer
+    if snapshot is None or revaluer is None or revaluer.base_version != snapshot_version(snapshot):
+        return snapshot
+    return revaluer.view()
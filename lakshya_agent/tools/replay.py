@@ -0,0 +1,195 @@
+# tools/replay.py
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from langchain_core.runnables import Runnable
+from langchain_core.tools import Tool
+
+CASSETTE_FORMAT = 1
+
+
+def _prompt_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    if hasattr(value, "to_string"):
+        return value.to_string()
+    return repr(value)
+
+
+def _response_text(result) -> str:
+    return result if isinstance(result, str) else getattr(result, "content", str(result))
+
+
+def prompt_hash(prompt) -> str:
+    return hashlib.sha1(_prompt_text(prompt).encode("utf-8")).hexdigest()[:16]
+
+
+class CassetteMiss(Exception):
+    """Raised when a replay needs an interaction the cassette does not contain."""
+
+
+class Cassette:
+    """LLM request/response pairs and tool I/O recorded per query.
+
+    Layout: {"format", "recorded_at", "queries": {query: {"llm": [...], "tools": [...]}}}.
+    LLM entries replay in recorded order per query; tool entries are matched by
+    (tool, input) so concurrently run tools replay regardless of completion order.
+    """
+
+    def __init__(self, queries: Optional[Dict] = None, meta: Optional[Dict] = None):
+        self.queries: Dict[str, Dict[str, List[Dict]]] = queries or {}
+        self.meta = meta or {}
+        self.current: Optional[str] = None
+        self._lock = threading.Lock()
+        self._llm_pos = 0
+        self._used_tools = set()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != CASSETTE_FORMAT:
+            raise ValueError(f"Unsupported cassette format in {path}: {data.get('format')}")
+        return cls(data["queries"], {k: v for k, v in data.items() if k not in ("format", "queries")})
+
+    def save(self, path: str):
+        payload = {"format": CASSETTE_FORMAT, "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                   **self.meta, "queries": self.queries}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+
+    def begin(self, query: str, record: bool = False):
+        """Selects the query subsequent LLM/tool calls belong to (and clears it when recording)."""
+        with self._lock:
+            self.current = query
+            self._llm_pos = 0
+            self._used_tools = set()
+            if record:
+                self.queries[query] = {"llm": [], "tools": []}
+            elif query not in self.queries:
+                raise CassetteMiss(f"No recording for query: {query!r}")
+
+    def _entries(self, kind: str) -> List[Dict]:
+        if self.current is None:
+            raise CassetteMiss("Cassette.begin(query) was not called")
+        return self.queries[self.current][kind]
+
+    def record(self, kind: str, entry: Dict):
+        with self._lock:
+            self._entries(kind).append(entry)
+
+    def next_llm(self) -> Dict:
+        with self._lock:
+            entries = self._entries("llm")
+            if self._llm_pos >= len(entries):
+                raise CassetteMiss(f"Query {self.current!r} made more LLM calls than recorded ({len(entries)})")
+            entry = entries[self._llm_pos]
+            self._llm_pos += 1
+            return entry
+
+    def find_tool(self, tool: str, tool_input: str) -> Dict:
+        with self._lock:
+            for i, entry in enumerate(self._entries("tools")):
+                if i not in self._used_tools and entry["tool"] == tool and entry["input"] == tool_input:
+                    self._used_tools.add(i)
+                    return entry
+        raise CassetteMiss(f"No recorded call of {tool}({tool_input!r}) for query {self.current!r}")
+
+
+class RecordingLLM(Runnable):
+    """Passes calls through to `llm` and records each prompt/response into the cassette."""
+
+    def __init__(self, llm, cassette: Cassette):
+        self.llm = llm
+        self.cassette = cassette
+        self.calls = 0
+
+    def _record(self, input, text: str, started: float):
+        self.calls += 1
+        self.cassette.record("llm", {"prompt_sha": prompt_hash(input), "response": text,
+                                     "latency_s": round(time.perf_counter() - started, 4)})
+
+    def invoke(self, input, config=None, **kwargs):
+        started = time.perf_counter()
+        result = self.llm.invoke(input, config=config, **kwargs)
+        self._record(input, _response_text(result), started)
+        return result
+
+    def stream(self, input, config=None, **kwargs):
+        started = time.perf_counter()
+        chunks = []
+        for chunk in self.llm.stream(input, config=config, **kwargs):
+            chunks.append(_response_text(chunk))
+            yield chunk
+        self._record(input, "".join(chunks), started)
+
+
+class ReplayLLM(Runnable):
+    """Answers from the cassette in recorded order, without a model.
+
+    `latency` is "none" (answer immediately), "recorded" (sleep the recorded
+    model latency) or a fixed number of seconds. Prompts that differ from the
+    recording are counted in `mismatches` (or raise CassetteMiss when `strict`).
+    """
+
+    def __init__(self, cassette: Cassette, latency="none", strict: bool = False):
+        self.cassette = cassette
+        self.latency = latency
+        self.strict = strict
+        self.calls = 0
+        self.mismatches = 0
+
+    def invoke(self, input, config=None, **kwargs):
+        entry = self.cassette.next_llm()
+        self.calls += 1
+        if entry["prompt_sha"] != prompt_hash(input):
+            self.mismatches += 1
+            if self.strict:
+                raise CassetteMiss(f"Prompt #{self.calls} differs from the recording")
+        delay = entry.get("latency_s", 0) if self.latency == "recorded" else self.latency
+        if isinstance(delay, (int, float)) and delay > 0:
+            time.sleep(delay)
+        return entry["response"]
+
+
+class ToolTimer:
+    """Accumulates tool wall time per query (tools may run concurrently)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.seconds = 0.0
+
+    def reset(self):
+        with self._lock:
+            self.calls, self.seconds = 0, 0.0
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+
+
+def wrap_tools(tools, cassette: Cassette, mode: str = "live", timer: Optional[ToolTimer] = None) -> List[Tool]:
+    """Wraps tools to record ("record"), replay ("replay") or just time ("live") their I/O."""
+    wrapped = []
+    for original in tools:
+        def run(tool_input: str = "", _tool=original) -> str:
+            started = time.perf_counter()
+            if mode == "replay":
+                output = cassette.find_tool(_tool.name, tool_input)["output"]
+            else:
+                output = str(_tool.invoke(tool_input))
+            elapsed = time.perf_counter() - started
+            if timer is not None:
+                timer.add(elapsed)
+            if mode == "record":
+                cassette.record("tools", {"tool": _tool.name, "input": tool_input, "output": output,
+                                          "latency_s": round(elapsed, 4)})
+            return output
+        wrapped.append(Tool(name=original.name, description=original.description, func=run))
+    return wrapped
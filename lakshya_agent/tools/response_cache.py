@@ -0,0 +1,146 @@
+# tools/response_cache.py
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+# Politeness and filler that never changes what is being asked
+FILLER_PHRASES = [
+    "can you", "could you", "would you", "will you", "please", "kindly", "tell me",
+    "let me know", "i want to know", "i would like to know", "hey", "hi", "hello",
+    "lakshya", "thanks", "thank you",
+]
+
+AMOUNT_UNITS = {"k": 1e3, "thousand": 1e3, "l": 1e5, "lac": 1e5, "lakh": 1e5, "lakhs": 1e5,
+                "cr": 1e7, "crore": 1e7, "crores": 1e7}
+
+_AMOUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(k|thousand|lakhs?|lac|l|crores?|cr)\b")
+_FILLER_RE = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in FILLER_PHRASES) + r")\b")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a question: case, currency, amount units and filler removed."""
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r"(?<=\d),(?=\d)", "", text)
+    text = re.sub(r"₹|\brs\.?|\binr\b|rupees?", " ", text)
+    text = _AMOUNT_RE.sub(lambda m: f"{float(m.group(1)) * AMOUNT_UNITS[m.group(2)]:.0f}", text)
+    text = _FILLER_RE.sub(" ", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """LRU + TTL cache of agent answers keyed by normalized query and snapshot version.
+
+    A lookup with a new snapshot version drops every entry from older versions;
+    answers stored for any other than the current version are ignored. With an
+    `embed_fn` (text -> vector), near-duplicate phrasings within the same version
+    are matched by cosine similarity.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600,
+                 embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+                 similarity_threshold: float = 0.92, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._version = None
+        self._vectors = {}
+        self._matrix = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _switch_version(self, version: str):
+        if version != self._version:
+            self._entries.clear()
+            self._vectors.clear()
+            self._matrix = None
+            self._version = version
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _similar(self, vector: np.ndarray) -> Optional[str]:
+        if not self._vectors:
+            return None
+        if self._matrix is None:
+            keys = list(self._vectors)
+            self._matrix = (keys, np.vstack([self._vectors[k] for k in keys]))
+        keys, matrix = self._matrix
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.similarity_threshold else None
+
+    def _evict(self, key: str):
+        self._entries.pop(key, None)
+        if self._vectors.pop(key, None) is not None:
+            self._matrix = None
+
+    def _lookup(self, key: Optional[str], similar: bool) -> Optional[str]:
+        # Caller holds the lock
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None or entry[1] < self._clock():
+            if entry is not None:
+                self._evict(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.similar_hits += similar
+        return entry[0]
+
+    def get(self, query: str, version: str) -> Optional[str]:
+        key = normalize_query(query)
+        with self._lock:
+            self._switch_version(version)
+            if key in self._entries or self.embed_fn is None:
+                return self._lookup(key, False)
+        # Embedding runs outside the lock so similarity lookups don't serialize callers
+        vector = self._embed(key)
+        with self._lock:
+            match = self._similar(vector) if version == self._version else None
+            return self._lookup(match, True)
+
+    def put(self, query: str, version: str, response: str):
+        """Stores a response for `version`; dropped if a newer snapshot version became current meanwhile."""
+        key = normalize_query(query)
+        vector = self._embed(key) if self.embed_fn is not None else None
+        with self._lock:
+            if self._version is None:
+                self._version = version
+            elif version != self._version:
+                # A slow answer for an older snapshot must not wipe the current version's entries
+                return
+            self._entries[key] = (response, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            if vector is not None:
+                self._vectors[key] = vector
+                self._matrix = None
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self._matrix = None
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "version": self._version,
+        }
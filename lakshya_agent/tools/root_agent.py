@@ -1,33 +1,62 @@
+import logging
 import os
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+import threading
+import time
+from importlib import import_module
 
-
-from .loan_eligibility import check_loan_eligibility
-from .sip_performance import get_sip_performance
-from .net_worth_trend import get_net_worth_trend
-from .fi_mcp_realtime import get_fi_mcp_realtime
-from .anomaly_detection import detect_anomaly
-from .fetch_financial_data import fetch_financial_data
+from .agent_config import load_agent_config
+from .mcp_loader import load_mcp_snapshot, snapshot_version
+from .response_cache import ResponseCache
+from .intent_router import answer_with_tools, log_decision, route, stream_with_tools
+from .context_budget import ContextBudget, logger as budget_logger
+from .financial_digest import financial_digest
+from .tracing import end_span, span, span_context, start_span
 from dotenv import load_dotenv
 load_dotenv()
 
+# LangChain, the Gemini client and the tool modules (ADK, pandas) load on first use,
+# so importing this module is cheap and works without GOOGLE_API_KEY.
+logger = logging.getLogger("lakshya.agent")
+
+# agent.yaml tool name -> (module under tools/, LangChain tool attribute)
+TOOL_SPECS = {
+    "fetch_financial_data": ("fetch_financial_data", "fetch_financial_data"),
+    "sip_performance": ("sip_performance", "get_sip_performance"),
+    "loan_eligibility": ("loan_eligibility", "check_loan_eligibility"),
+    "net_worth_trend": ("net_worth_trend", "get_net_worth_trend"),
+    "anomaly_detection": ("anomaly_detection", "detect_anomaly"),
+    "fi_mcp_realtime": ("fi_mcp_realtime", "get_fi_mcp_realtime"),
+    "cash_flow_forecast": ("cash_flow_forecast", "get_cash_flow_forecast"),
+    "financial_forecast": ("forecasting", "get_financial_forecast"),
+    "stress_test": ("stress_test", "get_stress_test"),
+    "what_if": ("what_if", "compare_what_if"),
+    "sensitivity": ("sensitivity", "get_assumption_sensitivity"),
+}
+
+
+def load_tools(names=None):
+    """Imports the named tools (default: the `tools:` list in agent.yaml) in order."""
+    names = names or load_agent_config().get("tools") or list(TOOL_SPECS)
+    loaded = []
+    for name in names:
+        spec = TOOL_SPECS.get(name)
+        if spec is None:
+            logger.warning("agent.yaml lists unknown tool %r; skipping it", name)
+            continue
+        module, attribute = spec
+        loaded.append(getattr(import_module(f".{module}", __package__), attribute))
+    return loaded
 
-tools = [
-    check_loan_eligibility,
-    get_sip_performance,
-    get_net_worth_trend,
-    get_fi_mcp_realtime,
-    detect_anomaly,
-    fetch_financial_data,
-]
 
 template = """
 Answer the following questions as best you can. You have access to the following tools:
 
 {tools}
 
+Known facts about the user from the current snapshot. Use them directly and call a tool
+only for details or calculations not covered here:
+{financial_context}
+
 Use the following format:
 
 Question: the input question you must answer
@@ -46,34 +75,309 @@ Begin!
 Question: {input}
 Thought:{agent_scratchpad}
 """
-prompt = PromptTemplate.from_template(template)
 
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    google_api_key=os.environ["GOOGLE_API_KEY"]
-)
+def _build_prompt():
+    from langchain_core.prompts import PromptTemplate
+    # The digest is rebuilt only when the snapshot version changes
+    return PromptTemplate.from_template(template).partial(financial_context=financial_digest)
+
+
+# Caps the scratchpad; older tool observations are digested, then summarized
+context_budget = ContextBudget(max_tokens=int(os.getenv("LAKSHYA_CONTEXT_TOKENS", 3000)))
+
+
+def build_agent_executor(llm, agent_tools=None, budget=None):
+    """Builds the ReAct executor around any LangChain LLM (e.g. a fake one in tests)."""
+    from langchain.agents import AgentExecutor, create_react_agent
+
+    agent_tools = agent_tools or get_tools()
+    budget = budget or context_budget
+    agent = create_react_agent(llm, agent_tools, get_prompt())
+    return AgentExecutor(
+        agent=agent,
+        tools=agent_tools,
+        handle_parsing_errors=True,  # <-- Add this line
+        verbose=True,
+        max_iterations=18,
+        trim_intermediate_steps=budget.trim_intermediate_steps,
+    )
+
+
+def _build_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from .llm_client import wrap_llm_from_env
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError("GOOGLE_API_KEY is not set; add it to lakshya_agent/.env to use the agent")
+    # Shared by all sessions; with LAKSHYA_LLM_* limits set, identical in-flight prompts are also coalesced
+    return wrap_llm_from_env(ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=api_key))
+
+
+def _build_parallel_executor():
+    from .parallel_agent import ParallelToolAgent
+    return ParallelToolAgent(get_llm(), get_tools(), budget=context_budget, context_fn=financial_digest)
+
+
+_components = {}
+_components_lock = threading.RLock()
+
+
+def _component(name, factory):
+    with _components_lock:
+        if name not in _components:
+            _components[name] = factory()
+        return _components[name]
+
+
+def get_tools():
+    return _component("tools", load_tools)
+
+
+def get_tool_registry():
+    return _component("tool_registry", lambda: {t.name: t for t in get_tools()})
+
+
+def get_prompt():
+    return _component("prompt", _build_prompt)
+
+
+def get_llm():
+    return _component("llm", _build_llm)
+
+
+def get_agent_executor():
+    return _component("agent_executor", lambda: build_agent_executor(get_llm()))
+
+
+def get_parallel_executor():
+    return _component("parallel_executor", _build_parallel_executor)
+
 
-agent = create_react_agent(llm, tools, prompt)
+def get_executor():
+    """The executor selected by LAKSHYA_AGENT_MODE, used by both invoke_agent and stream_agent."""
+    return get_parallel_executor() if AGENT_MODE == "parallel" else get_agent_executor()
+
+
+_LAZY_ATTRIBUTES = {
+    "tools": get_tools,
+    "tool_registry": get_tool_registry,
+    "prompt": get_prompt,
+    "llm": get_llm,
+    "agent_executor": get_agent_executor,
+    "parallel_executor": get_parallel_executor,
+}
+
+
+def __getattr__(name):
+    # `from tools.root_agent import llm, tools` keeps working; the object is built on first access
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def warm_up():
+    """Loads the tools, LLM client and executors ahead of the first question."""
+    started = time.perf_counter()
+    get_tool_registry()
+    get_executor()
+    logger.info("agent warm-up took %.2fs", time.perf_counter() - started)
+
+
+# "parallel" lets one LLM step request several tools, run concurrently
+AGENT_MODE = os.getenv("LAKSHYA_AGENT_MODE", "react")
+
+# Answers to repeated questions against an unchanged snapshot
+response_cache = ResponseCache(max_entries=256, ttl_seconds=3600)
+
+
+def _cacheable(result) -> bool:
+    """False when the executor stopped early or routed phrasing fell back to raw tool output."""
+    if result.get("stopped") or result.get("fallback"):
+        return False
+    # AgentExecutor only reports an early stop through its output text
+    return not str(result.get("output") or "").startswith("Agent stopped due to")
+
+def _agent_callbacks(executor, user_query: str, usage):
+    """Callbacks for a ReAct executor run: tracing spans and per-prompt token accounting."""
+    from langchain_core.tools import render_text_description
+    from .tracing_callbacks import PromptUsageHandler, TracingCallbackHandler
+
+    def sections():
+        return {"template": template, "tools": render_text_description(list(executor.tools)),
+                "financial_context": financial_digest(), "question": user_query}
+
+    return [TracingCallbackHandler(), PromptUsageHandler(usage, sections, f"Question: {user_query}\nThought:")]
+
+
+def _router_fallback(decision, error, query_span):
+    # A failing tool shouldn't fail the question: the agent can answer without it
+    logger.warning("Routed tools failed (%s); falling back to the agent", error)
+    query_span.set(router_error=str(error))
+    decision.fast_path = False
+    decision.reason = f"tool error: {error}"
+
+
+def _agent_events(user_query: str, agent=None):
+    from .parallel_agent import ParallelToolAgent
+
+    agent = agent or get_executor()
+    if isinstance(agent, ParallelToolAgent):
+        return agent.stream({"input": user_query})
+    return _executor_events(agent, user_query)
+
+
+def _executor_events(executor, user_query: str):
+    """AgentExecutor.stream steps as stream_agent events; the answer arrives as one token."""
+    usage = context_budget.begin()
+    steps = []
+    callbacks = _agent_callbacks(executor, user_query, usage)
+    for chunk in executor.stream({"input": user_query}, config={"callbacks": callbacks}):
+        # "_Exception" steps are the executor's own parsing-error retries, not tool calls
+        for action in chunk.get("actions", []):
+            if action.tool != "_Exception":
+                yield {"type": "tool_start", "tool": action.tool, "input": str(action.tool_input)}
+        for step in chunk.get("steps", []):
+            steps.append((step.action, step.observation))
+            if step.action.tool != "_Exception":
+                yield {"type": "tool_end", "tool": step.action.tool, "output": str(step.observation)}
+        if "output" in chunk:
+            if chunk["output"]:
+                yield {"type": "token", "text": chunk["output"]}
+            yield {"type": "final", "output": chunk["output"], "intermediate_steps": steps,
+                   "token_usage": usage.to_dict()}
+
+
+def _routed_events(decision, user_query: str, agent, llm_client, query_span):
+    """Routed tool events; if a tool fails, the agent answers instead (marked as a fallback)."""
+    running = None
+    try:
+        # Tools run before any answer token, so a failure here has emitted no answer text
+        for event in stream_with_tools(decision, get_tool_registry(), llm_client or get_llm()):
+            running = event["tool"] if event["type"] == "tool_start" else None
+            yield event
+        return
+    except Exception as e:
+        _router_fallback(decision, e, query_span)
+        if running is not None:
+            yield {"type": "tool_end", "tool": running, "output": f"Error running {running}: {e}"}
+    query_span.set(path="agent")
+    for event in _agent_events(user_query, agent):
+        yield {**event, "fallback": True} if event["type"] == "final" else event
 
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    handle_parsing_errors=True,  # <-- Add this line
-    verbose=True,
-    max_iterations=18
-)
 
 # --- Main Agent Invocation Function ---
-def invoke_agent(user_query: str):
+def invoke_agent(user_query: str, executor=None, cache=None, llm_client=None, use_router: bool = True,
+                 registry=None):
     """
     Invokes the financial agent with a user query.
+    Answers are served from the response cache while the snapshot is unchanged,
+    and common questions are routed straight to their tools (one LLM call to phrase).
     """
+    cache = cache or response_cache
+    with span("agent.query", query_chars=len(user_query)) as query_span:
+        try:
+            snapshot = load_mcp_snapshot()
+            version = snapshot_version(snapshot) if snapshot is not None else "no-snapshot"
+            cached = cache.get(user_query, version)
+            query_span.set(cache="hit" if cached is not None else "miss", snapshot_version=version)
+            if cached is not None:
+                return cached
+
+            decision = route(user_query) if use_router else None
+            response, router_failed = None, False
+            if decision is not None and decision.fast_path:
+                query_span.set(path="router", intents=decision.intents)
+                started = time.perf_counter()
+                try:
+                    response = answer_with_tools(decision, registry or get_tool_registry(), llm_client or get_llm())
+                    log_decision(decision, time.perf_counter() - started)
+                except Exception as e:
+                    router_failed = True
+                    _router_fallback(decision, e, query_span)
+            if response is None:
+                query_span.set(path="agent")
+                if decision is not None:
+                    log_decision(decision)
+                from .parallel_agent import ParallelToolAgent
+                executor = executor or get_executor()
+                usage = context_budget.begin()
+                # ParallelToolAgent records its own prompts and takes no callbacks
+                callbacks = ([] if isinstance(executor, ParallelToolAgent)
+                             else _agent_callbacks(executor, user_query, usage))
+                response = executor.invoke({"input": user_query}, config={"callbacks": callbacks})
+                token_usage = response.get("token_usage") or usage.to_dict()
+                query_span.set(prompts=token_usage["prompts"], prompt_tokens_est=token_usage["prompt_tokens"])
+                budget_logger.info("token usage: %s", token_usage)
+                if router_failed:
+                    response = {**response, "fallback": True}
+            output = response.get("output")
+            if not output:
+                return "I couldn't find an answer."
+            if _cacheable(response):
+                cache.put(user_query, version, output)
+            return output
+        except Exception as e:
+            query_span.set(status_detail=str(e))
+            query_span.status = "error"
+            return f"An error occurred while processing your request: {e}"
+
+
+def stream_agent(user_query: str, agent=None, cache=None, llm_client=None, use_router: bool = True):
+    """
+    Streaming counterpart of invoke_agent. Yields event dicts as the answer is produced:
+    "tool_start"/"tool_end" while tools run, "token" chunks of the final answer,
+    then one "final" event with the complete output. Runs on the executor selected by
+    LAKSHYA_AGENT_MODE; the ReAct executor streams per step, so its answer is one token.
+    """
+    cache = cache or response_cache
+    # A generator can't hold the current span across yields; inner steps run in span_context instead
+    query_span = start_span("agent.stream", query_chars=len(user_query))
+    ctx = span_context(query_span)
     try:
-        response = agent_executor.invoke({"input": user_query})
-        return response.get("output", "I couldn't find an answer.")
+        snapshot = ctx.run(load_mcp_snapshot)
+        version = snapshot_version(snapshot) if snapshot is not None else "no-snapshot"
+        cached = cache.get(user_query, version)
+        query_span.set(cache="hit" if cached is not None else "miss", snapshot_version=version)
+        if cached is not None:
+            yield {"type": "token", "text": cached}
+            yield {"type": "final", "output": cached, "intermediate_steps": [], "cached": True}
+            return
+
+        decision = route(user_query) if use_router else None
+        started = time.perf_counter()
+        if decision is not None and decision.fast_path:
+            query_span.set(path="router", intents=decision.intents)
+            events = _routed_events(decision, user_query, agent, llm_client, query_span)
+        else:
+            query_span.set(path="agent")
+            events = _agent_events(user_query, agent)
+        events = iter(events)
+        for event in iter(lambda: ctx.run(next, events, None), None):
+            if event["type"] != "final":
+                if event["type"] == "token" and "first_token_ms" not in query_span.attributes:
+                    query_span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 2))
+                yield event
+                continue
+            if decision is not None:
+                log_decision(decision, time.perf_counter() - started if decision.fast_path else None)
+            output = event["output"]
+            if output:
+                if _cacheable(event):
+                    cache.put(user_query, version, output)
+            else:
+                output = "I couldn't find an answer."
+                yield {"type": "token", "text": output}
+            yield {**event, "output": output}
     except Exception as e:
-        return f"An error occurred while processing your request: {e}"
+        query_span.status = "error"
+        query_span.set(status_detail=str(e))
+        message = f"An error occurred while processing your request: {e}"
+        yield {"type": "token", "text": message}
+        yield {"type": "final", "output": message, "intermediate_steps": []}
+    finally:
+        end_span(query_span)
 
 # You can add a simple test here to run this file directly
 if __name__ == '__main__':
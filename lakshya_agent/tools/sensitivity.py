@@ -0,0 +1,176 @@
+import copy
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .advanced_financial_planner import RETIREMENT_SCENARIOS
+from .asset_index import asset_index
+from .investment_strategy_optimizer import RECOMMENDED_ALLOCATIONS
+from .mcp_loader import load_mcp_snapshot
+
+# Assumption name -> default in percent when projection_assumptions omits it
+ASSUMPTIONS = {
+    "equity_return_percent": 10.0,
+    "debt_return_percent": 6.0,
+    "inflation_rate_percent": 5.0,
+    "retirement_return_percent": dict(RETIREMENT_SCENARIOS)["Moderate"] * 100,
+}
+
+# Baselines taken from the planner's constants rather than projection_assumptions,
+# because the planner itself ignores the snapshot for them
+PLANNER_CONSTANTS = {"retirement_return_percent"}
+
+METRICS = ["money_at_40", "retirement_corpus", "portfolio_real_return", "target_real_return"]
+
+# Assumptions each metric depends on; the others would only add zero-swing bars
+METRIC_ASSUMPTIONS = {
+    "money_at_40": ["equity_return_percent", "inflation_rate_percent"],
+    "retirement_corpus": ["equity_return_percent", "inflation_rate_percent", "retirement_return_percent"],
+    "portfolio_real_return": ["equity_return_percent", "debt_return_percent", "inflation_rate_percent"],
+    "target_real_return": ["equity_return_percent", "debt_return_percent", "inflation_rate_percent"],
+}
+
+# Relative perturbations applied to each assumption (and each pair on a grid)
+DEFAULT_STEPS = (-0.2, -0.1, 0.1, 0.2)
+
+
+def _evaluate(grid: np.ndarray, inputs: Tuple) -> Dict[str, np.ndarray]:
+    """Closed-form planner and allocation metrics for every assumption row at once.
+
+    `grid` columns follow ASSUMPTIONS. money_at_40 matches the planner's yearly
+    loop: total = S * g * (g^n - 1) / (g - 1) with g = 1 + roi - inflation.
+    """
+    annual_savings, years_to_40, years_to_retirement, current_w, target_w = inputs
+    equity, debt, inflation, retirement = (grid[:, i] / 100 for i in range(4))
+
+    g = 1 + equity - inflation
+    with np.errstate(divide="ignore", invalid="ignore"):
+        geometric = np.where(np.isclose(g, 1), years_to_40, g * (g ** years_to_40 - 1) / (g - 1))
+    money_at_40 = annual_savings * geometric if years_to_40 > 0 else np.zeros(len(grid))
+    retirement_corpus = money_at_40 * (1 + retirement) ** years_to_retirement
+
+    # Cash (the bank balance) earns nothing here; real estate is outside the weights
+    portfolio = current_w[0] * equity + current_w[1] * debt - inflation
+    target = target_w[0] * equity + target_w[1] * debt - inflation
+    return {
+        "money_at_40": money_at_40,
+        "retirement_corpus": retirement_corpus,
+        "portfolio_real_return": portfolio * 100,
+        "target_real_return": target * 100,
+    }
+
+
+def _assumption_inputs(snapshot: Dict):
+    profile = snapshot.get("user_profile", {})
+    projection = snapshot.get("projection_assumptions", {})
+    age = profile.get("age", 21)
+    retirement_age = profile.get("retirement_age", 60)
+    weights = asset_index(snapshot).class_weights
+    target = RECOMMENDED_ALLOCATIONS.get(profile.get("risk_profile", "moderate"), RECOMMENDED_ALLOCATIONS["moderate"])
+
+    base = tuple(float(default if name in PLANNER_CONSTANTS else projection.get(name, default))
+                 for name, default in ASSUMPTIONS.items())
+    inputs = (
+        float(snapshot.get("contributions", {}).get("monthly_savings", 0) * 12),
+        max(40 - age, 0),
+        max(retirement_age - age, 0),
+        (round(weights["equity"], 6), round(weights["debt"], 6)),
+        (target["equity"], target["debt"]),
+    )
+    return base, inputs
+
+
+@lru_cache(maxsize=128)
+def _analyze(base: Tuple[float, ...], inputs: Tuple, steps: Tuple[float, ...]) -> Dict:
+    names = list(ASSUMPTIONS)
+    k, s = len(names), len(steps)
+    base_arr = np.array(base)
+
+    # Rows: baseline, one-at-a-time perturbations, then every pair on a steps x steps grid
+    singles = np.repeat(base_arr[None, :], k * s, axis=0)
+    for i in range(k):
+        singles[i * s:(i + 1) * s, i] *= 1 + np.array(steps)
+    pairs = list(combinations(range(k), 2))
+    mesh_a, mesh_b = np.meshgrid(steps, steps, indexing="ij")
+    pair_rows = np.repeat(base_arr[None, :], len(pairs) * s * s, axis=0)
+    for p, (i, j) in enumerate(pairs):
+        block = slice(p * s * s, (p + 1) * s * s)
+        pair_rows[block, i] *= 1 + mesh_a.ravel()
+        pair_rows[block, j] *= 1 + mesh_b.ravel()
+
+    grid = np.vstack([base_arr[None, :], singles, pair_rows])
+    results = _evaluate(grid, inputs)
+
+    lo_idx, hi_idx = int(np.argmin(steps)), int(np.argmax(steps))
+    report = {"base_assumptions": dict(zip(names, base)), "baseline": {}, "elasticity": {}, "tornado": {}, "pairs": {}}
+    for metric in METRICS:
+        values = results[metric]
+        baseline = float(values[0])
+        single = values[1:1 + k * s].reshape(k, s)
+        report["baseline"][metric] = baseline
+
+        relevant = METRIC_ASSUMPTIONS[metric]
+        elasticity = {}
+        tornado = []
+        for i, name in enumerate(names):
+            if name not in relevant:
+                continue
+            low, high = float(single[i, lo_idx]), float(single[i, hi_idx])
+            dx = steps[hi_idx] - steps[lo_idx]
+            elasticity[name] = ((high - low) / baseline) / dx if baseline else 0.0
+            tornado.append({"assumption": name, "low": low, "high": high, "swing": abs(high - low)})
+        tornado.sort(key=lambda row: row["swing"], reverse=True)
+        report["elasticity"][metric] = elasticity
+        report["tornado"][metric] = tornado
+
+        pair_values = values[1 + k * s:].reshape(len(pairs), s, s)
+        report["pairs"][metric] = {
+            (names[i], names[j]): pair_values[p].tolist() for p, (i, j) in enumerate(pairs)
+            if names[i] in relevant and names[j] in relevant
+        }
+    report["steps"] = list(steps)
+    return report
+
+
+def analyze_sensitivity(snapshot: Dict, steps: Tuple[float, ...] = DEFAULT_STEPS) -> Dict:
+    """Elasticities, tornado rankings and pairwise grids for the planning assumptions.
+
+    Each metric only lists the assumptions it depends on (METRIC_ASSUMPTIONS).
+    Results are cached per assumption set and planner inputs; callers get a copy.
+    """
+    base, inputs = _assumption_inputs(snapshot)
+    return copy.deepcopy(_analyze(base, inputs, tuple(steps)))
+
+
+from langchain_core.tools import tool
+
+@tool
+def get_assumption_sensitivity(_: str = "") -> str:
+    """
+    Ranks which projection assumptions (equity/debt return, inflation, retirement return)
+    most affect money at 40, the retirement corpus and portfolio real return.
+    """
+    data = load_mcp_snapshot()
+    if data is None:
+        return "❌ The 'mcp_snapshot.json' file is missing."
+    report = analyze_sensitivity(data)
+    low, high = min(report["steps"]), max(report["steps"])
+
+    lines = [f"🌪️ Assumption sensitivity ({low:+.0%} to {high:+.0%} change in each assumption):"]
+    for metric, label in [("money_at_40", "Money at 40"), ("retirement_corpus", "Retirement corpus (moderate)")]:
+        lines.append(f"{label}: base ₹{report['baseline'][metric]:,.0f}")
+        for row in report["tornado"][metric]:
+            if row["swing"] == 0:
+                continue
+            elasticity = report["elasticity"][metric][row["assumption"]]
+            lines.append(
+                f"- {row['assumption']}: ₹{row['low']:,.0f} → ₹{row['high']:,.0f} (elasticity {elasticity:+.2f})"
+            )
+    top = report["tornado"]["portfolio_real_return"][0]
+    lines.append(
+        f"Portfolio real return: base {report['baseline']['portfolio_real_return']:.2f}%, "
+        f"most sensitive to {top['assumption']} ({top['low']:.2f}% → {top['high']:.2f}%)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,167 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .agent_config import load_agent_config
+from .asset_index import ASSET_CLASSES, CATEGORY_CLASSES, AssetIndex, asset_index
+from .cash_flow_forecast import DEFAULT_LOAN_RATE, DEFAULT_LOAN_TENURE_YEARS, REVOLVING_LIABILITIES
+from .mcp_loader import load_mcp_snapshot
+
+
+SCENARIO_FIELDS = {
+    "equity_shock": 0.0,        # fractional change in equity holdings
+    "debt_shock": 0.0,
+    "cash_shock": 0.0,
+    "real_estate_shock": 0.0,
+    "rate_hike_bps": 0.0,       # added to the loan rate used for EMIs
+    "income_loss_months": 0.0,  # months without salary
+    "rental_shock": 0.0,        # fractional change in rental income
+    "expense_shock": 0.0,       # fractional change in monthly expenses
+}
+
+SCENARIO_LIBRARY = [
+    {"name": "Baseline", "description": "No shock"},
+    {"name": "2008 Global Financial Crisis", "description": "Equities halve, property falls",
+     "equity_shock": -0.55, "real_estate_shock": -0.15, "debt_shock": 0.02, "income_loss_months": 3},
+    {"name": "2020 COVID Crash", "description": "Sharp equity fall, rent and pay disruption",
+     "equity_shock": -0.38, "rental_shock": -0.5, "income_loss_months": 2},
+    {"name": "2000 Dot-com Bust", "description": "Prolonged equity bear market",
+     "equity_shock": -0.45},
+    {"name": "Rate Hike +250 bps", "description": "Floating loan rates reset higher",
+     "rate_hike_bps": 250, "debt_shock": -0.03, "equity_shock": -0.10},
+    {"name": "Inflation Spike", "description": "Living costs and rates rise together",
+     "expense_shock": 0.15, "rate_hike_bps": 150},
+    {"name": "Job Loss (6 months)", "description": "Salary stops for six months",
+     "income_loss_months": 6},
+]
+
+
+def load_scenarios(custom: Optional[List[Dict]] = None) -> List[Dict]:
+    """Built-in scenarios merged with `stress_scenarios` from agent.yaml (same name overrides)."""
+    if custom is None:
+        custom = load_agent_config().get("stress_scenarios") or []
+    scenarios = {s["name"]: s for s in SCENARIO_LIBRARY}
+    for scenario in custom:
+        if scenario.get("name"):
+            scenarios[scenario["name"]] = scenario
+    return [{**SCENARIO_FIELDS, "description": "", **s} for s in scenarios.values()]
+
+
+def _holdings(index: AssetIndex):
+    """Flat (value, class index) arrays for every holding; its shock comes from its asset class."""
+    values, classes = [], []
+    for holding in index.holdings:
+        asset_class = CATEGORY_CLASSES.get(holding.category)
+        if asset_class is None:
+            continue
+        values.append(holding.value)
+        classes.append(ASSET_CLASSES.index(asset_class))
+    return np.array(values), np.array(classes, dtype=int)
+
+
+def _emi(principal: np.ndarray, annual_rate: np.ndarray, years: int) -> np.ndarray:
+    monthly_rate = annual_rate / (12 * 100)
+    months = years * 12
+    growth = (1 + monthly_rate) ** months
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amortized = principal * monthly_rate * growth / (growth - 1)
+    # A shock can take the rate to exactly 0%, where the EMI is straight-line repayment
+    return np.where(monthly_rate == 0, principal / months, amortized)
+
+
+def run_stress_test(snapshot: Dict, scenarios: Optional[List[Dict]] = None,
+                    interest_rate: float = DEFAULT_LOAN_RATE,
+                    tenure_years: int = DEFAULT_LOAN_TENURE_YEARS) -> List[Dict]:
+    """Evaluates every scenario in one vectorized pass.
+
+    Returns one row per scenario with shocked net worth, months of liquidity
+    while income is disrupted, and EMI coverage (income / EMIs).
+    """
+    scenarios = scenarios if scenarios is not None else load_scenarios()
+    income = snapshot.get("income", {})
+    liabilities = snapshot.get("liabilities", {})
+    expense_history = snapshot.get("expense_history", [])
+    avg_expenses = (
+        sum(item.get("expenses", 0) for item in expense_history) / len(expense_history)
+        if expense_history else 0.0
+    )
+
+    def column(field):
+        return np.array([float(s.get(field, 0.0)) for s in scenarios])
+
+    # (scenarios x classes) shock matrix applied to every holding at once
+    shocks = np.column_stack([column(f"{c}_shock") for c in ASSET_CLASSES])
+    index = asset_index(snapshot)
+    values, classes = _holdings(index)
+    stressed_assets = (values[None, :] * (1 + shocks[:, classes])).sum(axis=1)
+
+    loans = {k: v for k, v in liabilities.items() if k not in REVOLVING_LIABILITIES and v}
+    revolving = sum(v for k, v in liabilities.items() if k in REVOLVING_LIABILITIES)
+    principal = np.array(list(loans.values()), dtype=float)
+    rates = interest_rate + column("rate_hike_bps")[:, None] / 100
+    emis = _emi(principal[None, :], rates, tenure_years).sum(axis=1) if len(principal) else np.zeros(len(scenarios))
+
+    total_debt = float(sum(liabilities.values()))
+    net_worth = stressed_assets - total_debt
+
+    salary = income.get("monthly_salary", 0)
+    other_income = income.get("rental_income", 0) * (1 + column("rental_shock")) + income.get("other_income", 0)
+    job_loss = column("income_loss_months") > 0
+    stress_income = other_income + np.where(job_loss, 0, salary)
+    expenses = avg_expenses * (1 + column("expense_shock"))
+    shortfall = expenses + emis - stress_income
+
+    cash_idx = ASSET_CLASSES.index("cash")
+    # The emergency fund is assumed to be held in the bank balance; only the part
+    # exceeding the balance is counted as held elsewhere
+    bank_balance = index.value("bank_balance")
+    emergency_elsewhere = max(snapshot.get("emergency_fund", 0) - bank_balance, 0)
+    liquid = bank_balance * (1 + shocks[:, cash_idx]) + emergency_elsewhere - revolving
+    with np.errstate(divide="ignore", invalid="ignore"):
+        liquidity_months = np.where(shortfall > 0, np.maximum(liquid, 0) / shortfall, np.inf)
+        emi_coverage = np.where(emis > 0, stress_income / emis, np.inf)
+    liquid_after = liquid - np.maximum(shortfall, 0) * column("income_loss_months")
+
+    return [
+        {
+            "scenario": s["name"],
+            "description": s.get("description", ""),
+            "net_worth": float(net_worth[i]),
+            "net_worth_change": float(net_worth[i] - (values.sum() - total_debt)),
+            "monthly_emi": float(emis[i]),
+            "liquidity_months": float(liquidity_months[i]),
+            "liquid_after_shock": float(liquid_after[i]),
+            "emi_coverage": float(emi_coverage[i]),
+        }
+        for i, s in enumerate(scenarios)
+    ]
+
+
+from langchain_core.tools import tool
+
+@tool
+def get_stress_test(scenario: str = "") -> str:
+    """
+    Stress-tests net worth, emergency runway and EMI coverage against market crashes,
+    rate hikes and job loss using mcp_snapshot.json. Optionally pass part of a scenario name.
+    """
+    data = load_mcp_snapshot()
+    if data is None:
+        return "❌ The 'mcp_snapshot.json' file is missing."
+    scenarios = load_scenarios()
+    query = (scenario or "").strip().lower()
+    if query:
+        matched = [s for s in scenarios if query in s["name"].lower()]
+        scenarios = matched or scenarios
+
+    lines = ["🧪 Stress test results:"]
+    for row in run_stress_test(data, scenarios):
+        runway = "∞" if np.isinf(row["liquidity_months"]) else f"{row['liquidity_months']:.1f}"
+        coverage = "∞" if np.isinf(row["emi_coverage"]) else f"{row['emi_coverage']:.2f}x"
+        lines.append(
+            f"- {row['scenario']}: net worth ₹{row['net_worth']:,.0f} (₹{row['net_worth_change']:+,.0f}), "
+            f"runway {runway} months, EMI coverage {coverage}"
+        )
+        if row["liquid_after_shock"] < 0:
+            lines.append(f"  ⚠️ Liquid reserves run out by ₹{-row['liquid_after_shock']:,.0f}")
+    return "\n".join(lines)
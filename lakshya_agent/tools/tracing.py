@@ -0,0 +1,188 @@
+# tools/tracing.py
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+_current: contextvars.ContextVar = contextvars.ContextVar("lakshya_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    duration_s: Optional[float] = None
+    status: str = "ok"
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": round(self.duration_s * 1000, 3) if self.duration_s is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Histogram:
+    """Log-bucketed latency histogram (milliseconds) with approximate percentiles."""
+
+    BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class HistogramRegistry:
+    """In-process span timings by span name, for spotting hot spots without a collector."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+
+    def export(self, span: Span):
+        with self._lock:
+            hist = self._histograms.get(span.name)
+            if hist is None:
+                hist = self._histograms[span.name] = Histogram()
+            hist.observe(span.duration_s * 1000)
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(self._histograms.items())}
+
+    def report(self) -> str:
+        lines = [f"{'span':<36} {'count':>7} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9}"]
+        for name, s in self.summary().items():
+            lines.append(f"{name:<36} {s['count']:>7} {s['mean_ms']:>9.2f} {s['p50_ms']:>8} {s['p95_ms']:>8} "
+                         f"{s['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class JsonlExporter:
+    """Appends finished spans, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+histograms = HistogramRegistry()
+exporters: List = [histograms]
+if os.getenv("LAKSHYA_TRACE_FILE"):
+    exporters.append(JsonlExporter(os.environ["LAKSHYA_TRACE_FILE"]))
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes) -> Span:
+    """Opens a span under `parent` (default: the current span). Close it with end_span."""
+    parent = parent if parent is not None else _current.get()
+    return Span(
+        name=name,
+        trace_id=parent.trace_id if parent else uuid.uuid4().hex[:16],
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        start=time.time(),
+        attributes=attributes,
+    )
+
+
+def end_span(span: Span, error: BaseException = None):
+    span.duration_s = time.perf_counter() - span._t0
+    if error is not None:
+        span.status = "error"
+        span.attributes["error"] = f"{type(error).__name__}: {error}"
+    for exporter in exporters:
+        try:
+            exporter.export(span)
+        except Exception:
+            pass
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Times the block as a span nested under the current one."""
+    current = start_span(name, **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        end_span(current, e)
+        raise
+    else:
+        end_span(current)
+    finally:
+        _current.reset(token)
+
+
+def span_context(parent: Span) -> contextvars.Context:
+    """Copy of the current context with `parent` as the current span, for stepping generators."""
+    ctx = contextvars.copy_context()
+    ctx.run(_current.set, parent)
+    return ctx
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attributes(**attributes):
+    """Adds attributes to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attributes)
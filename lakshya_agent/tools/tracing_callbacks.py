@@ -0,0 +1,150 @@
+# tools/tracing_callbacks.py
+import contextvars
+import threading
+import uuid
+from typing import Callable, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .context_budget import TokenUsage, estimate_tokens
+from .tracing import Span, _current, end_span, start_span
+
+
+def _token_usage(response) -> Dict[str, int]:
+    usage = (response.llm_output or {}).get("token_usage") or (response.llm_output or {}).get("usage_metadata")
+    if not usage:
+        for generations in response.generations:
+            for gen in generations:
+                message = getattr(gen, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    break
+    if not usage:
+        return {}
+    usage = dict(usage)
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", usage.get("input_tokens")),
+        "completion_tokens": usage.get("completion_tokens", usage.get("output_tokens")),
+    }
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Turns LangChain run callbacks into spans: `llm`, `tool:<name>`, `parse` and `parse_error`.
+
+    Runs are parented to the nearest traced ancestor run, else to the span that
+    was current when the run started (e.g. the query span around executor.invoke).
+    """
+
+    def __init__(self):
+        self._spans: Dict[uuid.UUID, Span] = {}
+        self._parents: Dict[uuid.UUID, Optional[Span]] = {}
+        self._tokens: Dict[uuid.UUID, contextvars.Token] = {}
+        self._lock = threading.Lock()
+
+    def _parent(self, parent_run_id) -> Optional[Span]:
+        with self._lock:
+            if parent_run_id in self._spans:
+                return self._spans[parent_run_id]
+            if parent_run_id in self._parents:
+                return self._parents[parent_run_id]
+        return _current.get()
+
+    def _open(self, run_id, parent_run_id, name, **attributes):
+        opened = start_span(name, parent=self._parent(parent_run_id), **attributes)
+        with self._lock:
+            self._spans[run_id] = opened
+        return opened
+
+    def _close(self, run_id, error=None, **attributes) -> Optional[Span]:
+        with self._lock:
+            opened = self._spans.pop(run_id, None)
+            self._parents.pop(run_id, None)
+        if opened is not None:
+            opened.set(**attributes)
+            end_span(opened, error)
+        return opened
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._open(run_id, parent_run_id, "llm",
+                   prompt_tokens_est=sum(estimate_tokens(p) for p in prompts))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        text = "".join(str(m.content) for batch in messages for m in batch)
+        self._open(run_id, parent_run_id, "llm", prompt_tokens_est=estimate_tokens(text))
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        text = "".join(g.text for gens in response.generations for g in gens)
+        self._close(run_id, completion_tokens_est=estimate_tokens(text), **_token_usage(response))
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._close(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        # AgentExecutor routes unparseable LLM output through the "_Exception" tool
+        span_name = "parse_error" if name == "_Exception" else f"tool:{name}"
+        opened = self._open(run_id, parent_run_id, span_name, input=str(input_str)[:200])
+        # Sync tools run on this thread right after the callback: spans they open nest under it
+        self._tokens[run_id] = _current.set(opened)
+
+    def _restore(self, run_id):
+        token = self._tokens.pop(run_id, None)
+        if token is not None:
+            try:
+                _current.reset(token)
+            except ValueError:
+                pass
+
+    def on_tool_end(self, output, *, run_id, parent_run_id=None, **kwargs):
+        self._restore(run_id)
+        self._close(run_id, output_tokens_est=estimate_tokens(str(output)))
+
+    def on_tool_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._restore(run_id)
+        self._close(run_id, error)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or ""
+        if "OutputParser" in name:
+            self._open(run_id, parent_run_id, "parse", parser=name)
+        else:
+            # Untraced chains pass their parent through to their children
+            parent = self._parent(parent_run_id)
+            with self._lock:
+                self._parents[run_id] = parent
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        self._close(run_id)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._close(run_id, error)
+
+
+class PromptUsageHandler(BaseCallbackHandler):
+    """Records every prompt an LLM receives into `usage`, split into sections.
+
+    `sections` returns the fixed sections (template, tools, financial context,
+    question) and is called once; the scratchpad is whatever the rendered prompt
+    holds after `scratchpad_after`.
+    """
+
+    def __init__(self, usage: TokenUsage, sections: Callable[[], Dict[str, str]], scratchpad_after: str):
+        self.usage = usage
+        self._sections = sections
+        self._fixed = None
+        self.scratchpad_after = scratchpad_after
+
+    def _record(self, prompt: str):
+        if self._fixed is None:
+            self._fixed = self._sections()
+        marker = prompt.rfind(self.scratchpad_after)
+        scratchpad = prompt[marker + len(self.scratchpad_after):] if marker >= 0 else ""
+        self.usage.record_prompt({**self._fixed, "scratchpad": scratchpad})
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        for prompt in prompts:
+            self._record(prompt)
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        for batch in messages:
+            self._record("".join(str(m.content) for m in batch))
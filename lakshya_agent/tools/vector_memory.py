@@ -0,0 +1,407 @@
+# tools/vector_memory.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("lakshya.memory")
+
+_WORD_RE = re.compile(r"[a-z0-9₹%.]+")
+
+
+class HashingEmbedder:
+    """Offline text embedding: hashed word unigrams and bigrams, L2-normalized.
+
+    Good enough to recall earlier tool results that share wording and figures;
+    swap in a real embedding model through `embed_fn` when one is available.
+    """
+
+    name = "hashing-v1"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, text: str) -> np.ndarray:
+        words = _WORD_RE.findall(text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vector[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def _spherical_kmeans(data: np.ndarray, k: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Empty clusters are re-seeded from random points
+        sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+class LocalVectorMemory:
+    """In-process vector memory with an IVF index, persisted under `path`.
+
+    Embeddings live in one contiguous float32 memory-mapped file (`vectors.f32`),
+    entry text and metadata in `entries.jsonl`, and the inverted-file index
+    (centroids + list assignments) in `ivf.npz`. Search probes the `nprobe`
+    lists closest to the query and returns up to `top_k` entries whose cosine
+    distance is within `distance_threshold`. Below `train_threshold` entries,
+    search is exact. Training on the write path runs in a background thread;
+    searches use the previous centroids until the new index is swapped in.
+
+    Deleted entries leave a tombstone line in the log and their slot on a free
+    list; the next add reuses the slot (row and id), so space is reclaimed
+    without rebuilding the index.
+    """
+
+    def __init__(self, path: str, dim: int = 256, embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+                 similarity_top_k: int = 5, vector_distance_threshold: float = 0.7, nprobe: int = 8,
+                 train_threshold: int = 2048):
+        self.path = path
+        self.embed_fn = embed_fn or HashingEmbedder(dim)
+        self.dim = dim
+        self.top_k = similarity_top_k
+        self.distance_threshold = vector_distance_threshold
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._entries_path = os.path.join(path, "entries.jsonl")
+        self._index_path = os.path.join(path, "ivf.npz")
+
+        # Indexed by entry id (= vector row); None marks a free slot
+        self.entries: List[Optional[Dict]] = []
+        self._log_lines = 0
+        if os.path.exists(self._entries_path):
+            with open(self._entries_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn final line from a crash
+                    self._log_lines += 1
+                    self._apply(record)
+        while self.entries and self.entries[-1] is None:
+            self.entries.pop()
+        self._free: List[int] = [i for i, e in enumerate(self.entries) if e is None]
+        self._capacity = 0
+        self._vectors = None
+        on_disk = os.path.getsize(self._vectors_path) // (dim * 4) if os.path.exists(self._vectors_path) else 0
+        self._ensure_capacity(max(1024, len(self.entries), on_disk))
+        self._entries_file = open(self._entries_path, "a", encoding="utf-8")
+
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._trained_at = 0
+        self._training: Optional[threading.Thread] = None
+        self._changed: Optional[set] = None   # rows written while a background retrain runs
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self.entries) - len(self._free)
+
+    def _apply(self, record: Dict):
+        if record.get("op") == "delete":
+            for entry_id in record["ids"]:
+                if entry_id < len(self.entries):
+                    self.entries[entry_id] = None
+            return
+        entry_id = record["id"]
+        while len(self.entries) < entry_id:
+            self.entries.append(None)
+        if entry_id < len(self.entries):
+            self.entries[entry_id] = record
+        else:
+            self.entries.append(record)
+
+    def live_entries(self) -> Iterator[Dict]:
+        return (e for e in self.entries if e is not None)
+
+    # --- storage ---
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2)
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Stored embeddings, one row per entry (a view into the memory-mapped file)."""
+        return self._vectors[: len(self.entries)]
+
+    # --- IVF index ---
+    def _load_index(self):
+        if not os.path.exists(self._index_path):
+            if len(self.entries) >= self.train_threshold:
+                self.train()
+            return
+        data = np.load(self._index_path)
+        self.centroids = data["centroids"]
+        assign = data["assign"][: len(self.entries)].astype(np.int64)
+        self._trained_at = int(data["trained_at"])
+        # Entries added after the index was saved (new rows or reused slots) are assigned now
+        if len(assign) < len(self.entries):
+            assign = np.concatenate([assign, np.full(len(self.entries) - len(assign), -1)])
+        live = np.array([e is not None for e in self.entries], dtype=bool)
+        missing = np.flatnonzero(live & (assign < 0))
+        if len(missing):
+            assign[missing] = self._assign(self._vectors[missing])
+        assign[~live] = -1
+        self._build_lists(assign)
+
+    def _assign(self, rows: np.ndarray, chunk: int = 65536, centroids: np.ndarray = None) -> np.ndarray:
+        centroids = self.centroids if centroids is None else centroids
+        return np.concatenate([np.argmax(rows[i:i + chunk] @ centroids.T, axis=1)
+                               for i in range(0, len(rows), chunk)] or [np.empty(0, dtype=np.int64)])
+
+    def _build_lists(self, assign: np.ndarray):
+        # Free slots carry -1 and fall outside every list
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]].tolist() for i in range(len(self.centroids))]
+        self._list_arrays = {}
+
+    def _training_sample(self, nlist: int = None):
+        # Caller holds the lock; returns (n, nlist, copy of the rows to fit on)
+        n = len(self)
+        nlist = nlist or max(1, min(n // 39, int(4 * np.sqrt(n))))
+        live_ids = np.flatnonzero([e is not None for e in self.entries])
+        if n > 50 * nlist:
+            live_ids = np.sort(np.random.default_rng(0).choice(live_ids, size=50 * nlist, replace=False))
+        return n, nlist, np.array(self._vectors[live_ids])
+
+    def _install(self, centroids: np.ndarray, assign: np.ndarray, trained_at: int):
+        # Caller holds the lock
+        live = np.array([e is not None for e in self.entries], dtype=bool)
+        assign[~live] = -1
+        self.centroids = centroids
+        self._build_lists(assign)
+        self._trained_at = trained_at
+        self._save_index()
+
+    def train(self, nlist: int = None):
+        """(Re)builds the IVF index from the stored vectors, blocking adds and searches meanwhile."""
+        with self._lock:
+            if len(self) == 0:
+                return
+            n, nlist, sample = self._training_sample(nlist)
+            centroids = _spherical_kmeans(sample, nlist)
+            self._install(centroids, self._assign(self.vectors, centroids=centroids), n)
+
+    def _train_in_background(self):
+        # Caller holds the lock. Searches keep using the current centroids (or exact
+        # search before the first training) until the new index is swapped in.
+        if self._training is not None:
+            return
+        n, nlist, sample = self._training_sample()
+        rows = self.vectors
+        self._changed = set()
+        self._training = threading.Thread(target=self._background_train, args=(n, nlist, sample, rows),
+                                          name="memory-retrain", daemon=True)
+        self._training.start()
+
+    def _background_train(self, n: int, nlist: int, sample: np.ndarray, rows: np.ndarray):
+        try:
+            centroids = _spherical_kmeans(sample, nlist)
+            assign = self._assign(rows, centroids=centroids)
+            with self._lock:
+                # Rows appended or rewritten while k-means ran are assigned again
+                redo = sorted(self._changed.union(range(len(rows), len(self.entries))))
+                assign = np.concatenate([assign, np.full(len(self.entries) - len(assign), -1, dtype=assign.dtype)])
+                if redo:
+                    assign[redo] = self._assign(self._vectors[redo], centroids=centroids)
+                self._install(centroids, assign[: len(self.entries)], n)
+        except Exception:
+            logger.exception("Background retrain of %s failed", self.path)
+        finally:
+            with self._lock:
+                self._training = None
+                self._changed = None
+
+    def _save_index(self):
+        assign = np.full(len(self.entries), -1, dtype=np.int32)
+        for list_id, ids in enumerate(self._lists):
+            assign[ids] = list_id
+        tmp = self._index_path + ".tmp.npz"
+        np.savez(tmp, centroids=self.centroids, assign=assign, trained_at=self._trained_at)
+        os.replace(tmp, self._index_path)
+
+    def _list_array(self, list_id: int) -> np.ndarray:
+        arr = self._list_arrays.get(list_id)
+        if arr is None:
+            arr = self._list_arrays[list_id] = np.asarray(self._lists[list_id], dtype=np.int64)
+        return arr
+
+    # --- public interface ---
+    def add_memory_entry(self, text: str, metadata: Dict = None, vector: np.ndarray = None) -> int:
+        """Stores `text` with its metadata; same call shape as the ADK memory service."""
+        vector = np.asarray(vector if vector is not None else self.embed_fn(text), dtype=np.float32)
+        entry = {"id": None, "text": text, "metadata": metadata or {}, "ts": time.time()}
+        with self._lock:
+            entry_id = self._free.pop() if self._free else len(self.entries)
+            entry["id"] = entry_id
+            self._ensure_capacity(entry_id + 1)
+            # Vector first: an entry line on disk always has its embedding
+            self._vectors[entry_id] = vector
+            self._entries_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._log_lines += 1
+            if entry_id < len(self.entries):
+                self.entries[entry_id] = entry
+            else:
+                self.entries.append(entry)
+            if self.centroids is not None:
+                list_id = int(np.argmax(self.centroids @ vector))
+                self._lists[list_id].append(entry_id)
+                self._list_arrays.pop(list_id, None)
+                # Retrain once the corpus has grown well past what the centroids were fit on
+                if len(self) >= 4 * self._trained_at:
+                    self._train_in_background()
+            elif len(self) >= self.train_threshold:
+                self._train_in_background()
+            if self._changed is not None:
+                self._changed.add(entry_id)
+        return entry_id
+
+    def add_many(self, texts: List[str], metadatas: List[Dict] = None) -> List[int]:
+        metadatas = metadatas or [{}] * len(texts)
+        return [self.add_memory_entry(t, m) for t, m in zip(texts, metadatas)]
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """Tombstones entries and frees their slots; returns how many were live."""
+        with self._lock:
+            removed = [i for i in dict.fromkeys(int(i) for i in ids)
+                       if 0 <= i < len(self.entries) and self.entries[i] is not None]
+            if not removed:
+                return 0
+            self._entries_file.write(json.dumps({"op": "delete", "ids": removed}) + "\n")
+            self._log_lines += 1
+            for entry_id in removed:
+                self.entries[entry_id] = None
+                if self.centroids is not None:
+                    # Same argmax that placed it, unless the slot changed since the index was saved
+                    list_id = int(np.argmax(self.centroids @ self._vectors[entry_id]))
+                    try:
+                        self._lists[list_id].remove(entry_id)
+                    except ValueError:
+                        for members in self._lists:
+                            if entry_id in members:
+                                members.remove(entry_id)
+                                break
+                    self._list_arrays.pop(list_id, None)
+            self._free.extend(removed)
+            # Rewrite the log once most of its lines are dead
+            if self._log_lines > 2 * max(len(self), 512):
+                self.compact_log()
+            return len(removed)
+
+    def compact_log(self):
+        """Rewrites entries.jsonl with only the live entries (ids are kept)."""
+        with self._lock:
+            tmp = self._entries_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry in self.live_entries():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._entries_file.close()
+            os.replace(tmp, self._entries_path)
+            self._entries_file = open(self._entries_path, "a", encoding="utf-8")
+            self._log_lines = len(self)
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return None
+        nprobe = min(self.nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self._list_array(int(i)) for i in probe])
+
+    def search_memory(self, query: str, top_k: int = None, distance_threshold: float = None,
+                      where: Callable[[Dict], bool] = None) -> List[Dict]:
+        """Up to top_k entries nearest to `query` (cosine distance <= threshold), nearest first."""
+        top_k = top_k or self.top_k
+        threshold = self.distance_threshold if distance_threshold is None else distance_threshold
+        q = np.asarray(self.embed_fn(query), dtype=np.float32)
+        with self._lock:
+            if not self.entries:
+                return []
+            ids = self._candidates(q)
+            rows = self.vectors if ids is None else self._vectors[ids]
+            distances = 1.0 - rows @ q
+            if ids is None and self._free:
+                distances[self._free] = np.inf
+            # Over-fetch when filtering so enough entries survive
+            k = min(len(distances), top_k * (4 if where else 1))
+            if k == 0:
+                return []
+            best = np.argpartition(distances, k - 1)[:k]
+            best = best[np.argsort(distances[best])]
+            results = []
+            for i in best:
+                if distances[i] > threshold:
+                    break
+                entry = self.entries[int(i) if ids is None else int(ids[i])]
+                if where is not None and not where(entry):
+                    continue
+                results.append({**entry, "distance": float(distances[i])})
+                if len(results) == top_k:
+                    break
+            return results
+
+    def flush(self):
+        with self._lock:
+            self._entries_file.flush()
+            self._vectors.flush()
+            if self.centroids is not None:
+                self._save_index()
+
+    def close(self):
+        training = self._training
+        if training is not None:
+            training.join()
+        self.flush()
+        with self._lock:
+            self._entries_file.close()
+
+
+_stores: Dict[str, LocalVectorMemory] = {}
+_stores_lock = threading.Lock()
+
+
+def local_memory(config: Dict = None) -> LocalVectorMemory:
+    """Shared store for the `runner.memory` settings in agent.yaml (type: local_ann)."""
+    config = config or {}
+    path = config.get("path", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                           ".lakshya_memory"))
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = LocalVectorMemory(
+                path,
+                dim=int(config.get("dim", 256)),
+                similarity_top_k=int(config.get("similarity_top_k", 5)),
+                vector_distance_threshold=float(config.get("vector_distance_threshold", 0.7)),
+                nprobe=int(config.get("nprobe", 8)),
+            )
+        return store
@@ -0,0 +1,222 @@
+import copy
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional
+
+from .mcp_loader import load_mcp_snapshot
+
+_DELETED = object()
+
+
+class SnapshotOverlay(Mapping):
+    """Copy-on-write view of a snapshot with hypothetical changes applied.
+
+    Reads fall through to the base snapshot. A write copies only the containers
+    on the path to the changed field, so untouched sections stay shared with
+    the base and hundreds of overlays cost little more than their edits.
+    """
+
+    def __init__(self, base: Mapping, name: str = "what-if", description: str = ""):
+        self._base = base
+        self._overrides: Dict = {}
+        self._owned = set()  # ids of containers this overlay copied and may mutate
+        self.name = name
+        self.description = description
+
+    def __getitem__(self, key):
+        if key in self._overrides:
+            value = self._overrides[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        return self._base[key]
+
+    def __iter__(self):
+        for key in self._base:
+            if self._overrides.get(key, None) is not _DELETED:
+                yield key
+        for key, value in self._overrides.items():
+            if key not in self._base and value is not _DELETED:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"SnapshotOverlay({self.name!r}, changed={sorted(self._overrides)})"
+
+    @staticmethod
+    def _split(path):
+        parts = path.split(".") if isinstance(path, str) else list(path)
+        return [int(p) if isinstance(p, str) and p.isdigit() else p for p in parts]
+
+    def _own(self, container):
+        owned = copy.copy(container)
+        self._owned.add(id(owned))
+        return owned
+
+    def _writable_parent(self, parts):
+        """Returns the container holding parts[-1], copying each level on first write."""
+        top = parts[0]
+        if len(parts) == 1:
+            return None
+        current = self._overrides.get(top)
+        if current is None or current is _DELETED or id(current) not in self._owned:
+            if current is _DELETED:
+                source = {}  # a deleted section starts empty rather than reviving the base's keys
+            else:
+                source = self._base.get(top, {}) if current is None else current
+            current = self._own(source)
+            self._overrides[top] = current
+        for part in parts[1:-1]:
+            child = current[part] if not isinstance(current, dict) else current.get(part, {})
+            if id(child) not in self._owned:
+                child = self._own(child)
+                current[part] = child
+            current = child
+        return current
+
+    def get_path(self, path, default=None):
+        value = self
+        for part in self._split(path):
+            try:
+                value = value[part]
+            except (KeyError, IndexError, TypeError):
+                return default
+        return value
+
+    def set(self, path, value) -> "SnapshotOverlay":
+        parts = self._split(path)
+        parent = self._writable_parent(parts)
+        if parent is None:
+            self._overrides[parts[0]] = value
+        else:
+            parent[parts[-1]] = value
+        return self
+
+    def adjust(self, path, delta: float, floor: Optional[float] = None) -> "SnapshotOverlay":
+        value = (self.get_path(path, 0) or 0) + delta
+        if floor is not None:
+            value = max(value, floor)
+        return self.set(path, value)
+
+    def delete(self, path) -> "SnapshotOverlay":
+        parts = self._split(path)
+        parent = self._writable_parent(parts)
+        if parent is None:
+            self._overrides[parts[0]] = _DELETED
+        else:
+            del parent[parts[-1]]
+        return self
+
+    def derive(self, name: str, description: str = "") -> "SnapshotOverlay":
+        """New overlay starting from this one's changes; later writes to either don't affect the other."""
+        child = SnapshotOverlay(self._base, name=name, description=description)
+        child._overrides = dict(self._overrides)
+        # The copied containers are now shared, so both overlays copy again on their next write
+        self._owned.clear()
+        return child
+
+    def freeze(self) -> "SnapshotOverlay":
+        """Stable view of the current state; later writes to this overlay copy again."""
+        return self.derive(self.name, self.description)
+
+    @property
+    def changed_sections(self) -> List[str]:
+        return sorted(self._overrides)
+
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in self}
+
+    # --- Common hypothetical changes ---
+
+    def prepay_loan(self, loan: str, amount: float, from_asset: str = "bank_balance") -> "SnapshotOverlay":
+        self.adjust(f"liabilities.{loan}", -amount, floor=0)
+        return self.adjust(f"assets.{from_asset}", -amount)
+
+    def change_sip(self, fund: str, delta: float) -> "SnapshotOverlay":
+        self.adjust(f"contributions.monthly_sip.{fund}", delta, floor=0)
+        return self.adjust("contributions.monthly_savings", delta, floor=0)
+
+    def change_income(self, source: str, delta: float) -> "SnapshotOverlay":
+        return self.adjust(f"income.{source}", delta, floor=0)
+
+    def take_loan(self, loan: str, amount: float) -> "SnapshotOverlay":
+        return self.adjust(f"liabilities.{loan}", amount)
+
+
+def _evaluate(snapshot: Mapping, name: str, loan_amount: float,
+              interest_rate: float, tenure_years: int) -> Dict:
+    # Imported here so the tools package does not pull in Streamlit, nor price_feed the ADK tools
+    from components.health_score import calculate_financial_health_score
+    from .advanced_financial_planner import plan_finances
+    from .asset_index import build_asset_index
+    from .loan_eligibility import assess_loan_eligibility
+
+    loan = assess_loan_eligibility(snapshot, loan_amount, interest_rate, tenure_years)
+    plan = plan_finances(snapshot)
+    scenarios = {s.scenario: s.projected_amount for s in plan.retirement_simulations}
+    return {
+        "scenario": name,
+        # Hypothetical overlays are scored once; indexing them directly keeps them out of the shared cache
+        "health_score": calculate_financial_health_score(snapshot, build_asset_index(snapshot.get("assets", {}))),
+        "loan_eligible": loan["eligible"],
+        "emi_headroom": round(loan["headroom"], 2),
+        "existing_emi": round(loan["existing_emi"], 2),
+        "money_at_40": plan.money_at_40,
+        "retirement_moderate": scenarios.get("Moderate", 0.0),
+    }
+
+
+def evaluate_overlays(base: Mapping, overlays: Iterable[SnapshotOverlay],
+                      loan_amount: float = 5000000, interest_rate: float = 8.0,
+                      tenure_years: int = 20) -> List[Dict]:
+    """Runs health score, loan eligibility and the planner over every overlay.
+
+    The first row is the unmodified base snapshot. Evaluation is pure-Python and
+    CPU-bound, so it runs sequentially (threads would only contend for the GIL).
+    """
+    jobs = [(base, "Current")] + [(o, o.name) for o in overlays]
+    return [_evaluate(snapshot, name, loan_amount, interest_rate, tenure_years) for snapshot, name in jobs]
+
+
+def comparison_table(rows: List[Dict]):
+    """DataFrame of evaluation rows with deltas against the first (base) row."""
+    import pandas as pd
+
+    df = pd.DataFrame(rows).set_index("scenario")
+    for column in ["health_score", "emi_headroom", "money_at_40", "retirement_moderate"]:
+        df[f"{column}_change"] = df[column] - df[column].iloc[0]
+    return df
+
+
+from langchain_core.tools import tool
+
+@tool
+def compare_what_if(_: str = "") -> str:
+    """
+    Compares the health score, ₹50L loan headroom and retirement projection of common
+    what-if moves (prepaying loans, raising SIPs) against the current mcp_snapshot.json.
+    """
+    data = load_mcp_snapshot()
+    if data is None:
+        return "❌ The 'mcp_snapshot.json' file is missing."
+
+    overlays = []
+    liabilities = data.get("liabilities", {})
+    if liabilities.get("home_loan"):
+        overlays.append(SnapshotOverlay(data, "Prepay ₹2L home loan").prepay_loan("home_loan", 200000))
+    funds = list(data.get("contributions", {}).get("monthly_sip", {}))
+    if funds:
+        overlays.append(SnapshotOverlay(data, "Raise SIP by ₹5k").change_sip(funds[0], 5000))
+    for loan in ("personal_loan", "credit_card_dues"):
+        if liabilities.get(loan):
+            overlays.append(SnapshotOverlay(data, f"Clear {loan.replace('_', ' ')}").prepay_loan(loan, liabilities[loan]))
+
+    lines = ["🔀 What-if comparison:"]
+    for row in evaluate_overlays(data, overlays):
+        lines.append(
+            f"- {row['scenario']}: health {row['health_score']}, "
+            f"EMI headroom ₹{row['emi_headroom']:,.0f} ({'eligible' if row['loan_eligible'] else 'not eligible'}), "
+            f"retirement (moderate) ₹{row['retirement_moderate']:,.0f}"
+        )
+    return "\n".join(lines)